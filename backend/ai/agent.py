@@ -1,15 +1,37 @@
 # ai/agent.py
 # v1: Metadata-only outfit suggestion. No RAG/graph/preference/calendar dependencies.
-from typing import Dict, Any, Optional, List, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Iterator, Optional, List, Tuple
+import heapq
 import logging
+import os
+import threading
 from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
 from db.mongo import get_db, get_user_wardrobe
 from schemas.models import RecommendResponse, SuggestRequest, WardrobeItem
+from services.item_classifier import agent_category
+from services.metrics import Counter, Histogram, StageClock
+from services.structured_log import item_detail_sampled, log_event
+from services.weather_context import WeatherContext, item_traits
 
-db = get_db()
+AGENT_STAGE_SECONDS = Histogram(
+    "ai_suggest_outfit_stage_seconds",
+    "MyraAgent.suggest_outfit stage latency (wardrobe_read, hygiene_filter, scoring, selection).",
+    ("stage",),
+)
+AGENT_RESULTS = Counter(
+    "ai_suggest_outfit_results_total",
+    "suggest_outfit results by selection path (candidates, simple_fallback, empty_wardrobe).",
+    ("selection",),
+)
+AGENT_HYGIENE_FALLBACKS = Counter(
+    "ai_suggest_outfit_hygiene_fallbacks_total",
+    "Requests where hygiene filtering left nothing and the raw wardrobe was used.",
+)
 
 
 # ============================================================================
@@ -128,12 +150,129 @@ def _is_usable_item(item_dict: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
     return (True, None)
 
 
-def filter_usable_items(raw_items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+# Usability depends only on these fields, so verdicts are memoized by their
+# values (shared across users) and, per user, by item id + field values so the
+# hygiene stats can be kept up to date incrementally.
+AI_HYGIENE_CACHE_USERS = int(os.getenv("AI_HYGIENE_CACHE_USERS", "1024"))
+
+_Fingerprint = Tuple[Any, Any]
+
+
+def _fingerprint(item: Dict[str, Any]) -> _Fingerprint:
+    return (item.get("category"), item.get("imageUrl") or item.get("image_url"))
+
+
+@lru_cache(maxsize=65536)
+def _cached_verdict(category: Any, image_url: Any) -> Tuple[bool, str]:
+    return _verdict_key({"category": category, "imageUrl": image_url})
+
+
+def _verdict_key(item: Dict[str, Any]) -> Tuple[bool, str]:
+    """(is_usable, stats key): the lowercased category if usable, else the ignore reason."""
+    is_usable, reason = _is_usable_item(item)
+    if is_usable:
+        return (True, (item.get("category") or "unknown").lower())
+    return (False, reason or "unknown")
+
+
+def _item_verdict(item: Dict[str, Any], fingerprint: _Fingerprint) -> Tuple[bool, str]:
+    try:
+        return _cached_verdict(*fingerprint)
+    except TypeError:  # unhashable field values: check this item directly
+        return _verdict_key(item)
+
+
+class _UserHygiene:
+    """One user's verdicts by item id plus running stats, updated only for changed items."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # item id -> [fingerprint, is_usable, stats key, generation last seen]
+        self.items: Dict[Any, List[Any]] = {}
+        self.counts_by_category: Dict[str, int] = {}
+        self.ignored_by_reason: Dict[str, int] = {}
+        self.generation = 0
+
+    def _reset(self) -> None:
+        self.items.clear()
+        self.counts_by_category.clear()
+        self.ignored_by_reason.clear()
+
+    def _count(self, is_usable: bool, key: str, delta: int) -> None:
+        counts = self.counts_by_category if is_usable else self.ignored_by_reason
+        n = counts.get(key, 0) + delta
+        if n:
+            counts[key] = n
+        else:
+            counts.pop(key, None)
+
+    def filter(self, raw_items: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Usable items, updating stats for new/changed/removed items only. None
+        (and state reset) when items cannot be tracked by id: duplicate,
+        missing or unhashable ids.
+        """
+        self.generation += 1
+        generation = self.generation
+        known = self.items
+        usable_items = []
+        try:
+            for item in raw_items:
+                item_id = item.get("id")
+                entry = known.get(item_id)
+                fingerprint = _fingerprint(item)
+                if entry is not None:
+                    if entry[3] == generation:  # same id twice in this wardrobe
+                        self._reset()
+                        return None
+                    entry[3] = generation
+                    if entry[0] == fingerprint:
+                        if entry[1]:
+                            usable_items.append(item)
+                        continue
+                    self._count(entry[1], entry[2], -1)
+                is_usable, key = _item_verdict(item, fingerprint)
+                self._count(is_usable, key, 1)
+                known[item_id] = [fingerprint, is_usable, key, generation]
+                if is_usable:
+                    usable_items.append(item)
+        except TypeError:  # unhashable id
+            self._reset()
+            return None
+        if len(known) != len(raw_items):
+            for item_id in [i for i, entry in known.items() if entry[3] != generation]:
+                _, is_usable, key, _ = known.pop(item_id)
+                self._count(is_usable, key, -1)
+        return usable_items
+
+
+_hygiene_by_user: "OrderedDict[str, _UserHygiene]" = OrderedDict()
+_hygiene_lock = threading.Lock()
+
+
+def _user_hygiene(user_id: str) -> _UserHygiene:
+    with _hygiene_lock:
+        state = _hygiene_by_user.get(user_id)
+        if state is None:
+            state = _hygiene_by_user[user_id] = _UserHygiene()
+            while len(_hygiene_by_user) > AI_HYGIENE_CACHE_USERS:
+                _hygiene_by_user.popitem(last=False)
+        else:
+            _hygiene_by_user.move_to_end(user_id)
+        return state
+
+
+def filter_usable_items(
+    raw_items: List[Dict[str, Any]],
+    user_id: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     """
     Filter wardrobe items to only include usable items for AI outfit selection.
     
     Args:
         raw_items: List of wardrobe item dictionaries from MongoDB
+        user_id: When given, per-item verdicts and stats are kept for this user
+            and only new, changed or removed items are re-checked
     
     Returns:
         Tuple of (usable_items, stats):
@@ -141,22 +280,32 @@ def filter_usable_items(raw_items: List[Dict[str, Any]]) -> Tuple[List[Dict[str,
         - stats: Dictionary with filtering statistics
     """
     total_count = len(raw_items)
+    if user_id is not None:
+        state = _user_hygiene(user_id)
+        with state.lock:
+            usable_items = state.filter(raw_items)
+            if usable_items is not None:
+                return (usable_items, {
+                    "total_count": total_count,
+                    "usable_count": len(usable_items),
+                    "counts_by_category": dict(state.counts_by_category),
+                    "ignored_by_reason": dict(state.ignored_by_reason),
+                })
+
     usable_items = []
     ignored_by_reason: Dict[str, int] = {}
     counts_by_category: Dict[str, int] = {}
     
     for item in raw_items:
-        is_usable, reason = _is_usable_item(item)
+        is_usable, key = _item_verdict(item, _fingerprint(item))
         
         if is_usable:
             usable_items.append(item)
             # Count by category
-            category = (item.get("category") or "unknown").lower()
-            counts_by_category[category] = counts_by_category.get(category, 0) + 1
+            counts_by_category[key] = counts_by_category.get(key, 0) + 1
         else:
             # Track ignored items by reason
-            reason_key = reason or "unknown"
-            ignored_by_reason[reason_key] = ignored_by_reason.get(reason_key, 0) + 1
+            ignored_by_reason[key] = ignored_by_reason.get(key, 0) + 1
     
     stats = {
         "total_count": total_count,
@@ -168,6 +317,319 @@ def filter_usable_items(raw_items: List[Dict[str, Any]]) -> Tuple[List[Dict[str,
     return (usable_items, stats)
 
 
+def _score_summary(records: List["_ItemRecord"], failures: int) -> Dict[str, Any]:
+    """Aggregate per-item scores (sorted descending) for the request log event."""
+    if not records:
+        return {"count": 0, "failed": failures}
+    totals = [record.total for record in records]
+    return {
+        "count": len(totals),
+        "failed": failures,
+        "max": round(totals[0], 2),
+        "min": round(totals[-1], 2),
+        "mean": round(sum(totals) / len(totals), 2),
+        "median": round(totals[len(totals) // 2], 2),
+        "avoided": sum(1 for record in records if record.components["avoid_penalty"] < 0),
+        "favorites": sum(1 for record in records if record.components["favorite"] > 0),
+        "top": [{"id": record.item.id, "total": round(record.total, 2)} for record in records[:5]],
+    }
+
+
+# ============================================================================
+# Agent Item View
+# ============================================================================
+
+# WardrobeItem fields the agent copies from a raw wardrobe dict; the rest of
+# the model (color_name, style_tags, fit, ...) is left unset, as before.
+_ITEM_STR_FIELDS = (
+    "user_id", "id", "type", "name", "color", "fabric", "pattern", "formality",
+    "notes", "imageUrl", "cleanImageUrl", "category",
+)
+_ITEM_LIST_FIELDS = ("colors", "season", "seasonTags", "occasionTags", "tags", "styleVibe")
+_ITEM_FIELDS = _ITEM_STR_FIELDS + _ITEM_LIST_FIELDS + ("isFavorite",)
+
+
+_NONE_OR_STR = (type(None), str)
+_NONE_OR_BOOL = (type(None), bool)
+
+
+def _item_fields(item_dict: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    fields = {name: item_dict.get(name) for name in _ITEM_FIELDS}
+    fields["user_id"] = item_dict.get("user_id", user_id)
+    fields["id"] = item_dict.get("id", "")
+    return fields
+
+
+def _is_plain(fields: Dict[str, Any]) -> bool:
+    """
+    True when every value already has the type WardrobeItem would keep as-is,
+    so validation could not change or reject it.
+    """
+    if type(fields["user_id"]) is not str or type(fields["id"]) is not str:
+        return False
+    for name in _ITEM_STR_FIELDS:
+        if type(fields[name]) not in _NONE_OR_STR:
+            return False
+    for name in _ITEM_LIST_FIELDS:
+        value = fields[name]
+        if value is None:
+            continue
+        if type(value) is not list:
+            return False
+        for entry in value:
+            if type(entry) is not str:
+                return False
+    return type(fields["isFavorite"]) in _NONE_OR_BOOL
+
+
+class _AgentItem:
+    """
+    Lightweight stand-in for WardrobeItem on the scoring path: same attribute
+    names, no validation, treated as read-only. The field dict becomes the
+    instance dict, so construction is O(1). Chosen items are turned back into
+    WardrobeItem models with to_model().
+    """
+
+    # WardrobeItem fields the agent never fills from the raw dict
+    color_name = None
+    color_type = None
+    fit = None
+    style_tags = None
+    embedding = None
+
+    def __init__(self, fields: Dict[str, Any]):
+        self.__dict__ = fields
+
+    @classmethod
+    def from_model(cls, model: WardrobeItem) -> "_AgentItem":
+        return cls({name: getattr(model, name) for name in _ITEM_FIELDS})
+
+    def to_model(self) -> WardrobeItem:
+        return WardrobeItem(**{name: getattr(self, name) for name in _ITEM_FIELDS})
+
+
+# ============================================================================
+# Per-request Scoring State
+# ============================================================================
+
+_ZERO_PREFERENCES: Dict[str, float] = {
+    "total": 0.0,
+    "occasion": 0.0,
+    "style": 0.0,
+    "favorite": 0.0,
+    "avoid_penalty": 0.0,
+}
+_ZERO_COMPONENTS: Dict[str, float] = {**_ZERO_PREFERENCES, "weather": 0.0}
+
+
+class _ScoringContext:
+    """Request preferences and weather, normalized once per request rather than per item."""
+
+    __slots__ = ("active", "occasion", "style", "avoid_colors", "prefer_favorites", "weather")
+
+    def __init__(
+        self,
+        preferences: Optional[Dict[str, Any]],
+        temp_f: Optional[float],
+        weather: Optional[Dict[str, Any]] = None,
+    ):
+        self.active = bool(preferences)
+        preferences = preferences or {}
+        occasion = preferences.get("occasion")
+        style = preferences.get("style_vibe")
+        self.occasion = occasion.lower().strip() if occasion else None
+        self.style = style.lower().strip() if style else None
+        self.avoid_colors = {c.lower().strip() for c in (preferences.get("avoid_colors") or []) if c}
+        self.prefer_favorites = bool(preferences.get("prefer_favorites"))
+
+        self.weather = WeatherContext.from_weather(weather, temp_f)
+
+
+# Score the whole wardrobe at once with NumPy against its cached columnar encoding
+# (ai/preference_vectors.py) instead of per item; _preference_scores and
+# _weather_bonus stay the reference implementation.
+AI_AGENT_VECTOR_SCORING = os.getenv("AI_AGENT_VECTOR_SCORING", "false").lower() in ("true", "1", "yes")
+
+
+def _vector_scores(
+    user_id: str,
+    items: List["_AgentItem"],
+    ctx: _ScoringContext,
+) -> List[Tuple[Dict[str, float], float]]:
+    """Per-item (components, preference total), as _score_record sets them, from the cached columns."""
+    from ai import preference_vectors  # numpy only loaded when the mode is on
+
+    cols = preference_vectors.agent_columns(user_id, items)
+    # No preferences normalize to no occasion/style/avoid/favorites: all-zero arrays.
+    arrays = preference_vectors.preference_scores(
+        cols, ctx.occasion, ctx.style, ctx.avoid_colors, ctx.prefer_favorites
+    )
+    weather = preference_vectors.weather_bonus(cols, ctx.weather)
+    preference_totals = arrays["total"].tolist()
+    columns = {
+        "total": (arrays["total"] + weather).tolist(),
+        "occasion": arrays["occasion"].tolist(),
+        "style": arrays["style"].tolist(),
+        "favorite": arrays["favorite"].tolist(),
+        "avoid_penalty": arrays["avoid_penalty"].tolist(),
+        "weather": weather.tolist(),
+    }
+    names = list(columns)
+    return [
+        (dict(zip(names, row)), preference_total)
+        for row, preference_total in zip(zip(*columns.values()), preference_totals)
+    ]
+
+
+class _ItemRecord:
+    """
+    A wardrobe item with its lowercased fields, category and score components.
+    Built once per item per request and shared by scoring, per-category ranking,
+    candidate selection and logging.
+    """
+
+    __slots__ = (
+        "item", "category", "tags", "style_tags", "fabric", "type",
+        "occasion_tags", "style_vibe", "colors",
+        "components", "total", "preference_total",
+    )
+
+    def __init__(self, item: "_AgentItem"):
+        self.item = item
+        self.tags = [tag.lower() for tag in (item.tags or [])]
+        self.style_tags = [tag.lower() for tag in (item.style_tags or [])]
+        self.fabric = (item.fabric or "").lower()
+        self.type = (item.type or "").lower()
+        self.category = agent_category(self.type, (item.category or "").lower(), tuple(self.tags))
+        # Preference-only fields, filled by prepare_preferences() when the request has preferences
+        self.occasion_tags = None
+        self.set_components(_ZERO_COMPONENTS, 0.0)
+
+    def prepare_preferences(self) -> None:
+        if self.occasion_tags is not None:
+            return
+        item = self.item
+        self.occasion_tags = {tag.lower() for tag in (item.occasionTags or [])}
+        style_vibe = item.styleVibe
+        if not style_vibe:
+            self.style_vibe = None
+        elif isinstance(style_vibe, list):
+            self.style_vibe = " ".join([str(s).lower() for s in style_vibe])
+        else:
+            self.style_vibe = str(style_vibe).lower()
+        color = (item.color or "").lower().strip()
+        colors = [c.lower().strip() for c in (item.colors or []) if c]
+        self.colors = set(filter(None, [color] + colors))
+
+    def set_components(self, components: Dict[str, float], preference_total: float) -> None:
+        self.components = components
+        self.total = components["total"]
+        self.preference_total = preference_total
+
+
+_DESCRIPTION_STYLE_WORDS = ("relaxed", "fitted", "casual", "formal", "comfortable")
+
+
+@lru_cache(maxsize=16384)
+def _item_description(
+    item_type: Optional[str],
+    category: Optional[str],
+    color_name: Optional[str],
+    first_color: Optional[str],
+    style_tags: Tuple[str, ...],
+) -> str:
+    """MyraAgent._describe_item for the given field values (first_color: colors[0], None without colors)."""
+    item_type = (item_type or "").strip()
+    category = (category or "").strip()
+    color_name = (color_name or "").strip()
+
+    # Prefer type from metadata if available, else fall back to category
+    desc = item_type or category or "item"
+    # Add color if available
+    if color_name:
+        desc = f"{color_name} {desc}"
+    elif first_color is not None:
+        desc = f"{first_color} {desc}"
+
+    # Add a descriptive word from style tags if available
+    lowered = {t.lower() for t in style_tags}
+    for tag in _DESCRIPTION_STYLE_WORDS:
+        if tag in lowered:
+            desc = f"{tag} {desc}"
+            break
+
+    return desc.lower() if desc else "item"
+
+
+def _is_avoided(record: _ItemRecord) -> bool:
+    return record.components["avoid_penalty"] < 0
+
+
+def _best_combinations(slots: List[List[_ItemRecord]]) -> Iterator[Tuple[float, List[_ItemRecord]]]:
+    """
+    Lazily yield one item per slot in descending total score. Each slot must be
+    sorted by score descending; since an outfit's score is the sum of its items'
+    scores, a combination's successors (one slot moved down by one) never score
+    higher, so a heap over index tuples enumerates combinations in order.
+    Ties are broken by slot order.
+    """
+    if not slots or not all(slots):
+        return
+    def total(idx: Tuple[int, ...]) -> float:
+        return sum(slot[i].total for slot, i in zip(slots, idx))
+
+    start = (0,) * len(slots)
+    heap = [(-total(start), start)]
+    seen = {start}
+    while heap:
+        neg_score, idx = heapq.heappop(heap)
+        yield -neg_score, [slot[i] for slot, i in zip(slots, idx)]
+        for d in range(len(slots)):
+            if idx[d] + 1 < len(slots[d]):
+                nxt = idx[:d] + (idx[d] + 1,) + idx[d + 1:]
+                if nxt not in seen:
+                    seen.add(nxt)
+                    heapq.heappush(heap, (-total(nxt), nxt))
+
+
+def _rank_outfits(slots: List[List[_ItemRecord]], limit: int) -> List[List[_ItemRecord]]:
+    """
+    Top `limit` distinct outfits, one item per slot. Outfits with no avoided
+    color come first (best score first), then outfits containing one. Within a
+    slot, equal totals are ordered by preference-only total, then slot order.
+    """
+    ordered = []
+    for slot in slots:
+        seen_ids = set()
+        unique = []
+        for record in slot:
+            if record.item.id not in seen_ids:
+                seen_ids.add(record.item.id)
+                unique.append(record)
+        unique.sort(key=lambda r: (-r.total, -r.preference_total))
+        ordered.append(unique)
+
+    outfits: List[List[_ItemRecord]] = []
+    seen_outfits = set()
+
+    def collect(combos: Iterator[Tuple[float, List[_ItemRecord]]], clean_only: bool) -> None:
+        for _, combo in combos:
+            if len(outfits) >= limit:
+                return
+            if not clean_only and not any(_is_avoided(r) for r in combo):
+                continue  # already taken by the clean pass
+            key = frozenset(r.item.id for r in combo)
+            if key in seen_outfits:
+                continue
+            seen_outfits.add(key)
+            outfits.append(combo)
+
+    collect(_best_combinations([[r for r in slot if not _is_avoided(r)] for slot in ordered]), True)
+    if len(outfits) < limit:
+        collect(_best_combinations(ordered), False)
+    return outfits
+
+
 class MyraAgent:
     """
     v1 metadata-only outfit suggestion:
@@ -176,9 +638,10 @@ class MyraAgent:
       - Selects outfit (top + bottom + shoe + optional jacket)
     """
     
-    def __init__(self):
-        """Initialize agent with DB instance."""
-        self.db = db
+    @property
+    def db(self):
+        """DB instance, resolved on use (no connection at import/construction)."""
+        return get_db()
     
     def _categorize_item(self, item: WardrobeItem) -> str:
         """
@@ -186,34 +649,8 @@ class MyraAgent:
         Uses item.category, item.type (from metadata), and tags as hints.
         Prioritizes metadata.type for more accurate classification.
         """
-        cat = (item.category or "").lower()
-        item_type = (item.type or "").lower()
-        tags = [t.lower() for t in (item.tags or [])]
-        
-        # Check metadata.type first, then category, then tags
-        check_str = f"{item_type} {cat} {' '.join(tags)}".lower()
-
-        # Jackets / outerwear (check first to catch hoodies/sweaters that might be categorized as tops)
-        jacket_keywords = ["hoodie", "sweater", "jacket", "coat", "blazer", "overcoat", "cardigan"]
-        if any(k in check_str for k in jacket_keywords):
-            return "jacket"
-
-        # Tops
-        top_keywords = ["top", "tshirt", "t-shirt", "shirt", "blouse", "polo", "tank", "camisole"]
-        if any(k in check_str for k in top_keywords):
-            return "top"
-
-        # Bottoms
-        bottom_keywords = ["jeans", "pants", "trousers", "skirt", "shorts", "bottom", "leggings"]
-        if any(k in check_str for k in bottom_keywords):
-            return "bottom"
-
-        # Shoes
-        shoe_keywords = ["shoe", "sneaker", "boot", "heel", "sandal", "slide", "loafer", "slipper"]
-        if any(k in check_str for k in shoe_keywords):
-            return "shoe"
-
-        return "other"
+        tags = tuple(t.lower() for t in (item.tags or []))
+        return agent_category((item.type or "").lower(), (item.category or "").lower(), tags)
 
     def _score_item(
         self,
@@ -226,58 +663,38 @@ class MyraAgent:
         Preference + weather scoring for an item.
         Returns the final numeric score and a breakdown dict for logging.
         """
-        weather_dict = weather or {}
-        pref_scores = self.score_item_preferences(item, preferences)
-        weather_bonus = self._score_item_weather(item, temp_f, weather_dict)
-        
-        total_score = pref_scores["total"] + weather_bonus
+        record = _ItemRecord(item)
+        self._score_record(record, _ScoringContext(preferences, temp_f, weather))
+        return record.total, record.components
+
+    def _score_record(self, record: _ItemRecord, ctx: _ScoringContext) -> None:
+        """Fill in a record's preference + weather components."""
+        pref_scores = self._preference_scores(record, ctx)
+        weather_bonus = self._weather_bonus(record, ctx)
         components = {
-            "total": total_score,
+            "total": pref_scores["total"] + weather_bonus,
             "occasion": pref_scores["occasion"],
             "style": pref_scores["style"],
             "favorite": pref_scores["favorite"],
             "avoid_penalty": pref_scores["avoid_penalty"],
             "weather": weather_bonus,
         }
-        return total_score, components
+        record.set_components(components, pref_scores["total"])
 
     def _describe_item(self, item: WardrobeItem) -> str:
         """
         Generate a human-readable description of an item for the 'why' explanation.
         Uses metadata.type if available, falls back to category + color.
+        Memoized by the fields it reads (_item_description).
         """
-        item_type = (item.type or "").strip()
-        category = (item.category or "").strip()
-        color_name = (item.color_name or item.color or "").strip()
-        colors = item.colors or []
-        
-        # Prefer type from metadata if available
-        if item_type:
-            desc = item_type
-            # Add color if available
-            if color_name:
-                desc = f"{color_name} {desc}"
-            elif colors and len(colors) > 0:
-                desc = f"{colors[0]} {desc}"
-        else:
-            # Fallback to category + color
-            desc = category if category else "item"
-            if color_name:
-                desc = f"{color_name} {desc}"
-            elif colors and len(colors) > 0:
-                desc = f"{colors[0]} {desc}"
-        
-        # Add descriptive words from style tags if available
-        style_tags = item.style_tags or []
-        style_words = []
-        for tag in ["relaxed", "fitted", "casual", "formal", "comfortable"]:
-            if any(t.lower() == tag.lower() for t in style_tags):
-                style_words.append(tag)
-        
-        if style_words:
-            desc = f"{style_words[0]} {desc}"
-        
-        return desc.lower() if desc else "item"
+        colors = item.colors
+        return _item_description(
+            item.type,
+            item.category,
+            item.color_name or item.color,
+            colors[0] if colors else None,
+            tuple(item.style_tags) if item.style_tags else (),
+        )
 
     def score_item_preferences(
         self,
@@ -299,63 +716,43 @@ class MyraAgent:
         Returns:
             Dict with keys: "total", "occasion", "style", "favorite", "avoid_penalty"
         """
+        return self._preference_scores(_ItemRecord(item), _ScoringContext(preferences, None))
+
+    def _preference_scores(self, record: _ItemRecord, ctx: _ScoringContext) -> Dict[str, float]:
+        """score_item_preferences for a prepared item record and request context."""
+        if not ctx.active:
+            return dict(_ZERO_PREFERENCES)
+        record.prepare_preferences()
+
         occasion_score = 0.0
         style_score = 0.0
         favorite_score = 0.0
         avoid_penalty = 0.0
         
-        if not preferences:
-            return {
-                "total": 0.0,
-                "occasion": occasion_score,
-                "style": style_score,
-                "favorite": favorite_score,
-                "avoid_penalty": avoid_penalty,
-            }
-        
-        item_tags = [tag.lower() for tag in (item.tags or [])]
-        occasion_tags = [tag.lower() for tag in (item.occasionTags or [])]
-        style_vibe = item.styleVibe
-        style_tags = [tag.lower() for tag in (item.style_tags or [])]
-        item_color = (item.color or "").lower().strip()
-        item_colors = [c.lower().strip() for c in (item.colors or []) if c]
-        is_favorite = bool(item.isFavorite)
-        
-        pref_occasion = preferences.get("occasion")
-        pref_style = preferences.get("style_vibe")
-        pref_avoid_colors = [c.lower().strip() for c in (preferences.get("avoid_colors") or []) if c]
-        pref_fav = bool(preferences.get("prefer_favorites"))
-        
-        if pref_occasion:
-            pref_occ = pref_occasion.lower().strip()
-            if pref_occ in occasion_tags:
+        if ctx.occasion:
+            if ctx.occasion in record.occasion_tags:
                 occasion_score = 3.0
-            elif any(pref_occ in tag or tag in pref_occ for tag in item_tags):
+            elif any(ctx.occasion in tag or tag in ctx.occasion for tag in record.tags):
                 occasion_score = 2.0
         
-        if pref_style:
-            pref_style_lower = pref_style.lower().strip()
-            if style_vibe:
-                if isinstance(style_vibe, list):
-                    normalized = " ".join([str(s).lower() for s in style_vibe])
-                else:
-                    normalized = str(style_vibe).lower()
+        if ctx.style:
+            pref_style_lower = ctx.style
+            normalized = record.style_vibe
+            if normalized is not None:
                 if pref_style_lower == normalized:
                     style_score = 3.0
                 elif pref_style_lower in normalized:
                     style_score = 2.0
             if style_score == 0.0:
-                combined_tags = item_tags + style_tags
+                combined_tags = record.tags + record.style_tags
                 if any(pref_style_lower in tag or tag in pref_style_lower for tag in combined_tags):
                     style_score = 2.0
         
-        if pref_fav and is_favorite:
+        if ctx.prefer_favorites and record.item.isFavorite:
             favorite_score = 4.0
         
-        if pref_avoid_colors:
-            all_colors = set(filter(None, [item_color] + item_colors))
-            if any(color in pref_avoid_colors for color in all_colors):
-                avoid_penalty = -100.0
+        if ctx.avoid_colors and not ctx.avoid_colors.isdisjoint(record.colors):
+            avoid_penalty = -100.0
         
         total = occasion_score + style_score + favorite_score + avoid_penalty
         
@@ -377,44 +774,18 @@ class MyraAgent:
         Simple weather-aware adjustments.
         Encourages breathable items in heat, layers in cold, and rain-friendly materials.
         """
-        if temp_f is None:
-            temp_f = weather.get("tempF")
-        if temp_f is None:
-            temp_f = weather.get("tempf")
-        
-        summary = (weather.get("summary") or "").lower()
-        category = self._categorize_item(item)
-        item_tags = [tag.lower() for tag in (item.tags or [])]
-        style_tags = [tag.lower() for tag in (item.style_tags or [])]
-        fabric = (item.fabric or "").lower()
-        item_type = (item.type or "").lower()
-        
-        weather_bonus = 0.0
-        
-        try:
-            if temp_f is not None:
-                if temp_f >= 85:
-                    if category == "jacket" or any(tag in item_tags for tag in ["jacket", "coat", "hoodie"]):
-                        weather_bonus -= 2.0
-                    if (
-                        "minimal" in style_tags
-                        or "sporty" in style_tags
-                        or (category == "top" and "hoodie" not in item_tags)
-                    ):
-                        weather_bonus += 1.0
-                elif temp_f <= 55:
-                    if category == "jacket" or any(tag in item_tags for tag in ["jacket", "coat", "hoodie", "sweater"]):
-                        weather_bonus += 2.0
-                    if category == "bottom" and ("shorts" in item_type or "short" in item_type):
-                        weather_bonus -= 2.0
-            if "rain" in summary:
-                if category == "shoe" and ("canvas" in fabric or "canvas" in item_tags):
-                    weather_bonus -= 1.0
-        except Exception as weather_err:
-            logger.warning(f"[MyraAgent] Weather scoring failed for item {item.id}: {weather_err}")
-            return 0.0
-        
-        return weather_bonus
+        return self._weather_bonus(_ItemRecord(item), _ScoringContext(None, temp_f, weather))
+
+    def _weather_bonus(self, record: _ItemRecord, ctx: _ScoringContext) -> float:
+        """
+        _score_item_weather for a prepared item record and request context: a
+        lookup in the request's compiled table (services/weather_context.py).
+          hot (>= 85 °F): layers -2; tops (not hoodies) and minimal/sporty items +1
+          cold (<= 55 °F): layers and sweaters +2; shorts -2
+          rain ("rain" in the summary): canvas shoes -1
+        """
+        traits = item_traits(record.type, record.fabric, record.tags, record.style_tags)
+        return ctx.weather.agent_bonus(record.category, traits)
 
     def _rank_items_for_preferences(
         self,
@@ -428,18 +799,10 @@ class MyraAgent:
         if not preferences:
             return items
         
-        # Compute scores and keep original index for stable sorting
-        scored_items = []
-        for idx, item in enumerate(items):
-            score_dict = self.score_item_preferences(item, preferences)
-            total_score = score_dict["total"]
-            scored_items.append((total_score, idx, item))
-        
-        # Sort by score descending, then by original index (for stability)
-        scored_items.sort(key=lambda x: (-x[0], x[1]))
-        
-        # Return items in sorted order
-        return [item for _, _, item in scored_items]
+        ctx = _ScoringContext(preferences, None)
+        scores = [self._preference_scores(_ItemRecord(item), ctx)["total"] for item in items]
+        order = sorted(range(len(items)), key=lambda i: -scores[i])
+        return [items[i] for i in order]
 
     def suggest_outfit(self, request: SuggestRequest) -> RecommendResponse:
         """
@@ -462,77 +825,65 @@ class MyraAgent:
                 if not preferences:
                     preferences = None
         
-        # Log incoming request (high-level, no PII)
-        logger.info("[AI] Suggest outfit for user: %s", user_id)
-        logger.info(
-            "[MyraAgent] Preferences: occasion=%s, style_vibe=%s, prefer_favorites=%s, avoid_colors=%s",
-            preferences.get("occasion") if preferences else None,
-            preferences.get("style_vibe") if preferences else None,
-            preferences.get("prefer_favorites") if preferences else None,
-            preferences.get("avoid_colors") if preferences else None,
-        )
+        # One structured event per request (no PII); per-item detail only at DEBUG
+        # on sampled requests.
+        clock = StageClock(AGENT_STAGE_SECONDS)
+        item_debug = logger.isEnabledFor(logging.DEBUG) and item_detail_sampled()
+        event: Dict[str, Any] = {
+            "userId": user_id,
+            "preferences": {
+                key: preferences.get(key) if preferences else None
+                for key in ("occasion", "style_vibe", "prefer_favorites", "avoid_colors")
+            },
+            "timingsMs": clock.laps,
+        }
 
         # Fetch wardrobe from DB (returns dicts, convert to WardrobeItem)
         raw_wardrobe_dicts = get_user_wardrobe(user_id)
+        clock.lap("wardrobe_read")
         
         # Filter to usable items only (Phase 4D: wardrobe hygiene)
-        usable_dicts, hygiene_stats = filter_usable_items(raw_wardrobe_dicts)
+        usable_dicts, hygiene_stats = filter_usable_items(raw_wardrobe_dicts, user_id)
+        clock.lap("hygiene_filter")
         
-        # Log wardrobe hygiene stats
-        logger.info(
-            f"[MyraAgent] Wardrobe hygiene: total={hygiene_stats['total_count']} "
-            f"usable={hygiene_stats['usable_count']} "
-            f"by_category={hygiene_stats['counts_by_category']} "
-            f"ignored={hygiene_stats['ignored_by_reason']}"
-        )
+        event["hygiene"] = {
+            "total": hygiene_stats["total_count"],
+            "usable": hygiene_stats["usable_count"],
+            "byCategory": hygiene_stats["counts_by_category"],
+            "ignored": hygiene_stats["ignored_by_reason"],
+        }
         
         # Fallback to raw items if filtering left us with nothing
         if not usable_dicts:
             logger.warning("[MyraAgent] Warning: No usable items after filtering; falling back to raw wardrobe set.")
+            AGENT_HYGIENE_FALLBACKS.inc()
+            event["hygieneFallback"] = True
             usable_dicts = raw_wardrobe_dicts
         
-        # Convert usable items to WardrobeItem objects
-        wardrobe_items: List[WardrobeItem] = []
+        # Wrap usable items for scoring. Well-typed dicts (normal DB output) skip
+        # Pydantic; anything else is validated as a WardrobeItem exactly as before
+        # (coerced, or dropped if invalid).
+        wardrobe_items: List[_AgentItem] = []
         for item_dict in usable_dicts:
+            fields = _item_fields(item_dict, user_id)
+            if _is_plain(fields):
+                wardrobe_items.append(_AgentItem(fields))
+                continue
             try:
-                # Convert dict to WardrobeItem, handling missing fields gracefully
-                wardrobe_item = WardrobeItem(
-                    user_id=item_dict.get('user_id', user_id),
-                    id=item_dict.get('id', ''),
-                    type=item_dict.get('type'),
-                    name=item_dict.get('name'),
-                    color=item_dict.get('color'),
-                    colors=item_dict.get('colors'),
-                    fabric=item_dict.get('fabric'),
-                    pattern=item_dict.get('pattern'),
-                    season=item_dict.get('season'),
-                    seasonTags=item_dict.get('seasonTags'),
-                    occasionTags=item_dict.get('occasionTags'),
-                    formality=item_dict.get('formality'),
-                    notes=item_dict.get('notes'),
-                    imageUrl=item_dict.get('imageUrl'),
-                    cleanImageUrl=item_dict.get('cleanImageUrl'),
-                    category=item_dict.get('category'),
-                    tags=item_dict.get('tags'),
-                    styleVibe=item_dict.get('styleVibe'),
-                    isFavorite=item_dict.get('isFavorite'),
-                )
-                wardrobe_items.append(wardrobe_item)
+                wardrobe_items.append(_AgentItem.from_model(WardrobeItem(**fields)))
             except Exception as e:
-                logger.warning(f"[MyraAgent] Warning: failed to convert wardrobe item to WardrobeItem: {e}")
+                logger.warning("[MyraAgent] Warning: failed to convert wardrobe item to WardrobeItem: %s", e)
                 continue
         
         wardrobe_count = len(wardrobe_items)
-        logger.info(
-            "[MyraAgent] Database=%s, user_id=%s, wardrobe_count=%s",
-            getattr(self.db, "database_type", "unknown"),
-            user_id,
-            wardrobe_count,
-        )
+        event["database"] = getattr(self.db, "database_type", "unknown")
+        event["wardrobeCount"] = wardrobe_count
 
         # If no wardrobe, keep a safe fallback
         if wardrobe_count == 0:
             why = "I couldn't find any wardrobe items for you yet. Add some clothes to your closet so I can suggest an outfit."
+            AGENT_RESULTS.inc(selection="empty_wardrobe")
+            log_event(logger, "suggest_outfit", selection="empty_wardrobe", **event)
             return RecommendResponse(
                 outfits=[{
                     "items": [],
@@ -548,244 +899,135 @@ class MyraAgent:
 
         temp_f = getattr(weather, "tempF", None)
         weather_dict = weather.dict() if hasattr(weather, "dict") else (weather if isinstance(weather, dict) else {})
-        
-        # Determine temperature band for logging
-        temp_band = "unknown"
-        if temp_f is not None:
-            if temp_f <= 55:
-                temp_band = "cold"
-            elif temp_f < 75:
-                temp_band = "mild"
-            else:
-                temp_band = "warm"
-        
-        # Count items by category for debug
-        category_counts = {}
-        for item in wardrobe_items:
-            cat = self._categorize_item(item)
-            category_counts[cat] = category_counts.get(cat, 0) + 1
-        
-        if temp_f is not None:
-            logger.info(
-                f"[MyraAgent] Temperature: {temp_f:.0f}°F ({temp_band}), "
-                f"categories: {dict(category_counts)}"
-            )
-        
-        # Score items with preferences and weather
-        scored_items = []
-        item_score_details: Dict[str, Dict[str, float]] = {}
-        for item in wardrobe_items:
-            try:
-                score, components = self._score_item(item, preferences, temp_f, weather_dict)
-            except Exception as scoring_err:
-                logger.warning(f"[MyraAgent] Scoring failed for item {item.id}: {scoring_err}")
-                score = 0.0
-                components = {
-                    "total": 0.0,
-                    "occasion": 0.0,
-                    "style": 0.0,
-                    "favorite": 0.0,
-                    "avoid_penalty": 0.0,
-                    "weather": 0.0,
-                }
-            scored_items.append((score, item))
-            item_score_details[item.id] = components
-            logger.info(
-                "[MyraAgent] Score for item %s: %.2f (occasion=%.2f, style=%.2f, favorite=%.2f, avoid_penalty=%.2f, weather=%.2f)",
-                item.id,
-                score,
-                components.get("occasion", 0.0),
-                components.get("style", 0.0),
-                components.get("favorite", 0.0),
-                components.get("avoid_penalty", 0.0),
-                components.get("weather", 0.0),
-            )
 
-        # Sort by score descending
-        scored_items.sort(key=lambda x: x[0], reverse=True)
-
-        # Separate into rough categories
-        tops = []
-        bottoms = []
-        shoes = []
-        jackets = []
-        others = []
-
-        for score, item in scored_items:
-            cat = self._categorize_item(item)
-            if cat == "top":
-                tops.append((score, item))
-            elif cat == "bottom":
-                bottoms.append((score, item))
-            elif cat == "shoe":
-                shoes.append((score, item))
-            elif cat == "jacket":
-                jackets.append((score, item))
+        # Preferences and weather (band, rain/snow/wind, bonus tables) parsed once per request
+        ctx = _ScoringContext(preferences, temp_f, weather_dict)
+        event["tempF"] = temp_f
+        event["tempBand"] = ctx.weather.band
+        event["conditions"] = [name for name in ("rain", "snow", "wind") if getattr(ctx.weather, name)]
+
+        # One pass per item: category, lowered fields, preference + weather components.
+        vector_scores = None
+        if AI_AGENT_VECTOR_SCORING:
+            try:
+                vector_scores = _vector_scores(user_id, wardrobe_items, ctx)
+            except Exception as vector_err:
+                logger.warning("[MyraAgent] Vector scoring failed; scoring per item: %s", vector_err)
+        records: List[_ItemRecord] = []
+        scoring_failures = 0
+        for index, item in enumerate(wardrobe_items):
+            record = _ItemRecord(item)
+            if vector_scores is not None:
+                record.set_components(*vector_scores[index])
             else:
-                others.append((score, item))
-
-        # Apply preference ranking per category (Phase 5A)
-        # Extract items from (score, item) tuples, rank them, then reconstruct tuples
-        tops_items = [item for _, item in tops]
-        bottoms_items = [item for _, item in bottoms]
-        shoes_items = [item for _, item in shoes]
-        jackets_items = [item for _, item in jackets]
-        
-        # Rank items by preferences
-        tops_items = self._rank_items_for_preferences(tops_items, preferences)
-        bottoms_items = self._rank_items_for_preferences(bottoms_items, preferences)
-        shoes_items = self._rank_items_for_preferences(shoes_items, preferences)
-        jackets_items = self._rank_items_for_preferences(jackets_items, preferences)
-        
-        # Reconstruct tuples with original scores (for compatibility with existing selection logic)
-        # We'll use the preference-ranked order but keep scores for logging
-        tops_ranked = []
-        bottoms_ranked = []
-        shoes_ranked = []
-        jackets_ranked = []
-        
-        # Create a lookup for scores by item id
-        score_lookup = {item.id: score for score, item in scored_items}
-        
-        for item in tops_items:
-            tops_ranked.append((score_lookup.get(item.id, 0.0), item))
-        for item in bottoms_items:
-            bottoms_ranked.append((score_lookup.get(item.id, 0.0), item))
-        for item in shoes_items:
-            shoes_ranked.append((score_lookup.get(item.id, 0.0), item))
-        for item in jackets_items:
-            jackets_ranked.append((score_lookup.get(item.id, 0.0), item))
-        
-        # Update category lists with ranked versions
-        tops = tops_ranked
-        bottoms = bottoms_ranked
-        shoes = shoes_ranked
-        jackets = jackets_ranked
-
-        # Phase 5C: Generate candidate outfits and score them with preferences
-        candidate_outfits: List[Tuple[List[WardrobeItem], float, bool]] = []
-        item_scores_final: Dict[str, Dict[str, float]] = {}
-        
-        # Generate candidate outfits (top + bottom + shoe + optional jacket)
-        # Consider top 3 items from each category to create multiple candidates
-        top_candidates = [item for _, item in tops[:3]] if tops else []
-        bottom_candidates = [item for _, item in bottoms[:3]] if bottoms else []
-        shoe_candidates = [item for _, item in shoes[:3]] if shoes else []
-        jacket_candidates = [item for _, item in jackets[:3]] if jackets else []
-        
-        # Generate combinations (limit to reasonable number)
-        for top_item in top_candidates[:2]:  # Limit to top 2 to avoid too many combinations
-            for bottom_item in bottom_candidates[:2]:
-                for shoe_item in shoe_candidates[:2]:
-                    outfit_items = [top_item, bottom_item, shoe_item]
-                    
-                    # Add jacket if cold weather
-                    if temp_f is not None and temp_f <= 55 and jacket_candidates:
-                        for jacket_item in jacket_candidates[:1]:  # Just top jacket
-                            candidate = outfit_items + [jacket_item]
-                            candidate_outfits.append((candidate, 0.0, False))
-                    else:
-                        candidate_outfits.append((outfit_items, 0.0, False))
-        
-        # Fallback: if no candidates generated, use simple selection
-        item_scores_final: Dict[str, Dict[str, float]] = {}
-        if not candidate_outfits:
-            chosen_items: List[WardrobeItem] = []
+                try:
+                    self._score_record(record, ctx)
+                except Exception as scoring_err:
+                    logger.warning("[MyraAgent] Scoring failed for item %s: %s", item.id, scoring_err)
+                    scoring_failures += 1
+                    record.set_components(dict(_ZERO_COMPONENTS), 0.0)
+            records.append(record)
+            if item_debug:
+                components = record.components
+                logger.debug(
+                    "[MyraAgent] Score for item %s: %.2f (occasion=%.2f, style=%.2f, favorite=%.2f, avoid_penalty=%.2f, weather=%.2f)",
+                    item.id,
+                    record.total,
+                    components["occasion"],
+                    components["style"],
+                    components["favorite"],
+                    components["avoid_penalty"],
+                    components["weather"],
+                )
+
+        # Sort by score descending (stable: ties keep wardrobe order)
+        records.sort(key=lambda r: r.total, reverse=True)
+        clock.lap("scoring")
+        event["scores"] = _score_summary(records, scoring_failures)
+
+        # Separate into rough categories, keeping score order
+        buckets: Dict[str, List[_ItemRecord]] = {"top": [], "bottom": [], "shoe": [], "jacket": [], "other": []}
+        for record in records:
+            buckets[record.category].append(record)
+        event["categories"] = {name: len(bucket) for name, bucket in buckets.items() if bucket}
+
+        tops, bottoms, shoes, jackets = buckets["top"], buckets["bottom"], buckets["shoe"], buckets["jacket"]
+
+        # Phase 5C: Search outfit combinations (top + bottom + shoe, plus a jacket
+        # when cold) over the whole wardrobe, best total score first. Outfits
+        # without avoided colors come before any outfit containing one.
+        cold = ctx.weather.band == "cold"
+        slots = [tops, bottoms, shoes]
+        if cold and jackets:
+            slots.append(jackets)
+        num_outfits = request.num_outfits
+        outfits: List[List[_ItemRecord]] = []
+        if tops and bottoms and shoes:
+            outfits = _rank_outfits(slots, num_outfits)
+
+        selection = "candidates" if outfits else "simple_fallback"
+        AGENT_RESULTS.inc(selection=selection)
+        if not outfits:
+            # Fallback: simple selection from whatever categories exist. Preference
+            # ranking (Phase 5A) only decides which item each category offers here:
+            # stable re-sort by the preference-only total, ties keep the score order.
+            # The combination search above ranks by total score itself.
+            if ctx.active:
+                for bucket in (tops, bottoms, shoes, jackets):
+                    bucket.sort(key=lambda r: -r.preference_total)
+            chosen: List[_ItemRecord] = []
             if tops:
-                chosen_items.append(tops[0][1])
+                chosen.append(tops[0])
             if bottoms:
-                chosen_items.append(bottoms[0][1])
+                chosen.append(bottoms[0])
             if shoes:
-                chosen_items.append(shoes[0][1])
-            if temp_f is not None and temp_f <= 55 and jackets:
-                chosen_items.append(jackets[0][1])
-            if not chosen_items:
-                chosen_items = [item for _, item in scored_items[:3]]
-            
-            for item in chosen_items:
-                if item.id in item_score_details:
-                    item_scores_final[item.id] = item_score_details[item.id]
-                else:
-                    _, comp = self._score_item(item, preferences, temp_f, weather_dict)
-                    item_scores_final[item.id] = comp
-        else:
-            # Score each candidate outfit
-            scored_candidates = []
-            for outfit_items, _, _ in candidate_outfits:
-                base_outfit_score = 0.0
-                has_avoided_colors = False
-                combined_components: Dict[str, Dict[str, float]] = {}
-                
-                for item in outfit_items:
-                    components = item_score_details.get(item.id)
-                    if not components:
-                        _, components = self._score_item(item, preferences, temp_f, weather_dict)
-                    combined_components[item.id] = components
-                    base_outfit_score += components.get("total", 0.0)
-                    if components.get("avoid_penalty", 0.0) < 0:
-                        has_avoided_colors = True
-                
-                scored_candidates.append((
-                    outfit_items,
-                    base_outfit_score,
-                    has_avoided_colors,
-                    combined_components,
-                    base_outfit_score,
-                ))
-            
-            # Sort candidates: prefer outfits without avoided colors, then by score
-            scored_candidates.sort(key=lambda x: (x[2], -x[1]))  # has_avoided_colors (False first), then -score (higher first)
-            
-            # Select best outfit
-            best_outfit = scored_candidates[0]
-            chosen_items = best_outfit[0]
-            item_scores_final = best_outfit[3]
+                chosen.append(shoes[0])
+            if cold and jackets:
+                chosen.append(jackets[0])
+            if not chosen:
+                chosen = records[:3]
+            outfits = [chosen]
+        clock.lap("selection")
         
-        selected_with_scores = []
-        for item in chosen_items:
-            comp = item_scores_final.get(item.id) or item_score_details.get(item.id) or {}
-            selected_with_scores.append(f"{item.id}:{comp.get('total', 0.0):.2f}")
-        logger.info("[MyraAgent] Selected outfit items with scores: %s", ", ".join(selected_with_scores))
-        
-        # Enhanced logging for preference scores - detailed breakdown (Phase 5C)
-        if preferences:
-            # Log preference summary
-            logger.info(
-                "[MyraAgent] Preferences: occasion=%s, style_vibe=%s, prefer_favorites=%s, avoid_colors=%s",
-                preferences.get('occasion'),
-                preferences.get('style_vibe'),
-                preferences.get('prefer_favorites'),
-                preferences.get('avoid_colors'),
-            )
-            
-            # Ensure we have scores for all selected items
-            final_item_scores = item_scores_final.copy()
-            for item in chosen_items:
-                if item.id not in final_item_scores:
-                    _, comp = self._score_item(item, preferences, temp_f, weather_dict)
-                    final_item_scores[item.id] = comp
-            
-            # Log detailed per-item scores - one log line per item for clarity
-            for item in chosen_items:
-                item_id = item.id
-                scores = final_item_scores.get(item_id, {})
-                logger.info(
-                    "[MyraAgent] Preference score for item %s: total=%.2f, occasion=%.2f, style=%.2f, favorite=%.2f, avoid_penalty=%.2f, weather=%.2f",
-                    item_id,
-                    float(scores.get("total", 0.0)),
-                    float(scores.get("occasion", 0.0)),
-                    float(scores.get("style", 0.0)),
-                    float(scores.get("favorite", 0.0)),
-                    float(scores.get("avoid_penalty", 0.0)),
-                    float(scores.get("weather", 0.0)),
-                )
+        event["selection"] = selection
+        event["outfits"] = len(outfits)
+        event["selected"] = [{"id": record.item.id, **record.components} for record in outfits[0]]
+        log_event(logger, "suggest_outfit", **event)
+
+        # Explanations and item details only for the returned outfits, at the requested level
+        loc_name = getattr(location, "name", None) if location else None
+        detail_level = request.detail_level
+        return RecommendResponse(
+            outfits=[self._build_outfit(outfit, temp_f, loc_name, detail_level) for outfit in outfits],
+            context={
+                "location": location.dict() if hasattr(location, "dict") else location,
+                "weather": weather.dict() if hasattr(weather, "dict") else weather,
+            },
+            used_memory=False,
+        )
 
-        # Build items_detail payload
+    def _build_outfit(
+        self,
+        chosen: List[_ItemRecord],
+        temp_f: Optional[float],
+        loc_name: Optional[str],
+        detail_level: str = "full",
+    ) -> Dict[str, Any]:
+        """
+        Outfit payload for the request's detail_level: item ids only ("ids"),
+        plus the human-readable 'why' ("summary"), plus items_detail ("full").
+        Text and WardrobeItem models are only built for the levels that return them.
+        """
+        item_ids = [record.item.id for record in chosen]
+        if detail_level == "ids":
+            return {"items": item_ids, "why": ""}
+        if detail_level == "summary":
+            return {"items": item_ids, "why": self._outfit_why([record.item for record in chosen], temp_f, loc_name)}
+
+        # Materialize full WardrobeItem models for the chosen items only
+        chosen_items = [record.item.to_model() for record in chosen]
         items_detail = []
-        favorite_count = 0
         for item in chosen_items:
-            if item.isFavorite:
-                favorite_count += 1
             # Prefer cleanImageUrl if available
             img = item.cleanImageUrl or item.imageUrl
             items_detail.append({
@@ -799,6 +1041,21 @@ class MyraAgent:
                 "isFavorite": bool(item.isFavorite),
             })
 
+        return {
+            "items": item_ids,
+            "why": self._outfit_why(chosen_items, temp_f, loc_name),
+            "items_detail": items_detail,
+        }
+
+    def _outfit_why(
+        self,
+        chosen_items: List[WardrobeItem],
+        temp_f: Optional[float],
+        loc_name: Optional[str],
+    ) -> str:
+        """The 'why' explanation: weather/location context, the picked pieces, favorites."""
+        favorite_count = sum(1 for item in chosen_items if item.isFavorite)
+
         # Build explanation with detailed item descriptions
         item_descriptions = []
         for item in chosen_items:
@@ -817,7 +1074,6 @@ class MyraAgent:
                 pieces_str = ", ".join(item_descriptions[:-1]) + f", and {item_descriptions[-1]}"
         
         # Build weather/location context
-        loc_name = getattr(location, "name", None) if location else None
         temp_str = f"{temp_f:.0f}°F" if temp_f is not None else None
         
         # Determine temperature description
@@ -868,20 +1124,7 @@ class MyraAgent:
         why = ". ".join(why_parts) + "."
         
         # Clean up any double spaces or awkward punctuation
-        why = why.replace("  ", " ").replace("..", ".").strip()
-
-        return RecommendResponse(
-            outfits=[{
-                "items": [item.id for item in chosen_items],
-                "why": why,
-                "items_detail": items_detail,
-            }],
-            context={
-                "location": location.dict() if hasattr(location, "dict") else location,
-                "weather": weather.dict() if hasattr(weather, "dict") else weather,
-            },
-            used_memory=False,
-        )
+        return why.replace("  ", " ").replace("..", ".").strip()
 
 # Phase 6B scoring summary:
 # - Occasion/style matches add up to +3 points each for exact matches (+2 for partials).
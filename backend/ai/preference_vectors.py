@@ -0,0 +1,160 @@
+# ai/preference_vectors.py
+# Vectorized item scoring for MyraAgent (AI_AGENT_VECTOR_SCORING=true).
+#
+# A user's wardrobe is encoded once per wardrobe version as WardrobeColumns
+# (services/wardrobe_columns.py) and cached per user:
+#
+#   category       — agent category (top | bottom | shoe | jacket | other)
+#   vibe           — normalized styleVibe string     (style exact/contains)
+#   tags           — lowercased item tags            (occasion partial match)
+#   style_tags     — lowercased style_tags           (style partial match)
+#   occasions      — lowercased occasionTags         (occasion exact match)
+#   colors         — color + colors, lowercased/stripped (avoid_colors)
+#   favorite       — bool per item
+#   weather_traits — services/weather_context.item_traits bits per item
+#
+# A request's preferences become boolean masks over each vocabulary (the
+# substring tests run once per distinct value, not once per item tag), and
+# every component is then computed for all items with a few NumPy operations;
+# the weather bonus is a lookup in the request's compiled table by
+# (category, traits). The result matches MyraAgent._preference_scores and
+# _weather_bonus, which remain the reference.
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.item_classifier import agent_category
+from services.wardrobe_columns import WardrobeColumns, cached_columns
+from services.weather_context import TRAIT_COMBINATIONS, WeatherContext, item_traits
+
+_ItemKey = Tuple[Any, ...]
+
+def _lowered(values: Optional[Sequence[str]]) -> list:
+    return [v.lower() for v in (values or [])]
+
+
+def _item_key(item: Any) -> _ItemKey:
+    """The item fields scoring reads; a change means a new wardrobe version."""
+    return (
+        item.id,
+        item.type,
+        item.category,
+        item.fabric,
+        tuple(item.tags or ()),
+        tuple(item.style_tags or ()),
+        tuple(item.occasionTags or ()),
+        tuple(item.styleVibe) if isinstance(item.styleVibe, list) else item.styleVibe,
+        item.color,
+        tuple(item.colors or ()),
+        bool(item.isFavorite),
+    )
+
+
+def _vibe(value: Any) -> str:
+    if not value:
+        return ""
+    if isinstance(value, list):
+        return " ".join([str(s).lower() for s in value])
+    return str(value).lower()
+
+
+def build_columns(items: Sequence[Any]) -> WardrobeColumns:
+    """Encode agent items (_AgentItem / WardrobeItem) in request order."""
+    tags = [_lowered(item.tags) for item in items]
+    style_tags = [_lowered(item.style_tags) for item in items]
+    types = [(item.type or "").lower() for item in items]
+    colors = []
+    for item in items:
+        color = (item.color or "").lower().strip()
+        item_colors = [c.lower().strip() for c in (item.colors or []) if c]
+        colors.append(set(filter(None, [color] + item_colors)))
+    return WardrobeColumns(
+        ids=[item.id for item in items],
+        categorical={
+            "category": [
+                agent_category(item_type, (item.category or "").lower(), tuple(item_tags))
+                for item_type, item, item_tags in zip(types, items, tags)
+            ],
+            "vibe": [_vibe(item.styleVibe) for item in items],
+        },
+        multi={
+            "tags": tags,
+            "style_tags": style_tags,
+            "occasions": [set(_lowered(item.occasionTags)) for item in items],
+            "colors": colors,
+        },
+        numeric={
+            "favorite": [bool(item.isFavorite) for item in items],
+            "weather_traits": [
+                item_traits(item_type, (item.fabric or "").lower(), item_tags, item_style_tags)
+                for item_type, item, item_tags, item_style_tags in zip(types, items, tags, style_tags)
+            ],
+        },
+        numeric_dtypes={"favorite": bool, "weather_traits": np.uint8},
+    )
+
+
+def agent_columns(user_id: str, items: Sequence[Any]) -> WardrobeColumns:
+    """The user's encoded wardrobe, rebuilt only when a scored field of any item changed."""
+    return cached_columns(user_id, "agent", items, _item_key, build_columns)
+
+
+def _substring_either(pref: str, term: str) -> bool:
+    return pref in term or term in pref
+
+
+def preference_scores(
+    cols: WardrobeColumns,
+    occasion: Optional[str],
+    style: Optional[str],
+    avoid_colors: Optional[set],
+    prefer_favorites: bool,
+) -> Dict[str, np.ndarray]:
+    """
+    Component arrays (total, occasion, style, favorite, avoid_penalty) for
+    already-normalized preferences, as in _ScoringContext.
+    """
+    zeros = np.zeros(cols.n_items)
+    occasion_score = style_score = favorite_score = avoid_penalty = zeros
+    tags, style_tags = cols.multi["tags"], cols.multi["style_tags"]
+
+    if occasion:
+        exact = cols.multi["occasions"].any(occasion.__eq__, ("eq", occasion))
+        partial = tags.any(lambda tag: _substring_either(occasion, tag), ("sub", occasion))
+        occasion_score = np.where(exact, 3.0, np.where(partial, 2.0, 0.0))
+
+    if style:
+        vibe = cols.cat["vibe"]
+        vibe_eq = vibe.equals(style)
+        vibe_in = vibe.where(lambda v: style in v, ("in", style))
+        partial = (
+            tags.any(lambda tag: _substring_either(style, tag), ("sub", style))
+            | style_tags.any(lambda tag: _substring_either(style, tag), ("sub", style))
+        )
+        style_score = np.where(vibe_eq, 3.0, np.where(vibe_in | partial, 2.0, 0.0))
+
+    if prefer_favorites:
+        favorite_score = np.where(cols.num["favorite"], 4.0, 0.0)
+
+    if avoid_colors:
+        avoided = cols.multi["colors"].any_of(frozenset(avoid_colors))
+        avoid_penalty = np.where(avoided, -100.0, 0.0)
+
+    return {
+        "total": occasion_score + style_score + favorite_score + avoid_penalty,
+        "occasion": occasion_score,
+        "style": style_score,
+        "favorite": favorite_score,
+        "avoid_penalty": avoid_penalty,
+    }
+
+
+def weather_bonus(cols: WardrobeColumns, weather: WeatherContext) -> np.ndarray:
+    """MyraAgent._weather_bonus for every item: the request's bonus table indexed by (category, traits)."""
+    category = cols.cat["category"]
+    table = np.array(
+        [weather.agent_tables[value] for value in category.values], dtype=float
+    ).reshape(len(category.values), TRAIT_COMBINATIONS)
+    return table[category.codes, cols.num["weather_traits"]]
@@ -1,8 +1,14 @@
 # app.py
 import os
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Header, Depends
+import json
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Header, Depends, Query, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pathlib import Path
 
 # Load environment variables from .env
@@ -17,6 +23,8 @@ from schemas.models import (
     RecommendResponse,
     ProcessItemRequest,
     ProcessItemResponse,
+    ProcessItemsBatchRequest,
+    ProcessItemJob,
     RemoveBgRequest,
     RemoveBgResponse,
     GenerateOutfitsRequest,
@@ -24,16 +32,101 @@ from schemas.models import (
     GenerateOutfitsOutfit,
     AvatarMappingRequest,
     AvatarMappingResult,
+    AvatarMappingBatchRequest,
+    AvatarMappingBatchEntry,
+    AvatarMappingBatchResponse,
     AvatarPalette,
     AvatarRenderHints,
+    SimilarItemMatch,
+    SimilarItemsRequest,
+    SimilarItemsResponse,
 )
 from ai.agent import MyraAgent
-from db.mongo import get_db
-from services.process_item import process_item, remove_bg_only, VisionFailedError
+from db.mongo import (
+    DB_CONNECT_RETRIES,
+    db_initialized,
+    get_db,
+    get_items_by_ids,
+    get_user_wardrobe,
+    save_avatar_mappings,
+    save_embeddings,
+)
+from services.process_item import process_item, remove_bg_only, warm_up, VisionFailedError
+from services.batch_process import process_items_batch
+from services.jobs import get_job_runner, TERMINAL_STATUSES
+from services.executors import AI_CPU_POOL_MODE, AI_CPU_POOL_SIZE, get_io_pool, run_io, shutdown_executors
+from services.admission import AdmissionMiddleware, get_admission_controller
+from services.metrics import Counter, MetricsMiddleware, render as render_metrics
+from services.structured_log import RequestContextMiddleware, setup_logging, shutdown_logging
 from services.generate_outfits import generate_outfits
-from services.avatar_mapping import map_item_to_avatar, map_item_profile_to_avatar
+from services.avatar_mapping import (
+    AVATAR_MAPPING_VERSION,
+    avatar_args_from_profile,
+    avatar_mapping_key,
+    map_item_to_avatar,
+    map_item_to_avatar_cached,
+    is_avatar_mapped,
+    map_item_profile_to_avatar,
+)
+
+setup_logging()
+
+# Background warm-up of rembg/onnxruntime, openai, boto3 and the CPU pool after startup.
+AI_WARMUP = os.getenv("AI_WARMUP", "true").lower() not in ("false", "0", "no")
+
+# Startup progress for /readyz: "pending" | "ready" | "failed: ..." per step.
+_startup_state: dict = {"db": "pending", "warmup": "pending" if AI_WARMUP else "disabled"}
+
+
+async def _connect_db() -> None:
+    try:
+        db = await run_io(get_db, DB_CONNECT_RETRIES)
+        _startup_state["db"] = getattr(db, "database_type", "ready")
+    except Exception as e:
+        _startup_state["db"] = f"failed: {e}"
+        print(f"[Startup] DB init failed: {e}")
+
 
-app = FastAPI(title="MYRA AI Backend", version="0.1.0")
+async def _warm_up() -> None:
+    started = time.perf_counter()
+    workers = AI_CPU_POOL_SIZE if AI_CPU_POOL_MODE == "process" else 1
+    try:
+        status = await run_io(warm_up, workers)
+    except Exception as e:
+        _startup_state["warmup"] = f"failed: {e}"
+        print(f"[Startup] Warm-up failed: {e}")
+        return
+    _startup_state["warmup"] = status
+    print(f"[Startup] Warm-up done in {time.perf_counter() - started:.1f}s: {_startup_state['warmup']}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Nothing blocks the server from accepting connections: /livez answers at once,
+    # /readyz turns 200 when the DB is settled. Warm-up only shortens first requests.
+    tasks = [asyncio.create_task(_connect_db())]
+    if AI_WARMUP:
+        tasks.append(asyncio.create_task(_warm_up()))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        shutdown_executors()
+        shutdown_logging()
+
+
+app = FastAPI(title="MYRA AI Backend", version="0.1.0", lifespan=lifespan)
+
+# Backpressure: per-route-class concurrency limits with bounded queues (503 + Retry-After
+# when full). Added before CORS so rejections still carry CORS headers.
+app.add_middleware(AdmissionMiddleware)
+# Wraps admission, so request latency includes admission queueing. Middleware added
+# later wraps this one (the last added runs outermost): RequestContext and CORS are
+# outside the timed span.
+app.add_middleware(MetricsMiddleware)
+# Binds X-Request-Id (from Node, or generated) for log records and echoes it back.
+app.add_middleware(RequestContextMiddleware)
 
 # CORS configuration - allow all origins for ngrok/dev use
 app.add_middleware(
@@ -44,26 +137,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize agent
-_agent = MyraAgent()
+AVATAR_BATCH_ENTRIES = Counter(
+    "ai_avatar_mapping_batch_entries_total",
+    "/avatar-mapping/batch entries by source (stored = current stored mapping reused, computed).",
+    ("source",),
+)
+
+_agent = None
+
+
+def _get_agent() -> MyraAgent:
+    """Agent singleton, created on first use."""
+    global _agent
+    if _agent is None:
+        _agent = MyraAgent()
+    return _agent
 
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "MYRA AI backend is running"}
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint. Returns { ok: true } for Node warmup and health checks."""
-    db = get_db()
+    db = await run_io(get_db)
     
     # Check database type
     if hasattr(db, 'database_type'):
         db_type = db.database_type
         if db_type == "mongo":
             try:
-                db.client.admin.command('ping')
+                await run_io(db.client.admin.command, 'ping')
                 return {"ok": True, "status": "healthy", "database": "mongo"}
             except Exception as e:
                 raise HTTPException(status_code=503, detail=f"DB down: {e}")
@@ -72,14 +178,44 @@ async def health():
     return {"ok": True, "status": "healthy", "database": "mock"}
 
 
+@app.get("/livez")
+async def livez():
+    """Liveness: the process and event loop are responsive. No dependency checks."""
+    return {"ok": True}
+
+
+@app.get("/readyz")
+async def readyz():
+    """
+    Readiness: 200 once the DB connection (or MockDB fallback) is settled, else 503.
+    Warm-up progress is reported but does not gate readiness.
+    """
+    body = {"ok": db_initialized(), **_startup_state}
+    if not body["ok"]:
+        raise HTTPException(status_code=503, detail=body)
+    return body
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus text-format metrics (latency histograms, stage timers, LLM usage, caches, admission)."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/admission")
+async def admission_stats():
+    """Admission-control counters: active/queued/admitted/rejected per route class."""
+    return get_admission_controller().stats()
+
+
 @app.post("/suggest_outfit", response_model=RecommendResponse)
-def suggest_outfit(req: SuggestRequest):
+async def suggest_outfit(req: SuggestRequest):
     """
     Lightweight suggest endpoint for outfit recommendations.
     Requires: user_id, location, weather
     """
     try:
-        return _agent.suggest_outfit(req)
+        return await run_io(_get_agent().suggest_outfit, req)
     except Exception as e:
         print(f"[API] Error in suggest_outfit: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -89,7 +225,7 @@ def suggest_outfit(req: SuggestRequest):
 INTERNAL_TOKEN = os.getenv("INTERNAL_TOKEN")
 
 
-def _require_internal_token(x_internal_token: str | None = Header(None, alias="X-Internal-Token")):
+async def _require_internal_token(x_internal_token: str | None = Header(None, alias="X-Internal-Token")):
     """If INTERNAL_TOKEN is set, require X-Internal-Token header."""
     if INTERNAL_TOKEN and x_internal_token != INTERNAL_TOKEN:
         raise HTTPException(status_code=401, detail="Invalid or missing X-Internal-Token")
@@ -97,7 +233,7 @@ def _require_internal_token(x_internal_token: str | None = Header(None, alias="X
 
 # --- Phase 3C: Text-only outfit generation (no images) ---
 @app.post("/generate-outfits", response_model=GenerateOutfitsResponse)
-def generate_outfits_endpoint(req: GenerateOutfitsRequest):
+async def generate_outfits_endpoint(req: GenerateOutfitsRequest):
     """
     Generate up to 3 outfits from wardrobe items (id + profile only).
     No images, no Vision. Uses OpenAI TEXT when key present; else deterministic fallback.
@@ -105,7 +241,8 @@ def generate_outfits_endpoint(req: GenerateOutfitsRequest):
     items = [{"id": it.id, "profile": it.profile} for it in req.items]
     location = req.location.model_dump() if req.location else None
     weather = req.weather.model_dump() if req.weather else None
-    outfits = generate_outfits(
+    outfits = await run_io(
+        generate_outfits,
         items=items,
         occasion=req.occasion,
         location=location,
@@ -117,7 +254,7 @@ def generate_outfits_endpoint(req: GenerateOutfitsRequest):
 
 
 @app.post("/avatar-mapping", response_model=AvatarMappingResult)
-def avatar_mapping_endpoint(req: AvatarMappingRequest):
+async def avatar_mapping_endpoint(req: AvatarMappingRequest):
     """
     V1 Avatar Fabric/Material Mapping.
 
@@ -128,13 +265,16 @@ def avatar_mapping_endpoint(req: AvatarMappingRequest):
     Accepts either individual fields OR a full ItemProfile dict via `profile`.
     Individual fields take precedence over profile values when both are provided.
     """
-    # Merge profile dict with top-level fields (individual fields win)
+    result = map_item_to_avatar_cached(**_avatar_mapping_args(req))
+    return _avatar_mapping_result(result)
+
+
+def _avatar_mapping_args(req: AvatarMappingRequest) -> dict:
+    """Merge profile dict with top-level fields (individual fields win)."""
     base: dict = {}
     if req.profile:
         base = dict(req.profile)
 
-    category   = req.category   or base.get("category")
-    type_      = req.type       or base.get("type")
     # Primary color: check all known field names in priority order.
     # Bug that caused palette.primary=null: endpoint only checked req.primaryColor
     # and base["primaryColor"], but curl callers and the Node wardrobe model send
@@ -146,32 +286,25 @@ def avatar_mapping_endpoint(req: AvatarMappingRequest):
                   or base.get("primaryColor")
                   or base.get("color")
                   or base.get("color_name"))
-    secondary  = req.secondaryColor or base.get("secondaryColor")
-    pattern    = req.pattern    or base.get("pattern")
-    material   = req.material   or base.get("material") or base.get("fabric")
-    fit        = req.fit        or base.get("fit")
-    key_details = req.keyDetails or base.get("keyDetails") or []
-
-    result = map_item_to_avatar(
-        category=category,
-        type_=type_,
+    return dict(
+        category=req.category or base.get("category"),
+        type_=req.type or base.get("type"),
         primary_color=primary,
-        secondary_color=secondary,
-        pattern=pattern,
-        material=material,
-        fit=fit,
-        key_details=key_details,
+        secondary_color=req.secondaryColor or base.get("secondaryColor"),
+        pattern=req.pattern or base.get("pattern"),
+        material=req.material or base.get("material") or base.get("fabric"),
+        fit=req.fit or base.get("fit"),
+        key_details=req.keyDetails or base.get("keyDetails") or [],
     )
 
+
+def _avatar_mapping_result(result: dict) -> AvatarMappingResult:
     return AvatarMappingResult(
         avatarCategory=result["avatarCategory"],
         avatarAssetFamily=result["avatarAssetFamily"],
         materialPreset=result["materialPreset"],
         patternPreset=result["patternPreset"],
-        palette=AvatarPalette(
-            primary=result["palette"]["primary"],
-            secondary=result["palette"]["secondary"],
-        ),
+        palette=AvatarPalette(**result["palette"]),
         fitPreset=result["fitPreset"],
         renderHints=AvatarRenderHints(**result["renderHints"]),
         inputCategory=result["inputCategory"],
@@ -179,8 +312,120 @@ def avatar_mapping_endpoint(req: AvatarMappingRequest):
     )
 
 
+@app.post("/avatar-mapping/batch", response_model=AvatarMappingBatchResponse)
+async def avatar_mapping_batch_endpoint(req: AvatarMappingBatchRequest, background_tasks: BackgroundTasks):
+    """
+    Batch avatar mapping for an outfit or a whole wardrobe.
+
+    Either `items` (each shaped like /avatar-mapping's body) or `userId` + `itemIds`
+    (loaded via get_items_by_ids; missing IDs are reported in `missingIds`).
+    Identical attribute tuples are mapped once and shared across entries.
+
+    Stored items whose avatarMapping matches AVATAR_MAPPING_VERSION are returned as-is;
+    missing or stale mappings are recomputed and written back after the response.
+    """
+    stored: dict = {}
+    remap: set = set()  # stored items whose mapping is missing or stale; written back below
+    if req.items:
+        sources = [(None, _avatar_mapping_args(it)) for it in req.items]
+        missing: list = []
+    elif req.userId and req.itemIds:
+        found = {str(it.get("id")): it for it in await run_io(get_items_by_ids, req.userId, req.itemIds)}
+        sources = []
+        for item_id in req.itemIds:
+            item = found.get(item_id)
+            if item is None:
+                continue
+            # v1 items keep their attributes in the locked profile; legacy items top-level.
+            profile = {**item, **(item.get("profile") or {})}
+            sources.append((item_id, avatar_args_from_profile(profile)))
+            if item.get("avatarMapping") and item.get("avatarMappingVersion") == AVATAR_MAPPING_VERSION:
+                stored[item_id] = item["avatarMapping"]
+            elif is_avatar_mapped(profile):
+                remap.add(item_id)
+        missing = [i for i in req.itemIds if i not in found]
+    else:
+        raise HTTPException(status_code=400, detail="Provide items, or userId and itemIds")
+
+    by_key: dict = {}
+    mappings = []
+    stale: list = []
+    for index, (item_id, args) in enumerate(sources):
+        if item_id in stored:
+            try:
+                mapping = AvatarMappingResult.model_validate(stored[item_id])
+                mappings.append(AvatarMappingBatchEntry(index=index, itemId=item_id, mapping=mapping))
+                AVATAR_BATCH_ENTRIES.inc(source="stored")
+                continue
+            except Exception:
+                pass  # malformed stored value — recompute below
+        AVATAR_BATCH_ENTRIES.inc(source="computed")
+        key = avatar_mapping_key(**args)
+        if key not in by_key:
+            raw = map_item_to_avatar_cached(**args)
+            by_key[key] = (raw, _avatar_mapping_result(raw))
+        raw, mapping = by_key[key]
+        mappings.append(AvatarMappingBatchEntry(index=index, itemId=item_id, mapping=mapping))
+        if item_id in remap:
+            # The same mapping the response carries; the write-back does not map again.
+            stale.append((item_id, raw))
+
+    if stale:
+        print(f"[API] avatar-mapping/batch re-mapping {len(stale)} stale item(s) for userId={req.userId}")
+        background_tasks.add_task(run_io, save_avatar_mappings, stale, AVATAR_MAPPING_VERSION)
+
+    return AvatarMappingBatchResponse(mappings=mappings, missingIds=missing, uniqueMappings=len(by_key))
+
+
+@app.post("/items/similar", response_model=SimilarItemsResponse)
+async def similar_items_endpoint(req: SimilarItemsRequest, background_tasks: BackgroundTasks):
+    """
+    Items similar to one wardrobe item, or pairing candidates per complementary
+    category, by item-embedding cosine similarity (services/embeddings.py).
+
+    The user's index is cached until the wardrobe changes. Items without a
+    current-version embedding are embedded from their profile and written back
+    after the response.
+    """
+    wardrobe = await run_io(get_user_wardrobe, req.userId)
+    items = [it for it in wardrobe if it.get("id") is not None]
+    if not any(str(it["id"]) == req.itemId for it in items):
+        raise HTTPException(status_code=404, detail="Item not found for user")
+    response, stale = await run_io(_similar_items, req, items)
+    if stale:
+        print(f"[API] items/similar embedding {len(stale)} item(s) for userId={req.userId}")
+        background_tasks.add_task(run_io, save_embeddings, stale, response.embeddingVersion)
+    return response
+
+
+def _similar_items(req: SimilarItemsRequest, items: list):
+    from services.embeddings import embedding_version, encode_embedding, user_index
+
+    version = embedding_version()
+    index = user_index(req.userId, items)
+
+    def matches(pairs):
+        return [
+            SimilarItemMatch(id=item_id, score=round(score, 4), category=index.categories[index.position[item_id]])
+            for item_id, score in pairs
+        ]
+
+    response = SimilarItemsResponse(itemId=req.itemId, mode=req.mode, embeddingVersion=version)
+    if req.mode == "pairing":
+        response.pairings = {cat: matches(pairs) for cat, pairs in index.pairings(req.itemId, req.k).items()}
+    else:
+        response.matches = matches(index.similar(req.itemId, req.k, same_category=req.sameCategory))
+
+    stale = [
+        (str(it["id"]), encode_embedding(index.matrix[index.position[str(it["id"])]]))
+        for it in items
+        if it.get("embeddingVersion") != version
+    ]
+    return response, stale
+
+
 @app.post("/remove-bg", response_model=RemoveBgResponse, dependencies=[Depends(_require_internal_token)])
-def remove_bg_endpoint(req: RemoveBgRequest):
+async def remove_bg_endpoint(req: RemoveBgRequest):
     """
     Lightweight background-removal only. No Vision AI.
     Used for back images: fetch RAW → rembg → upload CLEAN → return cleanUrl.
@@ -188,7 +433,7 @@ def remove_bg_endpoint(req: RemoveBgRequest):
     """
     print(f"[API] remove-bg for userId={req.userId}")
     try:
-        result = remove_bg_only(req.userId, req.rawUrl)
+        result = await run_io(remove_bg_only, req.userId, req.rawUrl)
         return RemoveBgResponse(**result)
     except Exception as e:
         print(f"[API] remove-bg error: {e}")
@@ -196,7 +441,7 @@ def remove_bg_endpoint(req: RemoveBgRequest):
 
 
 @app.post("/process-item", response_model=ProcessItemResponse, dependencies=[Depends(_require_internal_token)])
-def process_item_endpoint(req: ProcessItemRequest):
+async def process_item_endpoint(req: ProcessItemRequest):
     """
     v1 pipeline: fetch RAW from rawUrl → rembg → upload CLEAN to R2 → OpenAI Vision → return profile.
     Called by Node only (server-to-server).
@@ -204,7 +449,7 @@ def process_item_endpoint(req: ProcessItemRequest):
     # Avoid logging full rawUrl (may contain tokens in some setups)
     print(f"[API] process-item for userId={req.userId}, rawKey={req.rawKey[:50]}..., clothingType={req.clothingType}")
     try:
-        result = process_item(req.userId, req.rawKey, req.rawUrl, clothing_type=req.clothingType)
+        result = await run_io(process_item, req.userId, req.rawKey, req.rawUrl, clothing_type=req.clothingType)
         return ProcessItemResponse(**result)
     except VisionFailedError as e:
         print(f"[API] process-item Vision failed: {e}")
@@ -218,3 +463,96 @@ def process_item_endpoint(req: ProcessItemRequest):
             profile=None,
             failReason=str(e),
         )
+
+
+@app.post("/process-items/batch", dependencies=[Depends(_require_internal_token)])
+async def process_items_batch_endpoint(req: ProcessItemsBatchRequest):
+    """
+    Batch pipeline for multi-photo imports (onboarding: 20–50 photos).
+    Streams NDJSON: one line per item as it completes ({"type": "item", "index", "rawKey",
+    ...ProcessItemResponse fields}), then a final {"type": "summary"} line with
+    ready/failed counts and itemsPerMin. Failed items do not abort the batch.
+    Called by Node only (server-to-server).
+    """
+    print(f"[API] process-items/batch for userId={req.userId}, count={len(req.items)}")
+    entries = [e.model_dump() for e in req.items]
+
+    async def _ndjson():
+        rows = process_items_batch(req.userId, entries)
+        done = object()
+        # next() and close() run on I/O-pool threads; a generator cannot be closed
+        # while another thread is inside next(), so the two are serialized.
+        lock = threading.Lock()
+
+        def _next_row():
+            with lock:
+                return next(rows, done)
+
+        def _close_rows():
+            with lock:
+                rows.close()
+
+        try:
+            while True:
+                # Each next() blocks until the next item completes; wait on the I/O pool.
+                row = await run_io(_next_row)
+                if row is done:
+                    break
+                yield json.dumps(row) + "\n"
+        finally:
+            # Client disconnected or response cancelled: close the batch on the I/O
+            # pool (not awaited — the task may already be cancelled) so queued items
+            # are dropped instead of processed for nobody.
+            get_io_pool().submit(_close_rows)
+
+    return StreamingResponse(_ndjson(), media_type="application/x-ndjson")
+
+
+# --- Async process-item jobs ---
+JOB_MAX_WAIT_S = 30.0
+JOB_POLL_INTERVAL_S = 0.5
+
+
+def _job_response(job: dict, created: bool | None = None) -> ProcessItemJob:
+    return ProcessItemJob(
+        jobId=job["jobId"],
+        rawKey=job["rawKey"],
+        status=job["status"],
+        stage=job.get("stage"),
+        attempts=job.get("attempts") or 0,
+        created=created,
+        result=job.get("result") if job["status"] == "done" else None,
+        failReason=job.get("failReason"),
+        createdAt=job.get("createdAt"),
+        updatedAt=job.get("updatedAt"),
+    )
+
+
+@app.post("/process-item/jobs", response_model=ProcessItemJob, status_code=202, dependencies=[Depends(_require_internal_token)])
+async def process_item_job_endpoint(req: ProcessItemRequest):
+    """
+    Async variant of /process-item: returns a job ID immediately; poll GET /jobs/{jobId}.
+    Idempotent by rawKey — resubmitting returns the existing job (failed jobs are retried
+    from their last completed stage). Called by Node only (server-to-server).
+    """
+    print(f"[API] process-item job for userId={req.userId}, rawKey={req.rawKey[:50]}...")
+    runner = await run_io(get_job_runner)
+    job, created = await run_io(runner.submit, req.userId, req.rawKey, req.rawUrl, req.clothingType)
+    return _job_response(job, created)
+
+
+@app.get("/jobs/{job_id}", response_model=ProcessItemJob, dependencies=[Depends(_require_internal_token)])
+async def get_job_endpoint(job_id: str, wait: float = Query(0, ge=0, le=JOB_MAX_WAIT_S)):
+    """
+    Job status. With ?wait=N (seconds, max 30) long-polls until the job reaches
+    done/failed or the wait expires, then returns the current state.
+    """
+    runner = await run_io(get_job_runner)
+    deadline = time.monotonic() + wait
+    while True:
+        job = await run_io(runner.store.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job["status"] in TERMINAL_STATUSES or time.monotonic() >= deadline:
+            return _job_response(job)
+        await asyncio.sleep(JOB_POLL_INTERVAL_S)
@@ -1,9 +1,9 @@
 import os
 import json
 import datetime
-from typing import Any, Dict, List, Optional, Union
-from pymongo import MongoClient
-from pymongo.errors import PyMongoError
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Union
 from bson import ObjectId
 from dotenv import load_dotenv
 
@@ -13,6 +13,9 @@ load_dotenv()
 MONGODB_URI = os.getenv("MONGODB_URI") or os.getenv("MONGO_URI")  # Support both for backward compat
 MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME") or os.getenv("MONGO_DB", "style_with_ai")
 AI_USE_MOCK_DB = (os.getenv("AI_USE_MOCK_DB", "true").lower() == "true")  # Default to True
+# Startup connection attempts (get_db(retries=...)) before falling back to MockDB
+DB_CONNECT_RETRIES = int(os.getenv("DB_CONNECT_RETRIES", "3"))
+DB_CONNECT_BACKOFF_S = float(os.getenv("DB_CONNECT_BACKOFF_S", "1.0"))
 
 # For backward compatibility
 MONGO_URI = MONGODB_URI
@@ -22,6 +25,7 @@ _client = None
 
 # Module-level DB instance cache
 _db_instance = None
+_db_lock = threading.Lock()
 
 # Mock in-memory database for development/testing when MongoDB is unavailable
 class MockDB:
@@ -102,6 +106,11 @@ class MockCollection:
                 if 'turns' not in doc:
                     doc['turns'] = []
                 doc['turns'].append(update_ops['$push']['turns'])
+        elif self.name == 'wardrobe':
+            for item in self.collections[self.name]:
+                if item.get('id') == query.get('id'):
+                    item.update(update_ops.get('$set', {}))
+                    break
         elif self.name == 'user_profile':
             user_id = query.get('_id')
             if '$set' in update_ops:
@@ -120,6 +129,10 @@ class MongoDB:
     """MongoDB wrapper class that provides interface compatible with MockDB."""
     
     def __init__(self, uri: str, db_name: str):
+        # pymongo is imported here, not at module import: it costs ~0.1s and is
+        # not needed at all when running on MockDB.
+        from pymongo import MongoClient
+
         self.client = MongoClient(uri, serverSelectionTimeoutMS=5000)
         self.db = self.client[db_name]
         self.wardrobes = self.db["wardrobes"]
@@ -259,6 +272,13 @@ class MongoDB:
             "color_type": color_type,
             "fit": fit,
             "style_tags": style_tags if style_tags else None,
+            # v1 locked ItemProfile + ingest-time avatar mapping and embedding
+            # (see services/avatar_mapping, services/embeddings)
+            "profile": doc.get("profile"),
+            "avatarMapping": doc.get("avatarMapping"),
+            "avatarMappingVersion": doc.get("avatarMappingVersion"),
+            "embedding": doc.get("embedding"),
+            "embeddingVersion": doc.get("embeddingVersion"),
             # Backward compatibility fields
             "uri": doc.get("imageUrl") or doc.get("image_url"),
             "image_url": doc.get("imageUrl") or doc.get("image_url"),
@@ -412,42 +432,64 @@ def _doc_to_wardrobe_item(doc: dict) -> Dict[str, Any]:
         "image_url": doc.get("imageUrl") or doc.get("image_url"),  # Agent uses this
         "isFavorite": doc.get("isFavorite", False),
         "tags": doc.get("tags", []),
+        "profile": doc.get("profile"),
+        "avatarMapping": doc.get("avatarMapping"),
+        "avatarMappingVersion": doc.get("avatarMappingVersion"),
+        "embedding": doc.get("embedding"),
+        "embeddingVersion": doc.get("embeddingVersion"),
     }
     
     # Remove None values for cleaner output
     return {k: v for k, v in wardrobe_item.items() if v is not None}
 
-def get_db():
+def get_db(retries: int = 0):
     """
     Get DB instance (cached). Returns either MockDB or MongoDB wrapper.
+
+    The first call connects (thread-safe; concurrent callers wait for it). App
+    startup calls get_db(retries=DB_CONNECT_RETRIES) so a Mongo that is still
+    coming up gets a few attempts, with exponential backoff, before falling back.
     """
     global _db_instance, _client
     
     if _db_instance is not None:
         return _db_instance
-    
-    # Check if we should use mock DB
-    if AI_USE_MOCK_DB or not MONGODB_URI:
-        print("[DB] Using MockDB (AI_USE_MOCK_DB=true or no MONGODB_URI)")
-        _db_instance = MockDB(load_from_file=True)
-        return _db_instance
-    
-    # Try to connect to real MongoDB
-    try:
-        mongodb = MongoDB(MONGODB_URI, MONGODB_DB_NAME)
-        # Test connection
-        mongodb.client.admin.command('ping')
-        _client = mongodb.client
-        _db_instance = mongodb
-        print(f"[DB] Connected to MongoDB: db={MONGODB_DB_NAME}")
-        return _db_instance
-    except (PyMongoError, Exception) as e:
-        print(f"[DB] Failed to connect to MongoDB: {e}")
+
+    with _db_lock:
+        if _db_instance is not None:
+            return _db_instance
+
+        # Check if we should use mock DB
+        if AI_USE_MOCK_DB or not MONGODB_URI:
+            print("[DB] Using MockDB (AI_USE_MOCK_DB=true or no MONGODB_URI)")
+            _db_instance = MockDB(load_from_file=True)
+            return _db_instance
+
+        # Try to connect to real MongoDB
+        for attempt in range(retries + 1):
+            try:
+                mongodb = MongoDB(MONGODB_URI, MONGODB_DB_NAME)
+                # Test connection
+                mongodb.client.admin.command('ping')
+                _client = mongodb.client
+                _db_instance = mongodb
+                print(f"[DB] Connected to MongoDB: db={MONGODB_DB_NAME}")
+                return _db_instance
+            except Exception as e:
+                print(f"[DB] Failed to connect to MongoDB (attempt {attempt + 1}/{retries + 1}): {e}")
+                if attempt < retries:
+                    time.sleep(DB_CONNECT_BACKOFF_S * (2 ** attempt))
+
         print("[DB] Falling back to MockDB")
         _db_instance = MockDB(load_from_file=True)
         return _db_instance
 
 
+def db_initialized() -> bool:
+    """True once get_db() has settled on Mongo or MockDB (readiness)."""
+    return _db_instance is not None
+
+
 def get_user_wardrobe(user_id: str) -> List[Dict[str, Any]]:
     """Get all wardrobe items for a user. Returns list of dicts compatible with WardrobeItem."""
     db = get_db()
@@ -476,6 +518,61 @@ def get_items_by_ids(user_id: str, ids: List[str]) -> List[Dict[str, Any]]:
         return results
 
 
+def _save_item_fields(updates: List[tuple], fields: Callable[[Any], dict], op_name: str) -> int:
+    """Apply fields(value) as an update to each (item_id, value) pair. Returns the number of items written."""
+    if not updates:
+        return 0
+    db = get_db()
+
+    if hasattr(db, 'database_type') and db.database_type == "mongo":
+        from pymongo import UpdateOne
+        from pymongo.errors import PyMongoError
+
+        ops = []
+        for item_id, value in updates:
+            try:
+                ops.append(UpdateOne({"_id": ObjectId(item_id)}, fields(value)))
+            except Exception as e:
+                print(f"[DB] Skipping invalid wardrobe item id '{item_id}': {e}")
+        if not ops:
+            return 0
+        try:
+            db.wardrobes.bulk_write(ops, ordered=False)
+        except PyMongoError as e:
+            print(f"[DB] {op_name} failed: {e}")
+            return 0
+        return len(ops)
+    else:
+        # MockDB
+        for item_id, value in updates:
+            db['wardrobe'].update_one({"id": item_id}, fields(value))
+        return len(updates)
+
+
+def save_avatar_mappings(updates: List[tuple], version: str) -> int:
+    """
+    Write precomputed avatar mappings back to wardrobe items.
+    updates: [(item_id, mapping_dict), ...]. Returns the number of items written.
+    """
+    return _save_item_fields(
+        updates,
+        lambda mapping: {"$set": {"avatarMapping": mapping, "avatarMappingVersion": version}},
+        "save_avatar_mappings",
+    )
+
+
+def save_embeddings(updates: List[tuple], version: str) -> int:
+    """
+    Write item embeddings (base64 float16, services/embeddings) back to wardrobe items.
+    updates: [(item_id, embedding), ...]. Returns the number of items written.
+    """
+    return _save_item_fields(
+        updates,
+        lambda embedding: {"$set": {"embedding": embedding, "embeddingVersion": version}},
+        "save_embeddings",
+    )
+
+
 # Initialize db for backward compatibility
 # This ensures existing imports like "from db.mongo import db" still work
 # The actual instance will be created on first access via get_db()
@@ -26,6 +26,16 @@ const WardrobeSchema = new mongoose.Schema(
       default: null,
     },
 
+    // Avatar mapping precomputed by Python at ingest (top/bottom only) and the
+    // rule-table version it was computed with; Python re-maps stale versions lazily.
+    avatarMapping: { type: mongoose.Schema.Types.Mixed, default: null },
+    avatarMappingVersion: { type: String, default: null },
+
+    // Item embedding from Python at ingest (base64 float16; services/embeddings.py)
+    // and its version. Server-side only: used for similar-item / pairing search.
+    embedding: { type: String, default: null },
+    embeddingVersion: { type: String, default: null },
+
     // Top-level convenience fields for indexing/UI (derived from profile)
     category: { type: String, default: null },
     type: { type: String, default: null },
@@ -98,7 +98,7 @@ router.post('/reasoned_outfits', auth, async (req, res, next) => {
         lockedItemIds: locked.length ? locked : undefined,
       };
       try {
-        const pyRes = await aiService.post('/generate-outfits', payload, { timeout: 25000, maxRetries: 1 });
+        const pyRes = await aiService.post('/generate-outfits', payload, { timeout: 25000, maxRetries: 1, requestId: req.requestId });
         const data = pyRes.data || {};
         const pyOutfits = Array.isArray(data.outfits) ? data.outfits : [];
         if (pyRes.status >= 200 && pyRes.status < 300 && pyOutfits.length > 0) {
@@ -220,7 +220,7 @@ router.post('/suggest_outfit', async (req, res, next) => {
   const hasPreferences = req.body && req.body.preferences;
   aiService.safeLog('AgentRoute', 'Forwarding suggest_outfit', { preferencesPresent: !!hasPreferences });
   try {
-    const response = await aiService.post('/suggest_outfit', req.body);
+    const response = await aiService.post('/suggest_outfit', req.body, { requestId: req.requestId });
     res.status(response.status).json(response.data);
   } catch (err) {
     aiService.safeLog('AgentRoute', 'AI service error', {
@@ -114,7 +114,7 @@ router.post('/upload', auth, upload.single('image'), async (req, res, next) => {
 
     let pyResponse;
     try {
-      pyResponse = await aiService.post('/process-item', { userId, rawKey, rawUrl });
+      pyResponse = await aiService.post('/process-item', { userId, rawKey, rawUrl }, { requestId: req.requestId });
     } catch (err) {
       aiService.safeLog('Wardrobe', 'Python /process-item unreachable', { code: err.code });
       await deleteFromR2({ key: rawKey });
@@ -123,7 +123,10 @@ router.post('/upload', auth, upload.single('image'), async (req, res, next) => {
       return next(e);
     }
 
-    const { status, cleanKey, cleanUrl, profile, failReason } = pyResponse.data || {};
+    const {
+      status, cleanKey, cleanUrl, profile, failReason,
+      avatarMapping, avatarMappingVersion, embedding, embeddingVersion,
+    } = pyResponse.data || {};
     if (status === 'failed') {
       await deleteFromR2({ key: rawKey });
       const e = new Error(failReason || 'Processing failed');
@@ -146,6 +149,10 @@ router.post('/upload', auth, upload.single('image'), async (req, res, next) => {
       category: p.category || p.type || 'top',
       type: p.type || undefined,
       primaryColor: p.primaryColor || undefined,
+      avatarMapping: avatarMapping || null,
+      avatarMappingVersion: avatarMappingVersion || null,
+      embedding: embedding || null,
+      embeddingVersion: embeddingVersion || null,
     });
     await deleteFromR2({ key: rawKey });
 
@@ -158,6 +165,8 @@ router.post('/upload', auth, upload.single('image'), async (req, res, next) => {
         category: doc.category,
         type: doc.type,
         primaryColor: doc.primaryColor,
+        avatarMapping: doc.avatarMapping ?? null,
+        avatarMappingVersion: doc.avatarMappingVersion ?? null,
         isFavorite: Boolean(doc.isFavorite),
         v2: doc.v2 || { userTags: [], overrides: null, availability: { status: 'available', reason: null, untilDate: null } },
       },
@@ -238,10 +247,10 @@ router.post('/items/front-back', auth, upload.fields([
 
     const frontProcessPromise = aiService.post('/process-item', {
       userId, rawKey: frontRawKey, rawUrl: frontRawUrl, clothingType: clothingType || null,
-    });
+    }, { requestId: req.requestId });
 
     const backBgPromise = (backFile && backRawKey && backImageUrl)
-      ? aiService.post('/remove-bg', { userId, rawUrl: backImageUrl }).catch((e) => {
+      ? aiService.post('/remove-bg', { userId, rawUrl: backImageUrl }, { requestId: req.requestId }).catch((e) => {
           console.warn('[FrontBack] back /remove-bg failed (non-fatal):', e?.message);
           return null;
         })
@@ -260,7 +269,10 @@ router.post('/items/front-back', auth, upload.fields([
       });
     }
 
-    const { status, cleanKey, cleanUrl, profile, failReason } = pyResponse.data || {};
+    const {
+      status, cleanKey, cleanUrl, profile, failReason,
+      avatarMapping, avatarMappingVersion, embedding, embeddingVersion,
+    } = pyResponse.data || {};
     console.log('[FrontBack] Python responded', { status, hasCleanUrl: !!cleanUrl });
 
     if (status === 'failed') {
@@ -329,6 +341,10 @@ router.post('/items/front-back', auth, upload.fields([
       category:     resolvedCategory,
       type:         resolvedClothingType || p.type || undefined,
       primaryColor: p.primaryColor || undefined,
+      avatarMapping: avatarMapping || null,
+      avatarMappingVersion: avatarMappingVersion || null,
+      embedding: embedding || null,
+      embeddingVersion: embeddingVersion || null,
     });
     console.log('[FrontBack] DB saved', { itemId: item._id });
 
@@ -380,7 +396,7 @@ router.post('/items', auth, upload.single('image'), async (req, res) => {
     // b) Call Python /process-item (with retries via shared client)
     let pyResponse;
     try {
-      pyResponse = await aiService.post('/process-item', { userId, rawKey, rawUrl });
+      pyResponse = await aiService.post('/process-item', { userId, rawKey, rawUrl }, { requestId: req.requestId });
     } catch (err) {
       aiService.safeLog('Wardrobe', 'Python /process-item unreachable after retries', {
         code: err.code,
@@ -393,7 +409,10 @@ router.post('/items', auth, upload.single('image'), async (req, res) => {
       });
     }
 
-    const { status, cleanKey, cleanUrl, profile, failReason } = pyResponse.data || {};
+    const {
+      status, cleanKey, cleanUrl, profile, failReason,
+      avatarMapping, avatarMappingVersion, embedding, embeddingVersion,
+    } = pyResponse.data || {};
 
     // f) If failed
     if (status === 'failed') {
@@ -423,6 +442,10 @@ router.post('/items', auth, upload.single('image'), async (req, res) => {
       category: p.category || p.type || 'top',
       type: p.type || undefined,
       primaryColor: p.primaryColor || undefined,
+      avatarMapping: avatarMapping || null,
+      avatarMappingVersion: avatarMappingVersion || null,
+      embedding: embedding || null,
+      embeddingVersion: embeddingVersion || null,
     });
 
     // Delete RAW (best-effort)
@@ -604,6 +627,8 @@ router.get('/', auth, async (req, res, next) => {
       category: item.category ?? null,
       type: item.type ?? null,
       primaryColor: item.primaryColor ?? null,
+      avatarMapping: item.avatarMapping ?? null,
+      avatarMappingVersion: item.avatarMappingVersion ?? null,
       isFavorite: Boolean(item.isFavorite),
       v2: item.v2
         ? {
@@ -714,6 +739,8 @@ router.patch('/:id/v2', auth, async (req, res, next) => {
         category: doc.category,
         type: doc.type,
         primaryColor: doc.primaryColor,
+        avatarMapping: doc.avatarMapping ?? null,
+        avatarMappingVersion: doc.avatarMappingVersion ?? null,
         isFavorite: Boolean(doc.isFavorite),
         v2: doc.v2 || { userTags: [], overrides: null, availability: { status: 'available', reason: null, untilDate: null } },
       },
@@ -1,5 +1,5 @@
 # schemas/models.py
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from pydantic import BaseModel, Field, field_validator
 
 
@@ -66,6 +66,11 @@ class SuggestRequest(BaseModel):
     location: Location = Field(..., description="Location (lat/lon) used to fetch weather if needed")
     weather: Weather = Field(..., description="Current weather summary and numeric fields")
     preferences: Optional[Preferences] = Field(None, description="Optional user preferences for outfit selection")
+    num_outfits: int = Field(1, ge=1, le=10, description="Number of ranked alternative outfits to return")
+    detail_level: Literal["ids", "summary", "full"] = Field(
+        "full",
+        description="Per-outfit payload: item ids only, ids + 'why', or ids + 'why' + items_detail",
+    )
 
 
 class Outfit(BaseModel):
@@ -216,6 +221,49 @@ class ProcessItemResponse(BaseModel):
     cleanUrl: Optional[str] = None
     profile: Optional[Dict[str, Any]] = None
     failReason: Optional[str] = None
+    cached: bool = False  # True when served from the content-hash cache (no rembg/Vision)
+    timings: Optional[Dict[str, float]] = None  # per-stage latency in ms (fetch, cache, rembg, upload, vision, total)
+    # Ingest-time avatar mapping (AvatarMappingResult shape; top/bottom only) and the
+    # rule-table version it was computed with. Node stores both on the wardrobe item.
+    avatarMapping: Optional[Dict[str, Any]] = None
+    avatarMappingVersion: Optional[str] = None
+    # Ingest-time item embedding (base64 float16, services/embeddings.py) and its version.
+    embedding: Optional[str] = None
+    embeddingVersion: Optional[str] = None
+
+
+# --- Async process-item jobs ---
+
+
+class ProcessItemJob(BaseModel):
+    """State of an async /process-item job. status: queued | running | done | failed."""
+    jobId: str
+    rawKey: str
+    status: str
+    stage: Optional[str] = None  # queued | fetch | rembg | upload | vision | done
+    attempts: int = 0
+    created: Optional[bool] = None  # set on POST: False when an existing job for rawKey was returned
+    result: Optional[ProcessItemResponse] = None  # populated when status == "done"
+    failReason: Optional[str] = None
+    createdAt: Optional[str] = None
+    updatedAt: Optional[str] = None
+
+
+# --- Batch process-items (multi-photo wardrobe imports) ---
+
+BATCH_MAX_ITEMS = 50
+
+
+class ProcessItemsBatchEntry(BaseModel):
+    rawKey: str
+    rawUrl: str
+    clothingType: Optional[str] = None
+
+
+class ProcessItemsBatchRequest(BaseModel):
+    """Streamed as NDJSON: one ProcessItemResponse line per entry, then a summary line."""
+    userId: str
+    items: List[ProcessItemsBatchEntry] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
 
 
 # --- Remove-bg (back image processing): background removal only, no Vision ---
@@ -305,10 +353,22 @@ class AvatarMappingRequest(BaseModel):
     profile: Optional[Dict[str, Any]] = Field(None, description="Full ItemProfile dict from Vision")
 
 
+class AvatarColorDetail(BaseModel):
+    """Precomputed material data for one palette color."""
+    hex: str
+    linearRgb: List[float] = Field(..., description="Linear-light RGB in [0, 1] (glTF baseColorFactor space)")
+    oklab: List[float] = Field(..., description="OKLab L, a, b")
+    oklch: List[float] = Field(..., description="OKLCh L, C, hue degrees")
+    name: Optional[str] = Field(None, description="Nearest named table color (OKLab)")
+    deltaE: Optional[float] = Field(None, description="OKLab distance to `name`; 0 for table colors")
+
+
 class AvatarPalette(BaseModel):
     """Hex color palette for avatar material tinting."""
     primary: Optional[str] = Field(None, description="Hex color, e.g. '#1A1A1A'")
     secondary: Optional[str] = Field(None, description="Hex color or null")
+    primaryDetail: Optional[AvatarColorDetail] = None
+    secondaryDetail: Optional[AvatarColorDetail] = None
 
 
 class AvatarRenderHints(BaseModel):
@@ -359,3 +419,63 @@ class AvatarMappingResult(BaseModel):
     # Raw input echo — useful for debugging / frontend override logic
     inputCategory: Optional[str] = None
     inputType: Optional[str] = None
+
+
+AVATAR_BATCH_MAX_ITEMS = 200
+
+
+class AvatarMappingBatchRequest(BaseModel):
+    """
+    Map many garments in one call. Provide either `items` (same shape as
+    AvatarMappingRequest) or `userId` + `itemIds` to map stored wardrobe items.
+    """
+    items: Optional[List[AvatarMappingRequest]] = Field(None, max_length=AVATAR_BATCH_MAX_ITEMS)
+    userId: Optional[str] = None
+    itemIds: Optional[List[str]] = Field(None, max_length=AVATAR_BATCH_MAX_ITEMS)
+
+
+class AvatarMappingBatchEntry(BaseModel):
+    """One mapping, in request order. itemId is set when mapping by item IDs."""
+    index: int
+    itemId: Optional[str] = None
+    mapping: AvatarMappingResult
+
+
+class AvatarMappingBatchResponse(BaseModel):
+    mappings: List[AvatarMappingBatchEntry]
+    missingIds: List[str] = Field(default_factory=list, description="Requested itemIds not found for the user")
+    uniqueMappings: int = Field(0, description="Distinct attribute tuples actually mapped")
+
+
+# --- Similar items / pairing candidates (item embeddings) ---
+
+SIMILAR_ITEMS_MAX_K = 50
+
+
+class SimilarItemsRequest(BaseModel):
+    """
+    Nearest neighbours of one stored wardrobe item by embedding cosine similarity.
+    mode="similar": closest items overall (sameCategory restricts to the item's category).
+    mode="pairing": closest items in each complementary category (top → bottom/shoes/outerwear, ...).
+    """
+    userId: str
+    itemId: str
+    k: int = Field(10, ge=1, le=SIMILAR_ITEMS_MAX_K)
+    mode: Literal["similar", "pairing"] = "similar"
+    sameCategory: bool = False
+
+
+class SimilarItemMatch(BaseModel):
+    id: str
+    score: float  # cosine similarity, -1..1
+    category: str
+
+
+class SimilarItemsResponse(BaseModel):
+    itemId: str
+    mode: str
+    matches: List[SimilarItemMatch] = Field(default_factory=list, description="mode=similar, best first")
+    pairings: Dict[str, List[SimilarItemMatch]] = Field(
+        default_factory=dict, description="mode=pairing: best first, by complementary category"
+    )
+    embeddingVersion: str
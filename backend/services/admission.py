@@ -0,0 +1,284 @@
+# services/admission.py
+# Admission control for the AI service: per-route-class concurrency limits,
+# bounded wait queues, fast 503 + Retry-After rejections, and priority so
+# interactive requests get freed capacity before ingest and batch work.
+#
+# Route classes (first matching prefix wins; unmatched paths are not limited):
+#   interactive — /suggest_outfit, /generate-outfits, /avatar-mapping*, /items/similar
+#   ingest      — /process-item, /remove-bg
+#   batch       — /process-items/batch, POST /process-item/jobs
+#
+# A request must get a slot in its class gate, then in the shared global gate.
+# The global gate's waiters are served by priority (interactive → ingest →
+# batch), then FIFO.
+#
+# Limits come from a per-tier preset (AI_DEPLOY_TIER=small|standard|large) and
+# can be overridden per class with AI_LIMIT_<CLASS>="<concurrency>:<queue>",
+# e.g. AI_LIMIT_INGEST=4:16, and AI_LIMIT_GLOBAL=<concurrency>.
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.metrics import Counter, Gauge
+
+AI_DEPLOY_TIER = os.getenv("AI_DEPLOY_TIER", "standard").strip().lower()
+AI_ADMISSION_ENABLED = os.getenv("AI_ADMISSION", "true").lower() not in ("false", "0", "no")
+# Longest a request may wait in a queue before it is rejected.
+AI_ADMISSION_QUEUE_TIMEOUT_S = float(os.getenv("AI_ADMISSION_QUEUE_TIMEOUT_S", "10"))
+
+# class -> (concurrency, queue); "global" -> (concurrency, queue)
+_TIER_PRESETS: Dict[str, Dict[str, Tuple[int, int]]] = {
+    "small": {
+        "interactive": (4, 16), "ingest": (2, 8), "batch": (1, 2), "global": (6, 24),
+    },
+    "standard": {
+        "interactive": (16, 64), "ingest": (6, 24), "batch": (2, 4), "global": (20, 80),
+    },
+    "large": {
+        "interactive": (48, 192), "ingest": (16, 64), "batch": (4, 8), "global": (56, 224),
+    },
+}
+
+# Lower value = served first from the global queue.
+PRIORITY = {"interactive": 0, "ingest": 1, "batch": 2}
+# Retry-After (seconds) suggested to rejected callers, by class.
+RETRY_AFTER_S = {"interactive": 1, "ingest": 5, "batch": 15}
+
+# (method or None for any, path prefix, class). Order matters: longer prefixes first.
+ROUTE_CLASSES: List[Tuple[Optional[str], str, str]] = [
+    (None, "/process-items/batch", "batch"),
+    ("POST", "/process-item/jobs", "batch"),
+    (None, "/process-item", "ingest"),
+    (None, "/remove-bg", "ingest"),
+    (None, "/suggest_outfit", "interactive"),
+    (None, "/generate-outfits", "interactive"),
+    (None, "/avatar-mapping", "interactive"),
+    (None, "/items/similar", "interactive"),
+]
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    for m, prefix, cls in ROUTE_CLASSES:
+        if (m is None or m == method) and (path == prefix or path.startswith(prefix + "/")):
+            return cls
+    return None
+
+
+def _limits(tier: str) -> Dict[str, Tuple[int, int]]:
+    preset = dict(_TIER_PRESETS.get(tier) or _TIER_PRESETS["standard"])
+    for name in list(preset):
+        raw = os.getenv(f"AI_LIMIT_{name.upper()}")
+        if not raw:
+            continue
+        try:
+            parts = [int(p) for p in raw.split(":")]
+            concurrency = parts[0]
+            queue = parts[1] if len(parts) > 1 else preset[name][1]
+            preset[name] = (max(1, concurrency), max(0, queue))
+        except ValueError:
+            print(f"[Admission] Ignoring invalid AI_LIMIT_{name.upper()}={raw!r}")
+    return preset
+
+
+class PriorityGate:
+    """
+    Async counting semaphore with a bounded, priority-ordered wait queue.
+    Not thread-safe: used only from the event loop.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, f in self._waiters if not f.done())
+
+    async def acquire(self, priority: int, timeout: float) -> bool:
+        """True once a slot is held; False when the queue is full or the wait times out."""
+        if self.active < self.limit and not self.queued:
+            self.active += 1
+            self.admitted += 1
+            return True
+        if self.queued >= self.max_queue:
+            self.rejected_full += 1
+            return False
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout)
+        except asyncio.TimeoutError:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed over just as we timed out — keep it.
+                self.admitted += 1
+                return True
+            fut.cancel()
+            self.rejected_timeout += 1
+            return False
+        except asyncio.CancelledError:
+            # Client went away while queued; pass on a slot we may already hold.
+            if fut.done() and not fut.cancelled():
+                self.release()
+            else:
+                fut.cancel()
+            raise
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        # Hand the slot straight to the best live waiter; `active` stays unchanged.
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(True)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "maxQueue": self.max_queue,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejectedQueueFull": self.rejected_full,
+            "rejectedTimeout": self.rejected_timeout,
+        }
+
+
+class AdmissionController:
+    def __init__(self, tier: str = AI_DEPLOY_TIER, queue_timeout_s: float = AI_ADMISSION_QUEUE_TIMEOUT_S):
+        self.tier = tier
+        self.queue_timeout_s = queue_timeout_s
+        limits = _limits(tier)
+        self.global_gate = PriorityGate("global", *limits.pop("global"))
+        self.gates: Dict[str, PriorityGate] = {
+            name: PriorityGate(name, concurrency, queue) for name, (concurrency, queue) in limits.items()
+        }
+
+    async def admit(self, cls: str) -> bool:
+        """Take a class slot, then a global slot. False (nothing held) on rejection."""
+        gate = self.gates[cls]
+        priority = PRIORITY.get(cls, len(PRIORITY))
+        if not await gate.acquire(priority, self.queue_timeout_s):
+            return False
+        try:
+            admitted = await self.global_gate.acquire(priority, self.queue_timeout_s)
+        except BaseException:
+            gate.release()
+            raise
+        if not admitted:
+            gate.release()
+            return False
+        return True
+
+    def release(self, cls: str) -> None:
+        self.global_gate.release()
+        self.gates[cls].release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tier": self.tier,
+            "queueTimeoutS": self.queue_timeout_s,
+            "global": self.global_gate.stats(),
+            "classes": {name: gate.stats() for name, gate in self.gates.items()},
+        }
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController()
+        print(f"[Admission] tier={_controller.tier} limits="
+              + ", ".join(f"{n}={g.limit}/{g.max_queue}" for n, g in _controller.gates.items())
+              + f", global={_controller.global_gate.limit}/{_controller.global_gate.max_queue}")
+    return _controller
+
+
+def _gate_samples(read):
+    controller = _controller
+    if controller is None:
+        return []
+    gates = [controller.global_gate, *controller.gates.values()]
+    return [({"route_class": g.name}, read(g)) for g in gates]
+
+
+ADMISSION_ACTIVE = Gauge(
+    "ai_admission_active", "Requests holding an admission slot.", ("route_class",),
+    fn=lambda: _gate_samples(lambda g: g.active),
+)
+ADMISSION_QUEUED = Gauge(
+    "ai_admission_queue_depth", "Requests waiting for an admission slot.", ("route_class",),
+    fn=lambda: _gate_samples(lambda g: g.queued),
+)
+ADMISSION_ADMITTED = Counter(
+    "ai_admission_admitted_total", "Requests admitted.", ("route_class",),
+    fn=lambda: _gate_samples(lambda g: g.admitted),
+)
+ADMISSION_REJECTED = Counter(
+    "ai_admission_rejected_total", "Requests rejected with 503, by reason (queue_full/timeout).",
+    ("route_class", "reason"),
+    fn=lambda: [
+        ({**labels, "reason": reason}, value)
+        for reason, read in (("queue_full", lambda g: g.rejected_full), ("timeout", lambda g: g.rejected_timeout))
+        for labels, value in _gate_samples(read)
+    ],
+)
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware (so streaming responses hold their slot until the body
+    is fully sent). Rejections are immediate 503s with Retry-After.
+    """
+
+    def __init__(self, app, enabled: bool = AI_ADMISSION_ENABLED):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        cls = route_class(scope.get("method", ""), scope.get("path", ""))
+        if cls is None:
+            await self.app(scope, receive, send)
+            return
+
+        controller = get_admission_controller()
+        if not await controller.admit(cls):
+            await _reject(send, cls)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release(cls)
+
+
+async def _reject(send, cls: str) -> None:
+    body = json.dumps({"detail": f"Server busy ({cls}); retry later"}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"retry-after", str(RETRY_AFTER_S.get(cls, 5)).encode("ascii")),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
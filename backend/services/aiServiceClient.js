@@ -113,17 +113,21 @@ function normalizePath(path) {
 /**
  * POST to a path on the AI service with retries.
  * Merges headers (e.g. X-Internal-Token) into config.
+ * Pass extraConfig.requestId (req.requestId) to forward it as X-Request-Id so
+ * Python log lines can be joined with Node's.
  */
 async function post(path, data, extraConfig = {}) {
-  const headers = { ...(extraConfig.headers || {}) };
+  const { headers: extraHeaders, requestId, ...rest } = extraConfig;
+  const headers = { ...(extraHeaders || {}) };
   if (process.env.INTERNAL_TOKEN) headers['X-Internal-Token'] = process.env.INTERNAL_TOKEN;
+  if (requestId) headers['X-Request-Id'] = String(requestId);
 
   return requestWithRetry({
     method: 'post',
     url: normalizePath(path),
     data,
     headers,
-    ...extraConfig,
+    ...rest,
   });
 }
 
@@ -11,7 +11,7 @@ V1 Scope:
     ✓  Top and bottom garments only
     ✓  Rule-based mapping (no ML model required)
     ✓  Produces: avatarAssetFamily, materialPreset, patternPreset,
-                 palette (hex), fitPreset, renderHints
+                 palette (hex + linear RGB / OKLab), fitPreset, renderHints
 
 Intentionally deferred to later milestones:
     •  Front/back texture projection onto 3D mesh (requires UV unwrap + shader)
@@ -32,9 +32,16 @@ Intentionally deferred to later milestones:
 
 from __future__ import annotations
 
+import hashlib
+import json
 import re
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
+from services.color_space import KDTree3, color_coordinates, parse_hex
+from services.metrics import Counter
+from services.rule_matcher import KeywordMatcher, RuleMatcher, trie_pattern
+
 
 # ---------------------------------------------------------------------------
 # Color name → hex lookup table
@@ -278,6 +285,10 @@ _FIT_PRESET_RULES: List[tuple[list[str], str]] = [
 # surfaceFinish rules: material keyword → finish type
 # Default is "matte"; these are checked for overrides.
 # ---------------------------------------------------------------------------
+# Used to infer "bottom" from type/keyDetails when category is missing or unknown.
+_BOTTOM_INFER_KEYWORDS = {"pant", "jeans", "trouser", "short", "skirt",
+                          "legging", "chino", "cargo", "jogger", "sweatpant"}
+
 _GLOSSY_MATERIALS = {"silk", "satin", "leather", "faux leather", "vinyl", "patent"}
 _TEXTURED_MATERIALS = {
     "denim", "corduroy", "tweed", "flannel", "linen", "knit", "knitwear",
@@ -302,6 +313,67 @@ _SHADE_MODIFIERS: frozenset = frozenset({
 _COLOR_KEYS_BY_LENGTH: List[str] = sorted(_COLOR_HEX, key=len, reverse=True)
 
 
+# All table keys compiled once, wrapped in a lookahead so findall reports the
+# longest key at every start position (overlapping hits included) in one pass.
+_COLOR_KEY_RE = re.compile("(?=(" + trie_pattern(_COLOR_KEYS_BY_LENGTH) + "))")
+# Sort key reproducing the longest-first scan order: length, then table rank.
+_COLOR_KEY_ORDER: Dict[str, tuple] = {
+    k: (len(k), -i) for i, k in enumerate(_COLOR_KEYS_BY_LENGTH)
+}
+
+
+# Rule tables compiled to single-pass matchers (first rule wins, as listed above).
+_TOP_FAMILY_MATCHER = RuleMatcher(_TOP_FAMILY_RULES, "tshirt")
+_BOTTOM_FAMILY_MATCHER = RuleMatcher(_BOTTOM_FAMILY_RULES, "trousers")
+_MATERIAL_PRESET_MATCHER = RuleMatcher(_MATERIAL_PRESET_RULES, "cotton")
+_PATTERN_PRESET_MATCHER = RuleMatcher(_PATTERN_PRESET_RULES, "solid")
+_FIT_PRESET_MATCHER = RuleMatcher(_FIT_PRESET_RULES, "regular")
+_SURFACE_FINISH_MATCHER = RuleMatcher(
+    [(_GLOSSY_MATERIALS, "glossy"), (_TEXTURED_MATERIALS, "textured")], "matte"
+)
+_BOTTOM_INFER_MATCHER = KeywordMatcher(_BOTTOM_INFER_KEYWORDS)
+
+
+# Linear-RGB / OKLab / OKLCh data for every table colour, computed once here so
+# renderers never convert hex per load, plus a KD-tree over OKLab for
+# nearest-named-colour lookups of raw hex inputs.
+_COLOR_COORDS: Dict[str, Dict[str, Any]] = {}
+_COLOR_NAME_BY_HEX: Dict[str, str] = {}
+for _name, _hex in _COLOR_HEX.items():
+    _hex = _hex.upper()
+    if _hex not in _COLOR_COORDS:
+        _COLOR_COORDS[_hex] = color_coordinates(_hex)
+        _COLOR_NAME_BY_HEX[_hex] = _name
+_COLOR_INDEX = KDTree3([(c["oklab"], _COLOR_NAME_BY_HEX[h]) for h, c in _COLOR_COORDS.items()])
+
+
+# Bump when map_item_to_avatar's logic changes in a way the tables don't capture.
+_MAPPING_LOGIC_REVISION = 2  # 2: palette detail (linear RGB / OKLab), raw hex inputs
+
+
+def _rules_fingerprint() -> str:
+    tables = {
+        "logic": _MAPPING_LOGIC_REVISION,
+        "colors": _COLOR_HEX,
+        "top": _TOP_FAMILY_RULES,
+        "bottom": _BOTTOM_FAMILY_RULES,
+        "bottomInfer": sorted(_BOTTOM_INFER_KEYWORDS),
+        "material": _MATERIAL_PRESET_RULES,
+        "pattern": _PATTERN_PRESET_RULES,
+        "fit": _FIT_PRESET_RULES,
+        "glossy": sorted(_GLOSSY_MATERIALS),
+        "textured": sorted(_TEXTURED_MATERIALS),
+        "shade": sorted(_SHADE_MODIFIERS),
+    }
+    blob = json.dumps(tables, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:12]
+
+
+# Stored next to precomputed mappings (wardrobe.avatarMapping); a stored mapping
+# whose version differs was produced by older rule tables and gets re-mapped.
+AVATAR_MAPPING_VERSION: str = _rules_fingerprint()
+
+
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
@@ -330,26 +402,40 @@ def _norm_color(s: str) -> str:
     return re.sub(r"\s+", " ", s).strip()
 
 
-def _match_rules(
-    value: str,
-    rules: List[tuple[list[str], str]],
-    fallback: str,
-) -> str:
+def _longest_color_key(text: str) -> Optional[str]:
     """
-    Try each rule in order; return the mapped value for the first rule whose
-    keyword list contains a substring match against `value`.
+    Longest table key occurring anywhere in `text` (ties: earliest in
+    _COLOR_KEYS_BY_LENGTH) — the same key a longest-first linear scan returns.
     """
-    for keywords, mapped in rules:
-        for kw in keywords:
-            if kw in value:
-                return mapped
-    return fallback
+    hits = _COLOR_KEY_RE.findall(text)
+    if not hits:
+        return None
+    return max(hits, key=_COLOR_KEY_ORDER.__getitem__)
+
+
+@lru_cache(maxsize=1024)
+def _palette_detail_cached(hex_str: str) -> Dict[str, Any]:
+    coords = _COLOR_COORDS.get(hex_str) or color_coordinates(hex_str)
+    name, distance = _COLOR_INDEX.nearest(coords["oklab"])
+    return {**coords, "name": name, "deltaE": round(distance, 5)}
+
+
+def palette_detail(hex_str: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Material-ready data for a palette hex: linearRgb / oklab / oklch tuples plus
+    the nearest named table colour ("name") and its OKLab distance ("deltaE",
+    0 for table colours). None for a None hex.
+    """
+    if not hex_str:
+        return None
+    return dict(_palette_detail_cached(hex_str.upper()))
 
 
 def _color_to_hex(color_name: Optional[str]) -> Optional[str]:
     """
     Resolve a fashion color name to a hex string for .glb material tinting.
     Returns None only for truly unrecognisable color names (e.g. 'moonstone haze').
+    Raw hex input ('#1a2b3c') is returned canonicalised ('#1A2B3C').
 
     Resolution passes
     -----------------
@@ -358,7 +444,8 @@ def _color_to_hex(color_name: Optional[str]) -> Optional[str]:
               'Heather Gray').
 
     Pass 2 — Longest-key phrase match.
-              Iterates table keys longest-first so 'olive green' beats 'olive'
+              One compiled-regex pass finds the longest table key in the input,
+              so 'olive green' beats 'olive'
               and 'green' when the input is 'dark olive green'.  This catches
               shade-prefixed variants like 'dark navy blue' → navy blue.
 
@@ -379,17 +466,27 @@ def _color_to_hex(color_name: Optional[str]) -> Optional[str]:
     key = _norm_color(color_name)
     if not key:
         return None
+    return _resolve_color_key(key)
+
+
+@lru_cache(maxsize=4096)
+def _resolve_color_key(key: str) -> Optional[str]:
+    """Passes 1–4 of _color_to_hex on an already-normalised key (memoized)."""
+    # Raw hex input ('#1a2b3c', '#abc') resolves to itself.
+    raw_hex = parse_hex(key)
+    if raw_hex:
+        return raw_hex
 
     # Pass 1: exact match
     if key in _COLOR_HEX:
         return _COLOR_HEX[key]
 
     # Pass 2: longest-key phrase match
-    # Longest keys are tried first to prefer specific entries over generic ones
+    # Longest keys win to prefer specific entries over generic ones
     # (e.g. "navy blue" before "blue" when the input is "dark navy blue").
-    for table_key in _COLOR_KEYS_BY_LENGTH:
-        if table_key in key:
-            return _COLOR_HEX[table_key]
+    hit = _longest_color_key(key)
+    if hit:
+        return _COLOR_HEX[hit]
 
     # Pass 3: strip shade modifiers and retry passes 1 + 2
     tokens = key.split()
@@ -398,9 +495,9 @@ def _color_to_hex(color_name: Optional[str]) -> Optional[str]:
         base = " ".join(base_tokens)
         if base in _COLOR_HEX:
             return _COLOR_HEX[base]
-        for table_key in _COLOR_KEYS_BY_LENGTH:
-            if table_key in base:
-                return _COLOR_HEX[table_key]
+        hit = _longest_color_key(base)
+        if hit:
+            return _COLOR_HEX[hit]
 
     # Pass 4: unknown color
     return None
@@ -413,16 +510,7 @@ def _surface_finish(material: Optional[str]) -> str:
     textured → denim, knit, corduroy, linen, wool, flannel
     matte   → everything else (cotton, jersey, polyester…)
     """
-    m = _norm(material)
-    if not m:
-        return "matte"
-    for gm in _GLOSSY_MATERIALS:
-        if gm in m:
-            return "glossy"
-    for tm in _TEXTURED_MATERIALS:
-        if tm in m:
-            return "textured"
-    return "matte"
+    return _SURFACE_FINISH_MATCHER.match(_norm(material))
 
 
 # ---------------------------------------------------------------------------
@@ -474,9 +562,7 @@ def map_item_to_avatar(
         avatar_category = cat
     else:
         # Attempt to infer from type keywords when category is missing/unknown
-        bottom_keywords = {"pant", "jeans", "trouser", "short", "skirt",
-                           "legging", "chino", "cargo", "jogger", "sweatpant"}
-        if any(bk in type_and_details for bk in bottom_keywords):
+        if _BOTTOM_INFER_MATCHER.contains(type_and_details):
             avatar_category = "bottom"
         else:
             # Default to "top" for ambiguous cases; caller should validate category
@@ -486,30 +572,33 @@ def map_item_to_avatar(
     # Choose the most specific .glb asset family based on type + key details.
     # The rules are ordered from most-specific to least-specific within each list.
     if avatar_category == "top":
-        asset_family = _match_rules(type_and_details, _TOP_FAMILY_RULES, "tshirt")
+        asset_family = _TOP_FAMILY_MATCHER.match(type_and_details)
     else:
-        asset_family = _match_rules(type_and_details, _BOTTOM_FAMILY_RULES, "trousers")
+        asset_family = _BOTTOM_FAMILY_MATCHER.match(type_and_details)
 
     # --- 4. materialPreset -------------------------------------------------------
     # Map fabric/material name to a renderer-friendly preset.
     # "cotton" is the default fallback when material is unknown.
-    material_preset = _match_rules(mat_norm, _MATERIAL_PRESET_RULES, "cotton")
+    material_preset = _MATERIAL_PRESET_MATCHER.match(mat_norm)
 
     # --- 5. patternPreset --------------------------------------------------------
     # "solid" is the default when pattern is null or not recognised.
-    pattern_preset = _match_rules(pat_norm, _PATTERN_PRESET_RULES, "solid")
+    pattern_preset = _PATTERN_PRESET_MATCHER.match(pat_norm)
 
     # --- 6. palette (primary + secondary hex) ------------------------------------
     primary_hex = _color_to_hex(primary_color)
     secondary_hex = _color_to_hex(secondary_color)
 
-    palette: Dict[str, Optional[str]] = {
+    palette: Dict[str, Any] = {
         "primary": primary_hex,
         "secondary": secondary_hex,
+        # Linear RGB + OKLab/OKLCh so clients skip hex parsing / conversion.
+        "primaryDetail": palette_detail(primary_hex),
+        "secondaryDetail": palette_detail(secondary_hex),
     }
 
     # --- 7. fitPreset ------------------------------------------------------------
-    fit_preset = _match_rules(fit_norm, _FIT_PRESET_RULES, "regular")
+    fit_preset = _FIT_PRESET_MATCHER.match(fit_norm)
 
     # --- 8. renderHints ----------------------------------------------------------
     # usePatternTexture: renderer should apply a tiling pattern texture when true
@@ -557,18 +646,108 @@ def map_item_profile_to_avatar(profile: Dict[str, Any]) -> Dict[str, Any]:
         color         — Node wardrobe model flat field
         color_name    — Node wardrobe derived field (populated by to_node_profile)
     """
+    return map_item_to_avatar(**avatar_args_from_profile(profile))
+
+
+def precompute_avatar_mapping(profile: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Mapping to store with a wardrobe item at ingest time, or None when the
+    profile's category is outside V1 scope (only top / bottom are mapped).
+    Pair it with AVATAR_MAPPING_VERSION.
+    """
+    if not is_avatar_mapped(profile):
+        return None
+    return map_item_to_avatar_cached(**avatar_args_from_profile(profile))
+
+
+def is_avatar_mapped(profile: Optional[Dict[str, Any]]) -> bool:
+    """True when precompute_avatar_mapping stores a mapping for this profile."""
+    return bool(profile) and _norm(profile.get("category")) in ("top", "bottom")
+
+
+def avatar_args_from_profile(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """Keyword arguments for `map_item_to_avatar` extracted from a profile / wardrobe dict."""
     primary = (
         profile.get("primaryColor")
         or profile.get("color")
         or profile.get("color_name")
     )
+    return {
+        "category": profile.get("category"),
+        "type_": profile.get("type"),
+        "primary_color": primary,
+        "secondary_color": profile.get("secondaryColor"),
+        "pattern": profile.get("pattern"),
+        "material": profile.get("material") or profile.get("fabric"),
+        "fit": profile.get("fit"),
+        "key_details": profile.get("keyDetails") or [],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Memoized variant (batch mapping)
+# ---------------------------------------------------------------------------
+# map_item_to_avatar is pure, so identical attribute tuples — the same garment
+# rendered in many outfits, or duplicate items across a wardrobe — only need to
+# be mapped once per process.
+
+@lru_cache(maxsize=2048)
+def _map_item_to_avatar_memo(
+    category: Optional[str],
+    type_: Optional[str],
+    primary_color: Optional[str],
+    secondary_color: Optional[str],
+    pattern: Optional[str],
+    material: Optional[str],
+    fit: Optional[str],
+    key_details: tuple,
+) -> Dict[str, Any]:
     return map_item_to_avatar(
-        category=profile.get("category"),
-        type_=profile.get("type"),
-        primary_color=primary,
-        secondary_color=profile.get("secondaryColor"),
-        pattern=profile.get("pattern"),
-        material=profile.get("material") or profile.get("fabric"),
-        fit=profile.get("fit"),
-        key_details=profile.get("keyDetails") or [],
+        category, type_, primary_color, secondary_color,
+        pattern, material, fit, list(key_details),
+    )
+
+
+def _memo_samples():
+    info = _map_item_to_avatar_memo.cache_info()
+    return [({"result": "hit"}, info.hits), ({"result": "miss"}, info.misses)]
+
+
+AVATAR_MAPPING_CACHE_REQUESTS = Counter(
+    "ai_avatar_mapping_cache_requests_total",
+    "map_item_to_avatar_cached LRU lookups by result (hit/miss).",
+    ("result",),
+    fn=_memo_samples,
+)
+
+
+def avatar_mapping_key(
+    category: Optional[str],
+    type_: Optional[str],
+    primary_color: Optional[str],
+    secondary_color: Optional[str],
+    pattern: Optional[str],
+    material: Optional[str],
+    fit: Optional[str],
+    key_details: Optional[List[str]] = None,
+) -> tuple:
+    """Hashable identity of a mapping input; equal keys give equal mappings."""
+    return (
+        category, type_, primary_color, secondary_color,
+        pattern, material, fit, tuple(key_details or ()),
     )
+
+
+def map_item_to_avatar_cached(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+    """
+    Same arguments and result as `map_item_to_avatar`, served from an LRU.
+    Returns a fresh copy so callers may mutate the result.
+    """
+    result = _map_item_to_avatar_memo(*avatar_mapping_key(*args, **kwargs))
+    return {
+        **result,
+        "palette": {
+            k: (dict(v) if isinstance(v, dict) else v) for k, v in result["palette"].items()
+        },
+        "renderHints": dict(result["renderHints"]),
+    }
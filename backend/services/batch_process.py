@@ -0,0 +1,85 @@
+# services/batch_process.py
+# Batch /process-items/batch: run the process-item pipeline for many photos at once.
+#
+# Concurrency is bounded per stage by shared resources (services.process_item,
+# services.executors):
+#   fetch   — pooled requests.Session (FETCH_POOL_SIZE connections)
+#   rembg   — the CPU pool (AI_CPU_POOL_SIZE workers) shared with single /process-item calls
+#   upload  — shared boto3 client (R2_MAX_POOL_CONNECTIONS)
+#   Vision  — VISION_MAX_CONCURRENCY slots
+# BATCH_MAX_CONCURRENCY caps how many items are in flight at once, so a 50-photo
+# import keeps every stage busy without holding 50 decoded images in memory.
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional
+
+from services.process_item import VisionFailedError, process_item
+
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "6"))
+
+
+def _process_one(user_id: str, entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one entry; never raises — failures become status="failed" results."""
+    try:
+        return process_item(
+            user_id,
+            entry["rawKey"],
+            entry["rawUrl"],
+            clothing_type=entry.get("clothingType"),
+        )
+    except VisionFailedError as e:
+        return {"status": "failed", "cleanKey": None, "cleanUrl": None, "profile": None, "failReason": str(e)}
+    except Exception as e:
+        return {"status": "failed", "cleanKey": None, "cleanUrl": None, "profile": None, "failReason": f"Unexpected error: {e}"}
+
+
+def process_items_batch(
+    user_id: str,
+    entries: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one {"type": "item", "index", "rawKey", ...ProcessItemResponse} dict per
+    entry in completion order, then a final {"type": "summary", ...} dict with
+    ready/failed counts and throughput (items/min).
+
+    Partial failure: a failed item never aborts the batch. Closing the generator
+    early cancels items that have not started; in-flight items finish in the
+    background.
+    """
+    started = time.perf_counter()
+    ready = failed = 0
+    workers = max(1, min(max_concurrency or BATCH_MAX_CONCURRENCY, len(entries) or 1))
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-item")
+    try:
+        futures = {
+            pool.submit(_process_one, user_id, entry): (idx, entry)
+            for idx, entry in enumerate(entries)
+        }
+        for fut in as_completed(futures):
+            idx, entry = futures[fut]
+            result = fut.result()
+            if result.get("status") == "ready":
+                ready += 1
+            else:
+                failed += 1
+            yield {"type": "item", "index": idx, "rawKey": entry["rawKey"], **result}
+    finally:
+        # Closed early (client went away): drop queued items instead of
+        # blocking until every submitted photo has been processed.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    total = ready + failed
+    yield {
+        "type": "summary",
+        "total": total,
+        "ready": ready,
+        "failed": failed,
+        "elapsedMs": round(elapsed * 1000, 1),
+        "itemsPerMin": round(total / elapsed * 60, 1) if elapsed > 0 else None,
+    }
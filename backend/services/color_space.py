@@ -0,0 +1,133 @@
+# services/color_space.py
+# Colour-space conversions and a nearest-named-colour index for avatar palettes.
+#
+# Renderers tint .glb materials in linear RGB, and perceptual comparisons are
+# done in OKLab (Björn Ottosson, 2020). Everything here is pure Python; values
+# for the named colour table are computed once at import by avatar_mapping.
+#
+#   hex  → sRGB [0,1] → linear RGB → OKLab (L, a, b) → OKLCh (L, C, h°)
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+Vec3 = Tuple[float, float, float]
+
+_HEX_RE = re.compile(r"^#([0-9a-fA-F]{6}|[0-9a-fA-F]{3})$")
+
+
+def parse_hex(value: Optional[str]) -> Optional[str]:
+    """
+    Canonical '#RRGGBB' for a '#rgb' / '#rrggbb' string, else None.
+    The '#' is required so hex-looking words ("facade", "bead") stay names.
+    """
+    if not value:
+        return None
+    m = _HEX_RE.match(value.strip())
+    if not m:
+        return None
+    digits = m.group(1)
+    if len(digits) == 3:
+        digits = "".join(ch * 2 for ch in digits)
+    return "#" + digits.upper()
+
+
+def hex_to_srgb(hex_str: str) -> Vec3:
+    h = hex_str.lstrip("#")
+    return (int(h[0:2], 16) / 255.0, int(h[2:4], 16) / 255.0, int(h[4:6], 16) / 255.0)
+
+
+def srgb_to_linear(rgb: Vec3) -> Vec3:
+    """Inverse sRGB transfer function (IEC 61966-2-1)."""
+    def channel(c: float) -> float:
+        return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+    return (channel(rgb[0]), channel(rgb[1]), channel(rgb[2]))
+
+
+def linear_to_oklab(rgb: Vec3) -> Vec3:
+    r, g, b = rgb
+    l = 0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b
+    m = 0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b
+    s = 0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b
+    l_, m_, s_ = (math.copysign(abs(v) ** (1 / 3), v) for v in (l, m, s))
+    return (
+        0.2104542553 * l_ + 0.7936177850 * m_ - 0.0040720468 * s_,
+        1.9779984951 * l_ - 2.4285922050 * m_ + 0.4505937099 * s_,
+        0.0259040371 * l_ + 0.7827717662 * m_ - 0.8086757660 * s_,
+    )
+
+
+def oklab_to_oklch(lab: Vec3) -> Vec3:
+    L, a, b = lab
+    C = math.hypot(a, b)
+    h = math.degrees(math.atan2(b, a)) % 360.0 if C > 1e-6 else 0.0
+    return (L, C, h)
+
+
+def _rounded(v: Iterable[float], digits: int = 5) -> Tuple[float, ...]:
+    return tuple(round(x, digits) + 0.0 for x in v)  # + 0.0 folds -0.0
+
+
+def color_coordinates(hex_str: str) -> Dict[str, Any]:
+    """
+    Precomputed material data for one hex colour:
+        {"hex", "linearRgb": (r, g, b), "oklab": (L, a, b), "oklch": (L, C, h)}
+    Tuples so shared table entries cannot be mutated by callers.
+    """
+    linear = srgb_to_linear(hex_to_srgb(hex_str))
+    lab = linear_to_oklab(linear)
+    return {
+        "hex": hex_str.upper(),
+        "linearRgb": _rounded(linear),
+        "oklab": _rounded(lab),
+        "oklch": _rounded(oklab_to_oklch(lab), 4),
+    }
+
+
+class KDTree3:
+    """
+    Static 3-d KD-tree (median splits) for nearest-neighbour lookups.
+    Nodes are tuples: (point, payload, axis, left, right).
+    """
+
+    def __init__(self, points: List[Tuple[Vec3, Any]]):
+        self.size = len(points)
+        self._root = self._build(list(points), 0)
+
+    def _build(self, pts: List[Tuple[Vec3, Any]], depth: int):
+        if not pts:
+            return None
+        axis = depth % 3
+        pts.sort(key=lambda p: p[0][axis])
+        mid = len(pts) // 2
+        point, payload = pts[mid]
+        return (
+            point,
+            payload,
+            axis,
+            self._build(pts[:mid], depth + 1),
+            self._build(pts[mid + 1:], depth + 1),
+        )
+
+    def nearest(self, target: Vec3) -> Optional[Tuple[Any, float]]:
+        """(payload, euclidean distance) of the closest point, or None when empty."""
+        best: List[Any] = [None, math.inf]  # payload, squared distance
+
+        def visit(node) -> None:
+            if node is None:
+                return
+            point, payload, axis, left, right = node
+            d2 = (point[0] - target[0]) ** 2 + (point[1] - target[1]) ** 2 + (point[2] - target[2]) ** 2
+            if d2 < best[1]:
+                best[0], best[1] = payload, d2
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if diff * diff < best[1]:
+                visit(far)
+
+        visit(self._root)
+        if best[0] is None:
+            return None
+        return best[0], math.sqrt(best[1])
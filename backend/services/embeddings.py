@@ -0,0 +1,398 @@
+# services/embeddings.py
+# Item embeddings and per-user nearest-neighbour search over a wardrobe.
+#
+# An item's embedding is computed from its profile text (locked ItemProfile
+# fields, plus legacy top-level fields for older items):
+#
+#   EMBEDDING_BACKEND=hash (default)   — hashing-trick vector over word unigrams
+#       and bigrams (blake2b, not Python's salted hash(), so vectors are stable
+#       across processes). No model, no network: safe for offline tests.
+#   EMBEDDING_BACKEND=sentence-transformers — a small local CPU model
+#       (EMBEDDING_MODEL), loaded on first use; falls back to hashing when the
+#       package or model is unavailable.
+#
+# Vectors are L2-normalised and stored as float16 (base64 in the wardrobe
+# item's `embedding`, with `embeddingVersion`). Ingest computes them next to the
+# avatar mapping; items without a current-version embedding are embedded from
+# their profile when an index is built.
+#
+# EmbeddingIndex is exact brute force: one float32 matrix per wardrobe, a
+# matrix-vector product for cosine scores and argpartition for top-k. Wardrobes
+# are small enough (1k–10k items) that this stays well under a millisecond or
+# two, without HNSW's build cost or approximate results. Indexes are cached per
+# user (EMBEDDING_INDEX_USERS) and rebuilt when any item's embedding input changes.
+#
+# EMBEDDING_BACKEND      — hash | sentence-transformers
+# EMBEDDING_MODEL        — sentence-transformers model (default all-MiniLM-L6-v2, 384-d)
+# EMBEDDING_DIM          — hashing-trick dimensions (default 384)
+# EMBEDDING_INDEX_USERS  — per-user indexes kept in memory (default 64)
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.item_classifier import outfit_category
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hash").strip().lower()
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2").strip()
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "384"))
+EMBEDDING_INDEX_USERS = int(os.getenv("EMBEDDING_INDEX_USERS", "64"))
+
+# Complementary categories (services/item_classifier.outfit_category values) for pairing.
+PAIRING_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    "top": ("bottom", "shoes", "outerwear"),
+    "bottom": ("top", "shoes", "outerwear"),
+    "dress": ("shoes", "outerwear"),
+    "shoes": ("top", "bottom", "dress"),
+    "outerwear": ("top", "bottom", "dress"),
+}
+
+_TEXT_FIELDS = (
+    "type", "category", "primaryColor", "secondaryColor", "colorUndertone",
+    "pattern", "material", "fit", "season",
+    # legacy top-level fields
+    "name", "color", "fabric",
+)
+_LIST_FIELDS = (
+    "styleTags", "keyDetails", "pairingHints",
+    # legacy top-level fields
+    "colors", "tags", "style_tags", "styleVibe", "occasionTags", "seasonTags",
+)
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _formality_word(value: Any) -> Optional[str]:
+    try:
+        n = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return "formal" if n >= 7 else "casual" if n <= 3 else "smart"
+
+
+def profile_text(item: Optional[Dict[str, Any]]) -> str:
+    """
+    Embedding input for an ItemProfile or a wardrobe item dict (v1 items keep
+    their attributes in `profile`, legacy items top-level; profile wins).
+    """
+    if not item:
+        return ""
+    profile = item.get("profile")
+    src = {**item, **profile} if isinstance(profile, dict) else item
+    parts: List[str] = []
+    for field in _TEXT_FIELDS:
+        value = src.get(field)
+        if isinstance(value, str) and value and value != "unknown":
+            parts.append(value)
+    for field in _LIST_FIELDS:
+        values = src.get(field)
+        if isinstance(values, str):
+            values = [values]
+        if isinstance(values, (list, tuple)):
+            parts.extend(v for v in values if isinstance(v, str) and v)
+    formality = _formality_word(src.get("formality"))
+    if formality:
+        parts.append(formality)
+    return " ".join(parts).lower()
+
+
+# ---------------------------------------------------------------------------
+# Embedders
+# ---------------------------------------------------------------------------
+
+
+@lru_cache(maxsize=65536)
+def _hashed_feature(token: str, dim: int) -> Tuple[int, float]:
+    h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+    return h % dim, (1.0 if h >> 63 else -1.0)
+
+
+class _HashingEmbedder:
+    """Signed hashing trick over unigrams (weight 1) and bigrams (weight 0.5)."""
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.version = f"hash-v1-{dim}"
+
+    def _vector(self, text: str) -> np.ndarray:
+        words = _TOKEN_RE.findall(text)
+        acc: Dict[int, float] = {}
+        for tokens, weight in ((words, 1.0), ([f"{a} {b}" for a, b in zip(words, words[1:])], 0.5)):
+            for token in tokens:
+                index, sign = _hashed_feature(token, self.dim)
+                acc[index] = acc.get(index, 0.0) + sign * weight
+        vec = np.zeros(self.dim, dtype=np.float32)
+        if acc:
+            vec[list(acc)] = list(acc.values())
+            norm = float(np.linalg.norm(vec))
+            if norm:
+                vec /= norm
+        return vec
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            out[row] = self._vector(text)
+        return out
+
+
+class _SentenceTransformerEmbedder:
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self._lock = threading.Lock()
+        self.dim = int(self._model.get_sentence_embedding_dimension())
+        self.version = f"st-{model_name}-{self.dim}"
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        with self._lock:  # one torch forward at a time per process
+            vectors = self._model.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True)
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), self.dim)
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Embedder singleton for EMBEDDING_BACKEND, created on first use."""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                embedder = None
+                if EMBEDDING_BACKEND in ("sentence-transformers", "sentence_transformers", "st"):
+                    try:
+                        embedder = _SentenceTransformerEmbedder(EMBEDDING_MODEL)
+                    except Exception as e:
+                        print(f"[Embeddings] {EMBEDDING_MODEL} unavailable ({e}); using hashing embeddings")
+                _embedder = embedder or _HashingEmbedder(EMBEDDING_DIM)
+                print(f"[Embeddings] backend={_embedder.version}")
+    return _embedder
+
+
+def embedding_version() -> str:
+    return get_embedder().version
+
+
+# ---------------------------------------------------------------------------
+# Storage format
+# ---------------------------------------------------------------------------
+
+
+def encode_embedding(vec: np.ndarray) -> str:
+    """float16 little-endian bytes, base64 — the stored `embedding` value."""
+    return base64.b64encode(np.asarray(vec, dtype="<f2").tobytes()).decode("ascii")
+
+
+def decode_embedding(value: Any, dim: int) -> Optional[np.ndarray]:
+    """Stored embedding (base64 float16, or a list of numbers) as float16, or None if malformed."""
+    if isinstance(value, str):
+        try:
+            raw = base64.b64decode(value, validate=True)
+        except (ValueError, binascii.Error):
+            return None
+        if len(raw) != 2 * dim:
+            return None
+        return np.frombuffer(raw, dtype="<f2")
+    if isinstance(value, (list, tuple)) and len(value) == dim:
+        try:
+            return np.asarray(value, dtype=np.float16)
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def precompute_embedding(profile: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str]]:
+    """(embedding, embeddingVersion) to store with a wardrobe item at ingest, or (None, None)."""
+    text = profile_text(profile)
+    if not text:
+        return None, None
+    try:
+        embedder = get_embedder()
+        return encode_embedding(embedder.encode([text])[0]), embedder.version
+    except Exception as e:  # an embedding must never fail ingest
+        print(f"[Embeddings] Ingest embedding failed: {e}")
+        return None, None
+
+
+def _stored_or_text(item: Dict[str, Any], version: str) -> Any:
+    """Embedding input for one item: its current stored embedding, else its profile text."""
+    if item.get("embeddingVersion") == version and item.get("embedding") is not None:
+        stored = item["embedding"]
+        return tuple(stored) if isinstance(stored, list) else stored
+    return ("text", profile_text(item))
+
+
+def item_vectors(items: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """
+    float16 (n, dim) embeddings for wardrobe item dicts: current stored values
+    are decoded, everything else is embedded from its profile text in one batch.
+    """
+    embedder = get_embedder()
+    out = np.zeros((len(items), embedder.dim), dtype=np.float16)
+    stored_rows: List[int] = []
+    stored: List[Any] = []
+    pending: List[int] = []
+    for row, item in enumerate(items):
+        if item.get("embeddingVersion") == embedder.version and item.get("embedding") is not None:
+            stored_rows.append(row)
+            stored.append(item["embedding"])
+        else:
+            pending.append(row)
+
+    if stored_rows:
+        # Stored values are base64 of whole 3-byte groups (no padding) when 2*dim % 3 == 0,
+        # so the concatenation decodes in one call; anything odd is decoded one by one.
+        b64_len = 4 * (2 * embedder.dim) // 3
+        if (2 * embedder.dim) % 3 == 0 and all(isinstance(v, str) and len(v) == b64_len for v in stored):
+            try:
+                raw = base64.b64decode("".join(stored), validate=True)
+                out[stored_rows] = np.frombuffer(raw, dtype="<f2").reshape(len(stored_rows), embedder.dim)
+                stored_rows = []
+            except (ValueError, binascii.Error):
+                pass
+        for row, value in zip(stored_rows, stored):
+            vec = decode_embedding(value, embedder.dim)
+            if vec is None:
+                pending.append(row)
+            else:
+                out[row] = vec
+
+    if pending:
+        out[pending] = embedder.encode([profile_text(items[row]) for row in pending])
+    return out
+
+
+def _item_category(item: Dict[str, Any]) -> str:
+    profile = item.get("profile")
+    src = {**item, **profile} if isinstance(profile, dict) else item
+    return outfit_category(
+        str(src.get("category") or "").strip().lower(),
+        str(src.get("type") or "").strip().lower(),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+
+class EmbeddingIndex:
+    """Exact cosine top-k over one wardrobe's embeddings (items in the given order)."""
+
+    def __init__(self, ids: Sequence[str], categories: Sequence[str], vectors: np.ndarray):
+        self.ids = [str(i) for i in ids]
+        self.categories = list(categories)
+        self.position = {item_id: row for row, item_id in enumerate(self.ids)}
+        # float16 is the stored form; BLAS only multiplies float32, so the working copy is widened once.
+        self.matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        rows: Dict[str, List[int]] = {}
+        for row, category in enumerate(self.categories):
+            rows.setdefault(category, []).append(row)
+        self.rows_by_category = {c: np.asarray(r, dtype=np.intp) for c, r in rows.items()}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        return self.matrix @ np.asarray(query, dtype=np.float32)
+
+    def _top(self, scores: np.ndarray, rows: Optional[np.ndarray], k: int,
+             exclude: Optional[int] = None) -> List[Tuple[str, float]]:
+        if rows is None:
+            rows = np.arange(len(scores))
+        if exclude is not None:
+            rows = rows[rows != exclude]
+        if k <= 0 or not rows.size:
+            return []
+        sub = scores[rows]
+        if k < sub.size:
+            part = np.argpartition(-sub, k - 1)[:k]
+        else:
+            part = np.arange(sub.size)
+        order = part[np.argsort(-sub[part], kind="stable")]
+        return [(self.ids[rows[i]], float(sub[i])) for i in order]
+
+    def top_k(self, query: np.ndarray, k: int, category: Optional[str] = None) -> List[Tuple[str, float]]:
+        """(item id, cosine) for the k items closest to `query`, optionally within one category."""
+        rows = None
+        if category is not None:
+            rows = self.rows_by_category.get(category)
+            if rows is None:
+                return []
+        return self._top(self.scores(query), rows, k)
+
+    def similar(self, item_id: str, k: int, same_category: bool = False) -> List[Tuple[str, float]]:
+        """Items most similar to `item_id` (itself excluded); [] when the id is unknown."""
+        row = self.position.get(str(item_id))
+        if row is None:
+            return []
+        rows = self.rows_by_category.get(self.categories[row]) if same_category else None
+        return self._top(self.scores(self.matrix[row]), rows, k, exclude=row)
+
+    def pairings(self, item_id: str, k: int) -> Dict[str, List[Tuple[str, float]]]:
+        """Per complementary category, the k items closest to `item_id`."""
+        row = self.position.get(str(item_id))
+        if row is None:
+            return {}
+        scores = self.scores(self.matrix[row])
+        out: Dict[str, List[Tuple[str, float]]] = {}
+        for category in PAIRING_CATEGORIES.get(self.categories[row], ()):
+            rows = self.rows_by_category.get(category)
+            if rows is not None:
+                out[category] = self._top(scores, rows, k)
+        return out
+
+
+def build_index(items: Sequence[Dict[str, Any]]) -> EmbeddingIndex:
+    return EmbeddingIndex(
+        [item.get("id") for item in items],
+        [_item_category(item) for item in items],
+        item_vectors(items),
+    )
+
+
+_indexes: "OrderedDict[str, Tuple[List[Any], EmbeddingIndex]]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def user_index(user_id: str, items: Sequence[Dict[str, Any]]) -> EmbeddingIndex:
+    """The user's index, rebuilt only when an item was added, removed or re-embedded."""
+    version = embedding_version()
+    key = [(item.get("id"), item.get("category"), _stored_or_text(item, version)) for item in items]
+    with _index_lock:
+        cached = _indexes.get(user_id)
+        if cached is not None and cached[0] == key:
+            _indexes.move_to_end(user_id)
+            return cached[1]
+    index = build_index(items)
+    with _index_lock:
+        _indexes[user_id] = (key, index)
+        _indexes.move_to_end(user_id)
+        while len(_indexes) > EMBEDDING_INDEX_USERS:
+            _indexes.popitem(last=False)
+    return index
+
+
+@lru_cache(maxsize=1024)
+def _query_vector(text: str) -> np.ndarray:
+    vec = get_embedder().encode([text])[0]
+    vec.setflags(write=False)
+    return vec
+
+
+def text_similarity(items: Sequence[Dict[str, Any]], text: str) -> np.ndarray:
+    """Cosine similarity of each item to a free-text query (e.g. occasion + weather)."""
+    if not items or not text:
+        return np.zeros(len(items), dtype=np.float32)
+    return item_vectors(items).astype(np.float32) @ _query_vector(text.lower())
@@ -0,0 +1,96 @@
+# services/executors.py
+# Dedicated executors for blocking work behind the async FastAPI handlers.
+#
+#   I/O pool  (threads)          — Mongo, R2, OpenAI, raw-image fetches, SQLite
+#   CPU pool  (processes/threads) — rembg background removal
+#
+# Keeping them apart means a burst of rembg work cannot starve outfit
+# generation or /health of threads, and CPU-bound work in a process pool does
+# not hold the event loop's GIL.
+#
+# AI_IO_POOL_SIZE   — I/O threads (default 32)
+# AI_CPU_POOL_SIZE  — CPU workers (default 2; each process loads its own rembg model)
+# AI_CPU_POOL_MODE  — "process" (default) or "thread" (low-memory tiers, tests)
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+AI_IO_POOL_SIZE = int(os.getenv("AI_IO_POOL_SIZE", "32"))
+AI_CPU_POOL_SIZE = int(os.getenv("AI_CPU_POOL_SIZE", "2"))
+AI_CPU_POOL_MODE = os.getenv("AI_CPU_POOL_MODE", "process").strip().lower()
+
+_io_pool: Optional[ThreadPoolExecutor] = None
+_cpu_pool: Optional[Executor] = None
+_lock = threading.Lock()
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    global _io_pool
+    if _io_pool is None:
+        with _lock:
+            if _io_pool is None:
+                _io_pool = ThreadPoolExecutor(max_workers=max(1, AI_IO_POOL_SIZE), thread_name_prefix="ai-io")
+    return _io_pool
+
+
+def get_cpu_pool() -> Executor:
+    global _cpu_pool
+    if _cpu_pool is None:
+        with _lock:
+            if _cpu_pool is None:
+                workers = max(1, AI_CPU_POOL_SIZE)
+                if AI_CPU_POOL_MODE == "process":
+                    # spawn: children must not inherit the parent's threads/locks
+                    # (Mongo client, boto3 pools) mid-operation.
+                    _cpu_pool = ProcessPoolExecutor(
+                        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+                else:
+                    _cpu_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ai-cpu")
+                print(f"[Executors] CPU pool: {AI_CPU_POOL_MODE} x{workers}; I/O pool: {AI_IO_POOL_SIZE} threads")
+    return _cpu_pool
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await a blocking I/O call on the I/O pool (context vars are carried over)."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(get_io_pool(), functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+def run_cpu(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Run a CPU-bound call on the CPU pool and block until it finishes. Called from
+    I/O-pool threads (e.g. inside process_item). In process mode `fn` and its
+    arguments must be picklable (module-level function, bytes/str args).
+    """
+    global _cpu_pool
+    pool = get_cpu_pool()
+    try:
+        return pool.submit(fn, *args).result()
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM in rembg). Drop the pool so the next call gets a fresh one.
+        with _lock:
+            if _cpu_pool is pool:
+                _cpu_pool = None
+        pool.shutdown(wait=False)
+        raise
+
+
+def shutdown_executors() -> None:
+    global _io_pool, _cpu_pool
+    with _lock:
+        pools, _io_pool, _cpu_pool = (_io_pool, _cpu_pool), None, None
+    for pool in pools:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
@@ -12,7 +12,12 @@
 
 import os
 import json
-from typing import List, Dict, Any, Optional, Set, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
+
+from services.item_classifier import outfit_category
+from services.metrics import Counter, Histogram, LLM_CALLS, StageClock, record_llm_usage
+from services.rule_matcher import KeywordMatcher, RuleMatcher
+from services.weather_context import WeatherContext
 
 # ---------------------------------------------------------------------------
 # Color-harmony constants
@@ -170,6 +175,26 @@ _COLOR_BUCKETS: Dict[str, Set[str]] = {
 }
 
 
+# Keyword tables compiled once (see services/rule_matcher.py). Group/bucket
+# matchers keep dict order, so the first group with a hit wins as before.
+_NEUTRAL_MATCHER = KeywordMatcher(NEUTRAL_COLORS)
+_WARM_MATCHER = KeywordMatcher(WARM_COLORS)
+_FORMAL_OCCASION_MATCHER = KeywordMatcher(FORMAL_OCCASIONS)
+_FORMAL_TOP_MATCHER = KeywordMatcher(FORMAL_TOP_KEYWORDS)
+_FORMAL_BOTTOM_MATCHER = KeywordMatcher(FORMAL_BOTTOM_KEYWORDS)
+_FORMAL_SHOE_MATCHER = KeywordMatcher(FORMAL_SHOE_KEYWORDS)
+_FORMAL_LAYER_MATCHER = KeywordMatcher(FORMAL_LAYER_KEYWORDS)
+_CASUAL_TOP_MATCHER = KeywordMatcher(CASUAL_TOP_KEYWORDS)
+_CASUAL_BOTTOM_MATCHER = KeywordMatcher(CASUAL_BOTTOM_KEYWORDS)
+_CASUAL_SHOE_MATCHER = KeywordMatcher(CASUAL_SHOE_KEYWORDS)
+_LOUD_PATTERN_MATCHER = KeywordMatcher(LOUD_PATTERNS)
+_BREATHABLE_MATCHER = KeywordMatcher(BREATHABLE_MATERIALS)
+_WARM_MATERIAL_MATCHER = KeywordMatcher(WARM_MATERIALS)
+_TOP_TYPE_MATCHER = RuleMatcher(((kws, key) for key, kws in _TOP_TYPE_GROUPS.items()), "other_top")
+_BOTTOM_TYPE_MATCHER = RuleMatcher(((kws, key) for key, kws in _BOTTOM_TYPE_GROUPS.items()), "other_bottom")
+_COLOR_BUCKET_MATCHER = RuleMatcher(((kws, key) for key, kws in _COLOR_BUCKETS.items()), "other")
+
+
 # ---------------------------------------------------------------------------
 # Color-harmony helpers
 # ---------------------------------------------------------------------------
@@ -179,7 +204,7 @@ def _is_neutral(color: Optional[str]) -> bool:
     if not color:
         return False
     c = color.lower()
-    return any(n in c for n in NEUTRAL_COLORS)
+    return _NEUTRAL_MATCHER.contains(c)
 
 
 def _colors_clash(color_a: Optional[str], color_b: Optional[str]) -> bool:
@@ -192,8 +217,8 @@ def _colors_clash(color_a: Optional[str], color_b: Optional[str]) -> bool:
     a, b = color_a.lower(), color_b.lower()
     if _is_neutral(a) or _is_neutral(b):
         return False
-    a_warm = any(w in a for w in WARM_COLORS)
-    b_warm = any(w in b for w in WARM_COLORS)
+    a_warm = _WARM_MATCHER.contains(a)
+    b_warm = _WARM_MATCHER.contains(b)
     return a_warm and b_warm
 
 
@@ -220,7 +245,7 @@ def _is_formal_occasion(occasion: Optional[str]) -> bool:
     if not occasion:
         return False
     occ = occasion.lower().strip()
-    return any(f in occ for f in FORMAL_OCCASIONS)
+    return _FORMAL_OCCASION_MATCHER.contains(occ)
 
 
 def _formal_compatibility_score(item: Dict[str, Any]) -> int:
@@ -236,19 +261,19 @@ def _formal_compatibility_score(item: Dict[str, Any]) -> int:
     formality_val = profile.get("formality")
 
     score = 0
-    if any(kw in item_type for kw in FORMAL_TOP_KEYWORDS):
+    if _FORMAL_TOP_MATCHER.contains(item_type):
         score += 2
-    elif any(kw in item_type for kw in CASUAL_TOP_KEYWORDS):
+    elif _CASUAL_TOP_MATCHER.contains(item_type):
         score -= 2
-    if any(kw in item_type for kw in FORMAL_BOTTOM_KEYWORDS):
+    if _FORMAL_BOTTOM_MATCHER.contains(item_type):
         score += 2
-    elif any(kw in item_type for kw in CASUAL_BOTTOM_KEYWORDS):
+    elif _CASUAL_BOTTOM_MATCHER.contains(item_type):
         score -= 2
-    if any(kw in item_type for kw in FORMAL_SHOE_KEYWORDS):
+    if _FORMAL_SHOE_MATCHER.contains(item_type):
         score += 2
-    elif any(kw in item_type for kw in CASUAL_SHOE_KEYWORDS):
+    elif _CASUAL_SHOE_MATCHER.contains(item_type):
         score -= 2
-    if any(kw in item_type for kw in FORMAL_LAYER_KEYWORDS):
+    if _FORMAL_LAYER_MATCHER.contains(item_type):
         score += 2
     if formality_val is not None:
         try:
@@ -271,7 +296,7 @@ def _is_loud_pattern(pattern: Optional[str]) -> bool:
     if not pattern:
         return False
     p = pattern.lower()
-    return any(loud in p for loud in LOUD_PATTERNS)
+    return _LOUD_PATTERN_MATCHER.contains(p)
 
 
 # ---------------------------------------------------------------------------
@@ -290,8 +315,8 @@ def _material_weather_score(material: Optional[str], temp_f: Optional[float]) ->
     if not material or temp_f is None:
         return 0
     m = material.lower()
-    is_breathable = any(bm in m for bm in BREATHABLE_MATERIALS)
-    is_warm = any(wm in m for wm in WARM_MATERIALS)
+    is_breathable = _BREATHABLE_MATCHER.contains(m)
+    is_warm = _WARM_MATERIAL_MATCHER.contains(m)
     if temp_f >= 80:
         if is_breathable:
             return 1
@@ -313,19 +338,7 @@ def _normalize_category(profile: Optional[Dict[str, Any]]) -> str:
     """Map item profile to: top, bottom, shoes, dress, outerwear, or other."""
     if not profile:
         return "other"
-    c = (profile.get("category") or "").lower()
-    t = (profile.get("type") or "").lower()
-    if c in ("top", "tops") or any(x in t for x in ("shirt", "tee", "blouse", "sweater", "polo")):
-        return "top"
-    if c in ("bottom", "bottoms") or any(x in t for x in ("pants", "jeans", "chinos", "shorts", "skirt", "trouser")):
-        return "bottom"
-    if c in ("shoes", "shoe") or any(x in t for x in ("sneaker", "boot", "loafer", "heel", "sandal", "trainer")):
-        return "shoes"
-    if c == "dress" or "dress" in t:
-        return "dress"
-    if c == "outerwear" or any(x in t for x in ("jacket", "coat", "blazer", "cardigan", "overcoat", "hoodie")):
-        return "outerwear"
-    return "other"
+    return outfit_category((profile.get("category") or "").lower(), (profile.get("type") or "").lower())
 
 
 # ---------------------------------------------------------------------------
@@ -335,19 +348,13 @@ def _normalize_category(profile: Optional[Dict[str, Any]]) -> str:
 def _top_type_group(item: Dict[str, Any]) -> str:
     """Return the canonical top-type group key for this item, or 'other_top'."""
     item_type = ((item.get("profile") or {}).get("type") or "").lower().strip()
-    for group, keywords in _TOP_TYPE_GROUPS.items():
-        if any(kw in item_type for kw in keywords):
-            return group
-    return "other_top"
+    return _TOP_TYPE_MATCHER.match(item_type)
 
 
 def _bottom_type_group(item: Dict[str, Any]) -> str:
     """Return the canonical bottom-type group key, or 'other_bottom'."""
     item_type = ((item.get("profile") or {}).get("type") or "").lower().strip()
-    for group, keywords in _BOTTOM_TYPE_GROUPS.items():
-        if any(kw in item_type for kw in keywords):
-            return group
-    return "other_bottom"
+    return _BOTTOM_TYPE_MATCHER.match(item_type)
 
 
 def _color_bucket(color: Optional[str]) -> str:
@@ -355,10 +362,7 @@ def _color_bucket(color: Optional[str]) -> str:
     if not color:
         return "unknown"
     c = color.lower().strip()
-    for bucket, keywords in _COLOR_BUCKETS.items():
-        if any(kw in c for kw in keywords):
-            return bucket
-    return "other"
+    return _COLOR_BUCKET_MATCHER.match(c)
 
 
 def _outfit_fingerprint(combo_items: List[Dict[str, Any]]) -> Tuple[str, str, str, str]:
@@ -636,6 +640,25 @@ def _weather_pre_filter(
     return filtered if filtered else items
 
 
+def _weather_pre_filter_columns(
+    items: List[Dict[str, Any]],
+    temp_f: Optional[float],
+    cols: Any,
+) -> Tuple[List[Dict[str, Any]], Any]:
+    """_weather_pre_filter over _profile_columns(items); also returns the columns of the kept items."""
+    if temp_f is None or temp_f < 80:
+        return items, cols
+    heavy = HEAVY_LAYER_KEYWORDS | {"hoodie", "cardigan"}
+    drop = cols.cat["category"].equals("outerwear") & cols.cat["type"].where(
+        lambda t: any(kw in t for kw in heavy), "heavy_layer"
+    )
+    if drop.all() or not drop.any():
+        return items, cols
+    import numpy as np
+    rows = np.flatnonzero(~drop)
+    return [items[i] for i in rows], cols.take(rows)
+
+
 # ---------------------------------------------------------------------------
 # Internal LLM schema
 # ---------------------------------------------------------------------------
@@ -816,13 +839,16 @@ def _call_openai_text(
             response_format={"type": "json_object"},
             timeout=20.0,
         )
+        record_llm_usage("generate_outfits", "gpt-4o-mini", resp)
         raw = (resp.choices[0].message.content or "").strip()
         if not raw:
+            LLM_CALLS.inc(caller="generate_outfits", outcome="invalid")
             return None
 
         data = json.loads(raw)
         outfits_raw = data.get("outfits")
         if not isinstance(outfits_raw, list):
+            LLM_CALLS.inc(caller="generate_outfits", outcome="invalid")
             return None
 
         valid_ids = {str(it.get("id")) for it in items}
@@ -859,13 +885,16 @@ def _call_openai_text(
 
             result.append({"itemIds": item_ids, "why": reasoning, "notes": notes})
 
+        LLM_CALLS.inc(caller="generate_outfits", outcome="ok" if result else "invalid")
         return result if result else None
 
     except (json.JSONDecodeError, KeyError, TypeError) as e:
         print(f"[generate_outfits] OpenAI JSON error: {e}")
+        LLM_CALLS.inc(caller="generate_outfits", outcome="invalid")
         return None
     except Exception as e:
         print(f"[generate_outfits] OpenAI call failed: {e}")
+        LLM_CALLS.inc(caller="generate_outfits", outcome="error")
         return None
 
 
@@ -876,7 +905,7 @@ def _call_openai_text(
 def _deterministic_outfits(
     items: List[Dict[str, Any]],
     occasion: Optional[str],
-    weather: Optional[Dict[str, Any]],
+    weather: Union[Dict[str, Any], WeatherContext, None],
 ) -> List[Dict[str, Any]]:
     """
     Fallback outfit builder when OpenAI is unavailable.
@@ -906,9 +935,7 @@ def _deterministic_outfits(
     occasion_str = (occasion or "casual").lower()
     is_formal = _is_formal_occasion(occasion)
 
-    temp_f: Optional[float] = None
-    if weather and isinstance(weather.get("tempF"), (int, float)):
-        temp_f = float(weather["tempF"])
+    temp_f = WeatherContext.from_weather(weather).temp_f
 
     # Hot weather: drop outerwear entirely (mirrors LLM rule 2)
     if temp_f is not None and temp_f >= 80:
@@ -1208,6 +1235,15 @@ def _mark_duplicates(outfits: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 # Wardrobe shortlist for LLM (Phase 2: latency reduction / Phase 3: quality)
 # ---------------------------------------------------------------------------
 
+# Break shortlist score ties by embedding similarity to the occasion/weather
+# (services/embeddings.py). Off by default; scores still decide everything else.
+AI_SEMANTIC_SHORTLIST = os.getenv("AI_SEMANTIC_SHORTLIST", "false").lower() in ("true", "1", "yes")
+
+# Score the shortlist (and the hot-weather pre-filter) for the whole request
+# at once over services/wardrobe_columns.py instead of item by item.
+# _shortlist_score / _weather_pre_filter stay the reference; results match.
+AI_OUTFITS_VECTOR_SCORING = os.getenv("AI_OUTFITS_VECTOR_SCORING", "false").lower() in ("true", "1", "yes")
+
 _LLM_CATEGORY_LIMITS: Dict[str, int] = {
     "top":       5,
     "bottom":    5,
@@ -1274,14 +1310,7 @@ def _shortlist_score(
             pass
 
     # Season / weather — prefer items suited to the current temperature.
-    # profile.season is Mixed: normalise list ["summer","spring"] or plain string.
-    season_raw = p.get("season")
-    if isinstance(season_raw, list):
-        season = " ".join(str(s).lower() for s in season_raw)
-    elif season_raw:
-        season = str(season_raw).lower()
-    else:
-        season = ""
+    season = _season_text(p.get("season"))
     if temp_f is not None and season:
         if temp_f >= 75 and any(s in season for s in ("summer", "spring")):
             score += 1
@@ -1293,14 +1322,7 @@ def _shortlist_score(
             score -= 1
 
     # Occasion tags (legacy field) — small bonus when tags overlap the occasion.
-    # occasionTags schema is [String] but legacy docs may store a plain string.
-    occ_tags_raw = item.get("occasionTags")
-    if isinstance(occ_tags_raw, str):
-        occ_tags: List[str] = [occ_tags_raw] if occ_tags_raw else []
-    elif isinstance(occ_tags_raw, list):
-        occ_tags = [t for t in occ_tags_raw if isinstance(t, str)]
-    else:
-        occ_tags = []
+    occ_tags = _occasion_tags(item)
     if occasion and occ_tags:
         occ_lower = occasion.lower()
         if any(occ_lower in t.lower() or t.lower() in occ_lower for t in occ_tags):
@@ -1309,10 +1331,130 @@ def _shortlist_score(
     return score
 
 
+def _season_text(season_raw: Any) -> str:
+    """profile.season is Mixed: normalise list ["summer","spring"] or plain string."""
+    if isinstance(season_raw, list):
+        return " ".join(str(s).lower() for s in season_raw)
+    if season_raw:
+        return str(season_raw).lower()
+    return ""
+
+
+def _occasion_tags(item: Dict[str, Any]) -> List[str]:
+    """occasionTags schema is [String] but legacy docs may store a plain string."""
+    occ_tags_raw = item.get("occasionTags")
+    if isinstance(occ_tags_raw, str):
+        return [occ_tags_raw] if occ_tags_raw else []
+    if isinstance(occ_tags_raw, list):
+        return [t for t in occ_tags_raw if isinstance(t, str)]
+    return []
+
+
+def _formality(profile: Dict[str, Any]) -> Optional[int]:
+    formality_val = profile.get("formality")
+    if formality_val is None:
+        return None
+    try:
+        return int(formality_val)
+    except (ValueError, TypeError):
+        return None
+
+
+def _profile_columns(items: List[Dict[str, Any]]) -> Any:
+    """The request's items as WardrobeColumns, holding what the shortlist and pre-filter read."""
+    from services.wardrobe_columns import WardrobeColumns
+
+    profiles = [it.get("profile") or {} for it in items]
+    formality = [_formality(p) for p in profiles]
+    return WardrobeColumns(
+        ids=[it.get("id") or "" for it in items],
+        categorical={
+            "category": [_normalize_category(it.get("profile")) for it in items],
+            "type": [(p.get("type") or "").lower() for p in profiles],
+            "season": [_season_text(p.get("season")) for p in profiles],
+        },
+        multi={"occasion_tags": [[t.lower() for t in _occasion_tags(it)] for it in items]},
+        numeric={
+            "favorite": [bool(it.get("isFavorite")) for it in items],
+            "has_type": [bool(p.get("type")) for p in profiles],
+            "has_color": [bool(p.get("primaryColor")) for p in profiles],
+            "has_hints": [bool(p.get("pairingHints")) for p in profiles],
+            "has_material": [bool(p.get("material")) for p in profiles],
+            "formality_known": [f is not None for f in formality],
+            # Only compared against 3/5/6, so clamping keeps out-of-range values exact.
+            "formality": [min(max(f, -1), 11) if f is not None else 0 for f in formality],
+        },
+        numeric_dtypes={
+            "favorite": bool, "has_type": bool, "has_color": bool, "has_hints": bool,
+            "has_material": bool, "formality_known": bool, "formality": "int8",
+        },
+    )
+
+
+def _shortlist_scores(cols: Any, occasion: Optional[str], temp_f: Optional[float]) -> Any:
+    """_shortlist_score for every item in `cols` (int array, same order)."""
+    num = cols.num
+    score = (
+        4 * num["favorite"].astype("int32")
+        + 2 * num["has_type"] + num["has_color"] + num["has_hints"] + num["has_material"]
+    )
+
+    if occasion:
+        f, known = num["formality"], num["formality_known"]
+        if _is_formal_occasion(occasion):
+            score += 2 * (known & (f >= 6)) - (known & (f <= 3))
+        else:
+            score += known & (f <= 5)
+
+    if temp_f is not None:
+        season = cols.cat["season"]
+        if temp_f >= 75:
+            match = season.where(lambda s: "summer" in s or "spring" in s, "warm")
+            score += match.astype("int32") - (~match & season.where(lambda s: "winter" in s, "winter"))
+        elif temp_f <= 50:
+            match = season.where(lambda s: "winter" in s or "fall" in s or "autumn" in s, "cold")
+            score += match.astype("int32") - (~match & season.where(lambda s: "summer" in s, "summer"))
+
+    if occasion:
+        occ_lower = occasion.lower()
+        score += cols.multi["occasion_tags"].any(
+            lambda t: occ_lower in t or t in occ_lower, ("occasion", occ_lower)
+        )
+
+    return score
+
+
+def _semantic_query(occasion: Optional[str], temp_f: Optional[float]) -> str:
+    """Free-text shortlist query: the occasion plus the season words the weather implies."""
+    parts = [occasion or ""]
+    if temp_f is not None:
+        if temp_f >= 75:
+            parts.append("summer lightweight breathable")
+        elif temp_f <= 50:
+            parts.append("winter warm layer")
+        else:
+            parts.append("spring fall")
+    return " ".join(p for p in parts if p)
+
+
+def _semantic_scores(items: List[Dict[str, Any]], occasion: Optional[str], temp_f: Optional[float]) -> Dict[int, float]:
+    """id(item) -> similarity to _semantic_query; empty when disabled or unavailable."""
+    query = _semantic_query(occasion, temp_f)
+    if not AI_SEMANTIC_SHORTLIST or not query or not items:
+        return {}
+    try:
+        from services.embeddings import text_similarity
+        return {id(it): float(s) for it, s in zip(items, text_similarity(items, query))}
+    except Exception as e:
+        print(f"[GenerateOutfits] Semantic shortlist skipped: {e}")
+        return {}
+
+
 def _shortlist_for_llm(
     items: List[Dict[str, Any]],
     occasion: Optional[str] = None,
     temp_f: Optional[float] = None,
+    cols: Any = None,
 ) -> List[Dict[str, Any]]:
     """
     Select a category-balanced shortlist for the LLM prompt.
@@ -1321,19 +1463,25 @@ def _shortlist_for_llm(
     and OpenAI latency stay predictable.  Within each category items are ranked
     by _shortlist_score, which rewards favorites, rich profiles, formality fit,
     and weather/season relevance — surfacing the most contextually appropriate
-    candidates without changing any stored data.
+    candidates without changing any stored data.  With AI_SEMANTIC_SHORTLIST,
+    equal scores are ordered by embedding similarity to the occasion/weather.
+    `cols` (_profile_columns of exactly these items) scores them all at once.
     Never returns empty if items is non-empty.
     """
+    if cols is not None:
+        return _shortlist_from_columns(items, occasion, temp_f, cols)
+
     by_cat: Dict[str, List[Dict[str, Any]]] = {}
     for it in items:
         cat = _normalize_category(it.get("profile"))
         by_cat.setdefault(cat, []).append(it)
 
+    semantic = _semantic_scores(items, occasion, temp_f)
     result: List[Dict[str, Any]] = []
     for cat, limit in _LLM_CATEGORY_LIMITS.items():
         group = sorted(
             by_cat.get(cat, []),
-            key=lambda it: _shortlist_score(it, occasion, temp_f),
+            key=lambda it: (_shortlist_score(it, occasion, temp_f), semantic.get(id(it), 0.0)),
             reverse=True,
         )
         result.extend(group[:limit])
@@ -1341,10 +1489,46 @@ def _shortlist_for_llm(
     return result if result else items
 
 
+def _shortlist_from_columns(
+    items: List[Dict[str, Any]],
+    occasion: Optional[str],
+    temp_f: Optional[float],
+    cols: Any,
+) -> List[Dict[str, Any]]:
+    import numpy as np
+
+    scores = _shortlist_scores(cols, occasion, temp_f)
+    semantic = _semantic_scores(items, occasion, temp_f)
+    category = cols.cat["category"]
+    result: List[Dict[str, Any]] = []
+    for cat, limit in _LLM_CATEGORY_LIMITS.items():
+        rows = np.flatnonzero(category.equals(cat))
+        if semantic:
+            sims = np.array([semantic.get(id(items[i]), 0.0) for i in rows])
+            order = np.lexsort((-sims, -scores[rows]))
+        else:
+            order = np.argsort(-scores[rows], kind="stable")
+        result.extend(items[i] for i in rows[order[:limit]])
+
+    return result if result else items
+
+
 # ---------------------------------------------------------------------------
 # Public entry point
 # ---------------------------------------------------------------------------
 
+GENERATE_STAGE_SECONDS = Histogram(
+    "ai_generate_outfits_stage_seconds",
+    "generate_outfits stage latency (weather_prefilter, shortlist, llm_call, near_dup_check, fallback).",
+    ("stage",),
+)
+GENERATE_RESULTS = Counter(
+    "ai_generate_outfits_results_total",
+    "generate_outfits results by source (llm/fallback) and reason "
+    "(ok, backfilled, llm_disabled, llm_failed).",
+    ("source", "reason"),
+)
+
 def generate_outfits(
     items: List[Dict[str, Any]],
     occasion: Optional[str] = None,
@@ -1382,28 +1566,45 @@ def generate_outfits(
     elif isinstance(weather, dict):
         weather_dict = weather
 
-    temp_f: Optional[float] = None
-    if weather_dict and isinstance(weather_dict.get("tempF"), (int, float)):
-        temp_f = float(weather_dict["tempF"])
+    # Parsed once and shared by the pre-filter, shortlist and fallback
+    weather_ctx = WeatherContext.from_weather(weather_dict)
+    temp_f = weather_ctx.temp_f
+
+    clock = StageClock(GENERATE_STAGE_SECONDS)
 
     # Step 1: remove weather-inappropriate items before LLM sees them
-    filtered_items = _weather_pre_filter(items, temp_f)
+    cols = None
+    if AI_OUTFITS_VECTOR_SCORING:
+        try:
+            cols = _profile_columns(items)
+        except Exception as e:
+            print(f"[GenerateOutfits] Columnar scoring skipped: {e}")
+    if cols is not None:
+        filtered_items, cols = _weather_pre_filter_columns(items, temp_f, cols)
+    else:
+        filtered_items = _weather_pre_filter(items, temp_f)
+    clock.lap("weather_prefilter")
 
     # Step 2: LLM with structured prompt (formal + color + pattern + material + variety).
     # _mark_duplicates applied so LLM-fabricated variety (same itemIds, different titles)
     # is replaced with an honest limited-wardrobe message.
+    fallback_reason = "llm_disabled"
     if use_llm and (os.getenv("OPENAI_API_KEY") or "").strip():
         # Phase 2/3: cap items sent to LLM; rank by occasion + weather relevance.
-        llm_items = _shortlist_for_llm(filtered_items, occasion=occasion, temp_f=temp_f)
+        llm_items = _shortlist_for_llm(filtered_items, occasion=occasion, temp_f=temp_f, cols=cols)
+        clock.lap("shortlist")
         out = _call_openai_text(llm_items, occasion, loc_dict, weather_dict)
+        clock.lap("llm_call")
+        fallback_reason = "llm_failed"
         if out:
             out = _near_duplicate_check(out, llm_items, occasion, weather_dict)
             out = _filter_complete_outfits(out, llm_items)
+            clock.lap("near_dup_check")
             # Backfill: if completeness filtering dropped us below 3, pad with
             # deterministic outfits (from the full filtered set) so callers
             # consistently receive 3 outfits rather than 1 or 2.
             if len(out) < 3:
-                det_pad = _deterministic_outfits(filtered_items, occasion, weather_dict)
+                det_pad = _deterministic_outfits(filtered_items, occasion, weather_ctx)
                 det_pad = _filter_complete_outfits(det_pad, filtered_items)
                 seen = {frozenset(o.get("itemIds") or []) for o in out}
                 for candidate in det_pad:
@@ -1411,12 +1612,18 @@ def generate_outfits(
                         break
                     if frozenset(candidate.get("itemIds") or []) not in seen:
                         out.append(candidate)
+                clock.lap("fallback")
+                GENERATE_RESULTS.inc(source="llm", reason="backfilled")
+            else:
+                GENERATE_RESULTS.inc(source="llm", reason="ok")
             return _mark_duplicates(out)
 
     # Step 3: deterministic fallback with full scoring + diversity selection.
     # _select_diverse_outfits already enforces fingerprint diversity here;
     # _mark_duplicates is a final safety net for exact-ID duplicates.
     # Completeness filter applied here too — guards the single-item fallback path.
-    det = _deterministic_outfits(filtered_items, occasion, weather_dict)
+    det = _deterministic_outfits(filtered_items, occasion, weather_ctx)
     det = _filter_complete_outfits(det, filtered_items)
+    clock.lap("fallback")
+    GENERATE_RESULTS.inc(source="fallback", reason=fallback_reason)
     return _mark_duplicates(det)
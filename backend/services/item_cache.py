@@ -0,0 +1,203 @@
+# services/item_cache.py
+# Content-addressed cache for /process-item results.
+#
+# Re-uploads of the same photo by the same user (Node retries, failed saves,
+# front/back flows) hash to the same key, so the cached clean image + validated
+# ItemProfile can be reused without re-running rembg or the Vision call.
+#
+# Key  = sha256(raw image bytes | user id | clothing_type | vision model/prompt version)
+# Value = {"cleanKey": str, "profile": dict}
+#
+# Entries are per user because clean objects live under the user's R2 prefix.
+# A hit never hands out the cached cleanKey itself: process_item copies that
+# object to a new key, so every wardrobe item owns (and may delete) its own.
+# A re-upload therefore stores a second copy of the clean PNG: the cache saves
+# rembg and Vision work, not R2 storage.
+#
+# Storage: in-process LRU with TTL, optionally written through to a local
+# directory (PROCESS_ITEM_CACHE_DIR) so entries survive restarts.
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from services.metrics import Counter
+
+PROCESS_ITEM_CACHE_ENABLED = os.getenv("PROCESS_ITEM_CACHE", "true").lower() not in ("false", "0", "no")
+PROCESS_ITEM_CACHE_DIR = (os.getenv("PROCESS_ITEM_CACHE_DIR") or "").strip() or None
+PROCESS_ITEM_CACHE_MAX = int(os.getenv("PROCESS_ITEM_CACHE_MAX", "2000"))
+PROCESS_ITEM_CACHE_TTL_S = int(os.getenv("PROCESS_ITEM_CACHE_TTL_S", str(7 * 24 * 3600)))
+
+
+def content_hash(data: bytes) -> str:
+    """sha256 hex digest of raw bytes. Its prefix also starts R2 clean key names (not unique)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(raw_hash: str, user_id: str, clothing_type: Optional[str], model_version: str) -> str:
+    """Combine raw-content hash, user, user-selected type and Vision version into one key."""
+    material = f"{raw_hash}|{user_id}|{clothing_type or ''}|{model_version}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ProcessItemCache:
+    """
+    Thread-safe LRU + TTL cache. Values are small JSON-serialisable dicts.
+
+    When `directory` is set, every put is written to <directory>/<key[:2]>/<key>.json
+    and evictions delete the file, so the disk copy is bounded by `max_entries` too.
+    Disk entries are indexed lazily on first access and loaded on demand.
+    """
+
+    def __init__(self, directory: Optional[str], max_entries: int, ttl_seconds: int):
+        self.directory = directory
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        # key -> (stored_at, value or None when only indexed from disk)
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._disk_indexed = directory is None
+        self.hits = 0
+        self.misses = 0
+
+    # --- disk helpers -----------------------------------------------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _index_disk(self) -> None:
+        """Rebuild the LRU order from file mtimes (oldest first). Called once, under lock."""
+        self._disk_indexed = True
+        try:
+            found = []
+            for root, _dirs, files in os.walk(self.directory):
+                for name in files:
+                    if name.endswith(".json"):
+                        path = os.path.join(root, name)
+                        found.append((os.path.getmtime(path), name[:-5]))
+        except OSError as e:
+            print(f"[ItemCache] Could not index {self.directory}: {e}")
+            return
+        for mtime, key in sorted(found):
+            self._entries[key] = (mtime, None)
+        while len(self._entries) > self.max_entries:
+            self._evict_oldest()
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        try:
+            with open(self._path(key), "r") as f:
+                doc = json.load(f)
+            return float(doc["storedAt"]), doc["value"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_disk(self, key: str, stored_at: float, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"storedAt": stored_at, "value": value}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[ItemCache] Write failed for {key[:12]}: {e}")
+
+    def _delete_disk(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict_oldest(self) -> None:
+        key, _ = self._entries.popitem(last=False)
+        if self.directory:
+            self._delete_disk(key)
+
+    # --- public API -------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value or None. Expired entries are dropped."""
+        with self._lock:
+            if not self._disk_indexed:
+                self._index_disk()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if value is None:
+                loaded = self._read_disk(key)
+                if loaded is None:
+                    del self._entries[key]
+                    self.misses += 1
+                    return None
+                stored_at, value = loaded
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                if self.directory:
+                    self._delete_disk(key)
+                self.misses += 1
+                return None
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        stored_at = time.time()
+        with self._lock:
+            if not self._disk_indexed:
+                self._index_disk()
+            self._entries[key] = (stored_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+            if self.directory:
+                self._write_disk(key, stored_at, value)
+
+    def discard(self, key: str) -> None:
+        """Drop an entry (e.g. its clean object was deleted from R2)."""
+        with self._lock:
+            self._entries.pop(key, None)
+            if self.directory:
+                self._delete_disk(key)
+
+
+_cache: Optional[ProcessItemCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_process_item_cache() -> Optional[ProcessItemCache]:
+    """Process-wide cache instance, or None when disabled via PROCESS_ITEM_CACHE=false."""
+    global _cache
+    if not PROCESS_ITEM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ProcessItemCache(
+                    PROCESS_ITEM_CACHE_DIR,
+                    PROCESS_ITEM_CACHE_MAX,
+                    PROCESS_ITEM_CACHE_TTL_S,
+                )
+    return _cache
+
+
+def _cache_samples():
+    cache = _cache
+    if cache is None:
+        return []
+    return [({"result": "hit"}, cache.hits), ({"result": "miss"}, cache.misses)]
+
+
+PROCESS_ITEM_CACHE_REQUESTS = Counter(
+    "ai_process_item_cache_requests_total",
+    "Content-hash cache lookups in process_item by result (hit/miss).",
+    ("result",),
+    fn=_cache_samples,
+)
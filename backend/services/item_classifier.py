@@ -0,0 +1,68 @@
+# services/item_classifier.py
+# Keyword category classifiers shared by the agent and outfit generation,
+# compiled once onto services/rule_matcher.py and memoized per item fields.
+#
+#   agent_category(type, category, tags)  — top | bottom | shoe | jacket | other
+#       MyraAgent._categorize_item: substring hits anywhere in
+#       "<type> <category> <tags...>", jackets first so hoodies/sweaters tagged
+#       as tops still count as a layer.
+#
+#   outfit_category(category, type)        — top | bottom | shoes | dress | outerwear | other
+#       generate_outfits._normalize_category: a rule wins when the category is
+#       one of its exact names or the type contains one of its keywords; rules
+#       are tried in order.
+#
+# The two tables differ on purpose (a sweater is a layer for the agent's
+# cold-weather jacket slot but a top for generated outfits), so each keeps its
+# own rules; what they share is the compiled matching and the caching.
+# Inputs are expected lowercased, as at both call sites.
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Dict, Tuple
+
+from services.rule_matcher import RuleMatcher
+
+CLASSIFIER_CACHE_SIZE = 16384
+
+AGENT_CATEGORY_RULES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("jacket", ("hoodie", "sweater", "jacket", "coat", "blazer", "overcoat", "cardigan")),
+    ("top", ("top", "tshirt", "t-shirt", "shirt", "blouse", "polo", "tank", "camisole")),
+    ("bottom", ("jeans", "pants", "trousers", "skirt", "shorts", "bottom", "leggings")),
+    ("shoe", ("shoe", "sneaker", "boot", "heel", "sandal", "slide", "loafer", "slipper")),
+)
+
+# (value, exact category names, type keywords)
+OUTFIT_CATEGORY_RULES: Tuple[Tuple[str, Tuple[str, ...], Tuple[str, ...]], ...] = (
+    ("top", ("top", "tops"), ("shirt", "tee", "blouse", "sweater", "polo")),
+    ("bottom", ("bottom", "bottoms"), ("pants", "jeans", "chinos", "shorts", "skirt", "trouser")),
+    ("shoes", ("shoes", "shoe"), ("sneaker", "boot", "loafer", "heel", "sandal", "trainer")),
+    ("dress", ("dress",), ("dress",)),
+    ("outerwear", ("outerwear",), ("jacket", "coat", "blazer", "cardigan", "overcoat", "hoodie")),
+)
+
+_AGENT_MATCHER = RuleMatcher(((kws, value) for value, kws in AGENT_CATEGORY_RULES), "other")
+
+_NO_RULE = len(OUTFIT_CATEGORY_RULES)
+_OUTFIT_VALUES = tuple(value for value, _, _ in OUTFIT_CATEGORY_RULES) + ("other",)
+_OUTFIT_CATEGORY_RANK: Dict[str, int] = {}
+for _rank, (_, _names, _) in enumerate(OUTFIT_CATEGORY_RULES):
+    for _name in _names:
+        _OUTFIT_CATEGORY_RANK.setdefault(_name, _rank)
+_OUTFIT_TYPE_MATCHER = RuleMatcher(
+    ((kws, rank) for rank, (_, _, kws) in enumerate(OUTFIT_CATEGORY_RULES)), _NO_RULE
+)
+
+
+@lru_cache(maxsize=CLASSIFIER_CACHE_SIZE)
+def agent_category(item_type: str, category: str, tags: Tuple[str, ...] = ()) -> str:
+    """Rough agent category from lowercased type, category and tags."""
+    return _AGENT_MATCHER.match(f"{item_type} {category} {' '.join(tags)}")
+
+
+@lru_cache(maxsize=CLASSIFIER_CACHE_SIZE)
+def outfit_category(category: str, item_type: str) -> str:
+    """Outfit-generation category from lowercased profile category and type."""
+    # First rule whose exact name or type keyword hits = lower of the two ranks.
+    rank = min(_OUTFIT_CATEGORY_RANK.get(category, _NO_RULE), _OUTFIT_TYPE_MATCHER.match(item_type))
+    return _OUTFIT_VALUES[rank]
@@ -0,0 +1,339 @@
+# services/jobs.py
+# Durable asynchronous job queue for /process-item.
+#
+# POST /process-item/jobs returns a job ID immediately. A worker pool then runs
+# fetch → rembg → R2 upload → Vision, and the job's state lives in a store:
+#   - MongoDB "process_jobs" collection when the AI service is connected to Mongo
+#   - a local SQLite file (JOBS_DB_PATH) otherwise, the stand-in for dev / mock DB
+#
+# Jobs are idempotent by rawKey: re-submitting the same rawKey returns the
+# existing job. Re-submitting a failed job re-queues it; re-submitting a failed or
+# queued job also stores the new rawUrl (signed URLs expire). A worker claims a job
+# with a conditional queued → running update, so a job never runs twice. The clean key is
+# checkpointed once the upload succeeds, so a retry resumes at the Vision stage
+# and never redoes fetch/rembg/upload.
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from services.process_item import VisionFailedError, describe_clean_item, process_item
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH") or os.path.join(
+    os.path.dirname(__file__), "..", "data", "process_jobs.sqlite3"
+)
+# A "running" job not updated for this long is assumed orphaned (crashed worker) and re-queued.
+JOB_STALE_S = int(os.getenv("JOB_STALE_S", "300"))
+
+TERMINAL_STATUSES = ("done", "failed")
+
+_FIELDS = (
+    "jobId", "rawKey", "userId", "rawUrl", "clothingType", "status", "stage",
+    "cleanKey", "result", "failReason", "attempts", "createdAt", "updatedAt",
+)
+
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def _stale_before() -> str:
+    return (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(seconds=JOB_STALE_S)).isoformat()
+
+
+# ---------------------------------------------------------------------------
+# Stores
+# ---------------------------------------------------------------------------
+
+class SQLiteJobStore:
+    """Local job store. One connection per call keeps it safe across worker threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS process_jobs (
+                    jobId TEXT PRIMARY KEY,
+                    rawKey TEXT UNIQUE NOT NULL,
+                    userId TEXT, rawUrl TEXT, clothingType TEXT,
+                    status TEXT NOT NULL, stage TEXT,
+                    cleanKey TEXT, result TEXT, failReason TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    createdAt TEXT, updatedAt TEXT
+                )"""
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _row_to_job(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job.get("result") else None
+        return job
+
+    def create_or_get(self, job: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO process_jobs (jobId, rawKey, userId, rawUrl, clothingType, status, stage, "
+                "attempts, createdAt, updatedAt) VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?)",
+                (job["jobId"], job["rawKey"], job["userId"], job["rawUrl"], job["clothingType"],
+                 job["status"], job["stage"], job["createdAt"], job["updatedAt"]),
+            )
+            created = cur.rowcount == 1
+            row = conn.execute("SELECT * FROM process_jobs WHERE rawKey = ?", (job["rawKey"],)).fetchone()
+        return self._row_to_job(row), created
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM process_jobs WHERE jobId = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields["updatedAt"] = _now()
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"])
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE process_jobs SET {cols} WHERE jobId = ?", (*fields.values(), job_id))
+
+    def claim_retry(self, job_id: str, raw_url: str) -> bool:
+        """Atomically move a failed job back to queued with a fresh rawUrl. False if it was not failed."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE process_jobs SET status = 'queued', rawUrl = ?, failReason = NULL, updatedAt = ? "
+                "WHERE jobId = ? AND status = 'failed'",
+                (raw_url, _now(), job_id),
+            )
+        return cur.rowcount == 1
+
+    def refresh_queued_url(self, job_id: str, raw_url: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE process_jobs SET rawUrl = ? WHERE jobId = ? AND status = 'queued'",
+                (raw_url, job_id),
+            )
+
+    def claim_run(self, job_id: str, stale_before: str) -> Optional[Dict[str, Any]]:
+        """
+        Atomically move a queued (or stale running) job to running and count the
+        attempt. Returns the claimed job, or None if another worker has it or it ended.
+        """
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE process_jobs SET status = 'running', attempts = COALESCE(attempts, 0) + 1, updatedAt = ? "
+                "WHERE jobId = ? AND (status = 'queued' OR (status = 'running' AND updatedAt < ?))",
+                (_now(), job_id, stale_before),
+            )
+            if cur.rowcount != 1:
+                return None
+            row = conn.execute("SELECT * FROM process_jobs WHERE jobId = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def recoverable_ids(self, stale_before: str) -> list:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT jobId FROM process_jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND updatedAt < ?)",
+                (stale_before,),
+            ).fetchall()
+        return [r["jobId"] for r in rows]
+
+
+class MongoJobStore:
+    """Job store on the AI service's Mongo connection (collection: process_jobs)."""
+
+    def __init__(self, db):
+        self.col = db["process_jobs"]
+        try:
+            self.col.create_index("rawKey", unique=True)
+        except Exception as e:
+            print(f"[Jobs] Could not ensure rawKey index: {e}")
+
+    @staticmethod
+    def _doc_to_job(doc: Optional[dict]) -> Optional[Dict[str, Any]]:
+        if doc is None:
+            return None
+        return {k: doc.get(k) for k in _FIELDS}
+
+    def create_or_get(self, job: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        from pymongo import ReturnDocument
+
+        doc = {**job, "_id": job["jobId"], "attempts": 0}
+        on_insert = {k: v for k, v in doc.items() if k != "rawKey"}  # rawKey comes from the filter
+        before = self.col.find_one_and_update(
+            {"rawKey": job["rawKey"]},
+            {"$setOnInsert": on_insert},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+        if before is None:
+            return self._doc_to_job(doc), True
+        return self._doc_to_job(before), False
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._doc_to_job(self.col.find_one({"_id": job_id}))
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields["updatedAt"] = _now()
+        self.col.update_one({"_id": job_id}, {"$set": fields})
+
+    def claim_retry(self, job_id: str, raw_url: str) -> bool:
+        res = self.col.update_one(
+            {"_id": job_id, "status": "failed"},
+            {"$set": {"status": "queued", "rawUrl": raw_url, "failReason": None, "updatedAt": _now()}},
+        )
+        return res.modified_count == 1
+
+    def refresh_queued_url(self, job_id: str, raw_url: str) -> None:
+        self.col.update_one({"_id": job_id, "status": "queued"}, {"$set": {"rawUrl": raw_url}})
+
+    def claim_run(self, job_id: str, stale_before: str) -> Optional[Dict[str, Any]]:
+        from pymongo import ReturnDocument
+
+        doc = self.col.find_one_and_update(
+            {"_id": job_id, "$or": [{"status": "queued"}, {"status": "running", "updatedAt": {"$lt": stale_before}}]},
+            {"$set": {"status": "running", "updatedAt": _now()}, "$inc": {"attempts": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        return self._doc_to_job(doc)
+
+    def recoverable_ids(self, stale_before: str) -> list:
+        docs = self.col.find(
+            {"$or": [{"status": "queued"}, {"status": "running", "updatedAt": {"$lt": stale_before}}]},
+            {"_id": 1},
+        )
+        return [d["_id"] for d in docs]
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+class JobRunner:
+    """Executes queued jobs on a bounded thread pool and records stage progress in the store."""
+
+    def __init__(self, store, workers: int = JOB_WORKERS):
+        self.store = store
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="process-job")
+        self._inflight: set = set()
+        self._lock = threading.Lock()
+
+    def submit(self, user_id: str, raw_key: str, raw_url: str, clothing_type: Optional[str]) -> Tuple[Dict[str, Any], bool]:
+        """
+        Create (or find) the job for raw_key and make sure it is scheduled.
+        Returns (job, created). Done jobs are returned untouched; failed jobs are re-queued.
+        An existing failed or queued job picks up raw_url, which may be a newly signed URL.
+        """
+        now = _now()
+        job, created = self.store.create_or_get({
+            "jobId": uuid.uuid4().hex,
+            "rawKey": raw_key,
+            "userId": user_id,
+            "rawUrl": raw_url,
+            "clothingType": clothing_type,
+            "status": "queued",
+            "stage": "queued",
+            "createdAt": now,
+            "updatedAt": now,
+        })
+        if not created:
+            if job["status"] == "failed" and self.store.claim_retry(job["jobId"], raw_url):
+                job = self.store.get(job["jobId"])
+            elif job["status"] == "queued" and job.get("rawUrl") != raw_url:
+                self.store.refresh_queued_url(job["jobId"], raw_url)
+                job = {**job, "rawUrl": raw_url}
+        if job["status"] == "queued":
+            self._schedule(job["jobId"])
+        return job, created
+
+    def recover(self) -> int:
+        """Re-schedule queued jobs and stale running jobs (e.g. after a restart)."""
+        ids = self.store.recoverable_ids(_stale_before())
+        for job_id in ids:
+            self._schedule(job_id)
+        if ids:
+            print(f"[Jobs] Recovered {len(ids)} pending job(s)")
+        return len(ids)
+
+    def _schedule(self, job_id: str) -> None:
+        with self._lock:
+            if job_id in self._inflight:
+                return
+            self._inflight.add(job_id)
+        self._pool.submit(self._run, job_id)
+
+    def _run(self, job_id: str) -> None:
+        try:
+            job = self.store.claim_run(job_id, _stale_before())
+            if not job:
+                return  # already running elsewhere, or finished
+
+            def _on_stage(stage: str, checkpoint: dict) -> None:
+                self.store.update(job_id, stage=stage, **checkpoint)
+
+            try:
+                if job.get("cleanKey"):
+                    # Resume: clean image already in R2 from a previous attempt.
+                    _on_stage("vision", {})
+                    result = describe_clean_item(job["cleanKey"], job.get("clothingType"))
+                else:
+                    result = process_item(
+                        job["userId"], job["rawKey"], job["rawUrl"],
+                        clothing_type=job.get("clothingType"),
+                        on_stage=_on_stage,
+                    )
+            except VisionFailedError as e:
+                self.store.update(job_id, status="failed", failReason=str(e))
+                return
+
+            if result.get("status") == "ready":
+                self.store.update(job_id, status="done", stage="done", result=result, failReason=None)
+            else:
+                self.store.update(job_id, status="failed", failReason=result.get("failReason"), result=result)
+        except Exception as e:
+            print(f"[Jobs] job {job_id} crashed: {e}")
+            try:
+                self.store.update(job_id, status="failed", failReason=f"Unexpected error: {e}")
+            except Exception:
+                pass
+        finally:
+            with self._lock:
+                self._inflight.discard(job_id)
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def _make_store():
+    from db.mongo import get_db
+
+    db = get_db()
+    if getattr(db, "database_type", None) == "mongo":
+        return MongoJobStore(db)
+    return SQLiteJobStore(JOBS_DB_PATH)
+
+
+def get_job_runner() -> JobRunner:
+    """Process-wide runner; the first call picks the store and recovers pending jobs."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                runner = JobRunner(_make_store())
+                runner.recover()
+                _runner = runner
+    return _runner
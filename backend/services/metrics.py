@@ -0,0 +1,302 @@
+# services/metrics.py
+# In-process metrics with a Prometheus text-format exporter (GET /metrics).
+# No client library or push gateway: counters, gauges and histograms are kept in
+# dicts keyed by label values and rendered on scrape.
+#
+#   Counter   — monotonically increasing (requests, tokens, fallbacks)
+#   Gauge     — current value (queue depth); may be backed by a callback
+#   Histogram — cumulative buckets + sum + count (latencies, in seconds)
+#
+# Metrics are module-level objects registered at import in the module that
+# updates them; every update is thread-safe (handlers run on the I/O pool).
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+# Callback samples: iterable of (labels, value)
+Samples = Iterable[Tuple[Dict[str, Any], float]]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            try:
+                lines.extend(metric.lines())
+            except Exception as e:  # a broken callback must not take /metrics down
+                print(f"[Metrics] Collecting {metric.name} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render() -> str:
+    """Prometheus text exposition (format 0.0.4) of every registered metric."""
+    return REGISTRY.render()
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        fn: Optional[Callable[[], Samples]] = None,
+        registry: Optional[Registry] = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._fn = fn
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def lines(self) -> List[str]:
+        if self._fn is not None:
+            samples = [(self._key(lbl), float(v)) for lbl, v in self._fn()]
+        else:
+            with self._lock:
+                samples = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in samples]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Optional[Registry] = REGISTRY,
+    ):
+        super().__init__(name, documentation, labelnames, registry=registry)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def lines(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._series.items())
+        out: List[str] = []
+        for key, (counts, total, count) in snapshot:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = 'le="' + _format_value(bound) + '"'
+                out.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            out.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            out.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return out
+
+
+class StageClock:
+    """
+    Lap timer for sequential pipeline stages:
+
+        clock = StageClock(AGENT_STAGE_SECONDS)
+        rows = read_wardrobe()
+        clock.lap("wardrobe_read")     # observes time since the previous lap
+
+    `laps` keeps the per-stage milliseconds for request-level log events.
+    """
+
+    def __init__(self, histogram: Histogram, **labels: Any):
+        self.histogram = histogram
+        self.labels = labels
+        self.laps: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> float:
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self.histogram.observe(elapsed, stage=stage, **self.labels)
+        self.laps[stage] = round(self.laps.get(stage, 0.0) + elapsed * 1000, 2)
+        return elapsed
+
+    def skip(self) -> None:
+        """Restart the lap without recording (time spent outside any stage)."""
+        self._last = time.perf_counter()
+
+
+# ---------------------------------------------------------------------------
+# Shared metrics (used by more than one module)
+# ---------------------------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "ai_http_request_duration_seconds",
+    "HTTP request latency by route template, method and status.",
+    ("route", "method", "status"),
+)
+
+LLM_TOKENS = Counter(
+    "ai_llm_tokens_total",
+    "OpenAI tokens used, by caller and token kind (prompt/completion).",
+    ("caller", "model", "kind"),
+)
+
+LLM_CALLS = Counter(
+    "ai_llm_calls_total",
+    "OpenAI calls by caller and outcome (ok/error/invalid).",
+    ("caller", "outcome"),
+)
+
+
+def record_llm_usage(caller: str, model: str, resp: Any) -> None:
+    """Count prompt/completion tokens from an OpenAI response's `usage` block, if present."""
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        return
+    for kind in ("prompt", "completion"):
+        n = getattr(usage, f"{kind}_tokens", None)
+        if isinstance(n, (int, float)) and n > 0:
+            LLM_TOKENS.inc(n, caller=caller, model=model, kind=kind)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing every HTTP request. The route label is the
+    matched path template ("/jobs/{job_id}"), so IDs do not explode cardinality;
+    requests that never reach a route (404s, admission rejections) are "unrouted".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                route=getattr(route, "path", None) or "unrouted",
+                method=scope.get("method", ""),
+                status=status[0],
+            )
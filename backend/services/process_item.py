@@ -5,19 +5,30 @@ import os
 import json
 import time
 import uuid
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import Tuple, Optional
+from typing import Callable, Dict, Tuple, Optional
 
 
 class VisionFailedError(Exception):
     """Raised when Vision step fails; caller should return HTTP 502."""
 
-import requests
-from PIL import Image
+from services.item_cache import cache_key, content_hash, get_process_item_cache
+from services.avatar_mapping import AVATAR_MAPPING_VERSION, precompute_avatar_mapping
+from services.executors import get_cpu_pool, run_cpu
+from services.metrics import Counter, Histogram, LLM_CALLS, record_llm_usage
 
-# Lazy imports for heavy deps (rembg, boto3, openai)
+# Lazy imports for heavy deps (rembg, boto3, openai, requests, PIL); warm_up()
+# loads them in the background at startup.
 _rembg_remove = None
+_rembg_session = None
 _boto3_client = None
+_boto3_client_key: Optional[tuple] = None
+_boto3_client_lock = threading.Lock()
+_transfer_config = None
 
 
 def _get_rembg():
@@ -28,17 +39,75 @@ def _get_rembg():
     return _rembg_remove
 
 
+def _get_rembg_session():
+    """
+    ONNX session for REMBG_MODEL, loaded once per process. rembg.remove() without
+    a session argument builds a new one (re-reading the model) on every call.
+    """
+    global _rembg_session
+    if _rembg_session is None:
+        from rembg import new_session
+        _rembg_session = new_session(REMBG_MODEL)
+    return _rembg_session
+
+
 MAX_RAW_SIZE = 5 * 1024 * 1024  # 5 MB
 ALLOWED_CONTENT_TYPES = ("image/jpeg", "image/jpg", "image/png", "image/webp")
 CLEAN_PREFIX = (os.getenv("CLEAN_R2_PREFIX", "clean/")).rstrip("/") + "/"
+VISION_MODEL = os.getenv("VISION_MODEL", "gpt-4o")
+REMBG_MODEL = os.getenv("REMBG_MODEL", "u2net")
+# "url": Vision fetches the public R2 URL after upload (default)
+# "data_url": Vision gets an inline downscaled copy; R2 upload runs concurrently
+VISION_IMAGE_INPUT = os.getenv("VISION_IMAGE_INPUT", "url").strip().lower()
+VISION_MAX_SIDE = int(os.getenv("VISION_MAX_SIDE", "1024"))
+R2_UPLOAD_WORKERS = int(os.getenv("R2_UPLOAD_WORKERS", "4"))
+R2_MAX_POOL_CONNECTIONS = int(os.getenv("R2_MAX_POOL_CONNECTIONS", "32"))
+R2_MAX_ATTEMPTS = int(os.getenv("R2_MAX_ATTEMPTS", "5"))
+R2_MULTIPART_THRESHOLD = int(os.getenv("R2_MULTIPART_THRESHOLD", str(8 * 1024 * 1024)))
+R2_MULTIPART_CHUNKSIZE = int(os.getenv("R2_MULTIPART_CHUNKSIZE", str(8 * 1024 * 1024)))
+
+FETCH_POOL_SIZE = int(os.getenv("FETCH_POOL_SIZE", "16"))
+VISION_MAX_CONCURRENCY = int(os.getenv("VISION_MAX_CONCURRENCY", "8"))
+
+_upload_pool: Optional[ThreadPoolExecutor] = None
+_upload_pool_lock = threading.Lock()
+_http_session: Optional["requests.Session"] = None
+_http_session_lock = threading.Lock()
+_vision_slots = threading.BoundedSemaphore(VISION_MAX_CONCURRENCY)
+
+
+def _get_http_session() -> "requests.Session":
+    """
+    Shared requests.Session with a bounded connection pool so concurrent fetches
+    (batch imports) reuse TCP/TLS connections to R2 instead of reconnecting.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=FETCH_POOL_SIZE,
+                    pool_block=True,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
 
 
 def fetch_raw(raw_url: str) -> Tuple[bytes, str, Optional[str]]:
     """
     Fetch raw image from URL. Returns (bytes, content_type, error_msg).
     """
+    import requests
+
     try:
-        resp = requests.get(raw_url, timeout=30, stream=True)
+        resp = _get_http_session().get(raw_url, timeout=30, stream=True)
         resp.raise_for_status()
 
         content_type = (resp.headers.get("Content-Type") or "").split(";")[0].strip().lower()
@@ -61,11 +130,15 @@ def run_rembg(image_bytes: bytes, content_type: str) -> Tuple[bytes, Optional[st
     """
     Run background removal. Returns (png_bytes, error_msg).
     Output is PNG with transparent background.
+    Runs inside a CPU-pool worker (see _remove_background), so the pool's worker
+    count (AI_CPU_POOL_SIZE) is what bounds concurrent rembg calls.
     """
     try:
+        from PIL import Image
+
         img = Image.open(BytesIO(image_bytes)).convert("RGBA")
         remove_fn = _get_rembg()
-        out = remove_fn(img)
+        out = remove_fn(img, session=_get_rembg_session())
 
         buf = BytesIO()
         out.save(buf, format="PNG")
@@ -74,49 +147,173 @@ def run_rembg(image_bytes: bytes, content_type: str) -> Tuple[bytes, Optional[st
         return b"", str(e)
 
 
+def _r2_settings() -> Tuple[Optional[dict], Optional[str]]:
+    """Read R2 config from env. Returns (settings, error_msg)."""
+    account_id = os.getenv("R2_ACCOUNT_ID")
+    access_key = os.getenv("R2_ACCESS_KEY_ID")
+    secret_key = os.getenv("R2_SECRET_ACCESS_KEY")
+    bucket = os.getenv("R2_BUCKET")
+    public_base = (os.getenv("R2_PUBLIC_BASE_URL") or "").rstrip("/")
+
+    if not all([account_id, access_key, secret_key, bucket, public_base]):
+        return None, "R2 config missing: set R2_ACCOUNT_ID, R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY, R2_BUCKET, R2_PUBLIC_BASE_URL"
+
+    return {
+        # R2_ENDPOINT_URL points the client at a local S3 stand-in (MinIO, moto server)
+        "endpoint": os.getenv("R2_ENDPOINT_URL") or f"https://{account_id}.r2.cloudflarestorage.com",
+        "access_key": access_key,
+        "secret_key": secret_key,
+        "bucket": bucket,
+        "public_base": public_base,
+    }, None
+
+
+def get_r2_client(settings: dict):
+    """
+    Process-wide boto3 S3 client for R2, built once and shared by all threads
+    (boto3 clients are thread-safe; creating one per upload re-runs the botocore
+    loader and opens a fresh connection pool every time).
+
+    Rebuilt only if the endpoint or credentials change.
+    """
+    global _boto3_client, _boto3_client_key
+    client_key = (settings["endpoint"], settings["access_key"], settings["secret_key"])
+    if _boto3_client is not None and _boto3_client_key == client_key:
+        return _boto3_client
+    with _boto3_client_lock:
+        if _boto3_client is None or _boto3_client_key != client_key:
+            import boto3
+            from botocore.config import Config
+
+            _boto3_client = boto3.session.Session().client(
+                "s3",
+                endpoint_url=settings["endpoint"],
+                region_name="auto",
+                aws_access_key_id=settings["access_key"],
+                aws_secret_access_key=settings["secret_key"],
+                config=Config(
+                    signature_version="s3v4",
+                    max_pool_connections=R2_MAX_POOL_CONNECTIONS,
+                    retries={"max_attempts": R2_MAX_ATTEMPTS, "mode": "adaptive"},
+                    tcp_keepalive=True,
+                    connect_timeout=5,
+                    read_timeout=60,
+                ),
+            )
+            _boto3_client_key = client_key
+    return _boto3_client
+
+
+def _get_transfer_config():
+    global _transfer_config
+    if _transfer_config is None:
+        from boto3.s3.transfer import TransferConfig
+
+        _transfer_config = TransferConfig(
+            multipart_threshold=R2_MULTIPART_THRESHOLD,
+            multipart_chunksize=R2_MULTIPART_CHUNKSIZE,
+            max_concurrency=4,
+            use_threads=True,
+        )
+    return _transfer_config
+
+
+def _clean_key_for(user_id: str, content_hash: Optional[str] = None) -> str:
+    """
+    clean/<userId>/<content_hash>_<random>.png when the raw content hash is known,
+    else clean/<userId>/<timestamp>_<random>.png. Always a new key: each wardrobe
+    item owns its clean object (Node deletes it with the item or on a failed save),
+    so two items never share one, even for the same photo.
+    """
+    safe_user = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(user_id)[:64]) or "anon"
+    if content_hash:
+        return f"{CLEAN_PREFIX}{safe_user}/{content_hash[:32]}_{uuid.uuid4().hex[:12]}.png"
+    return f"{CLEAN_PREFIX}{safe_user}/{int(time.time() * 1000)}_{uuid.uuid4().hex[:12]}.png"
+
+
+def _remove_background(image_bytes: bytes, content_type: str) -> Tuple[bytes, Optional[str]]:
+    """
+    run_rembg on the shared CPU pool (services/executors.py), off the request threads.
+    At most AI_CPU_POOL_SIZE calls run at once across all requests; the rest queue
+    in the pool.
+    """
+    try:
+        return run_cpu(run_rembg, image_bytes, content_type)
+    except Exception as e:
+        return b"", f"CPU worker failed: {e}"
+
+
+def clean_url_for(clean_key: str) -> str:
+    public_base = (os.getenv("R2_PUBLIC_BASE_URL") or "").rstrip("/")
+    return f"{public_base}/{clean_key}"
+
+
 def upload_clean_to_r2(
     png_bytes: bytes,
     user_id: str,
+    content_hash: Optional[str] = None,
 ) -> Tuple[Optional[str], Optional[str]]:
     """
     Upload cleaned PNG to R2. Returns (clean_key, error_msg).
-    Key format: clean/<userId>/<timestamp>_<random>.png
+    Key format: see _clean_key_for. Always a new object per call; content_hash only
+    prefixes the name, it does not deduplicate.
     """
     try:
-        import boto3
-        from botocore.config import Config
+        import boto3  # noqa: F401
     except ImportError:
         return None, "boto3 not installed"
 
-    account_id = os.getenv("R2_ACCOUNT_ID")
-    access_key = os.getenv("R2_ACCESS_KEY_ID")
-    secret_key = os.getenv("R2_SECRET_ACCESS_KEY")
-    bucket = os.getenv("R2_BUCKET")
-    public_base = (os.getenv("R2_PUBLIC_BASE_URL") or "").rstrip("/")
+    settings, err = _r2_settings()
+    if err:
+        return None, err
 
-    if not all([account_id, access_key, secret_key, bucket, public_base]):
-        return None, "R2 config missing: set R2_ACCOUNT_ID, R2_ACCESS_KEY_ID, R2_SECRET_ACCESS_KEY, R2_BUCKET, R2_PUBLIC_BASE_URL"
+    key = _clean_key_for(user_id, content_hash)
 
-    endpoint = f"https://{account_id}.r2.cloudflarestorage.com"
-    safe_user = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(user_id)[:64]) or "anon"
-    key = f"{CLEAN_PREFIX}{safe_user}/{int(time.time() * 1000)}_{uuid.uuid4().hex[:12]}.png"
+    try:
+        client = get_r2_client(settings)
+        if len(png_bytes) >= R2_MULTIPART_THRESHOLD:
+            # Large objects: managed transfer splits into parallel multipart parts.
+            client.upload_fileobj(
+                BytesIO(png_bytes),
+                settings["bucket"],
+                key,
+                ExtraArgs={"ContentType": "image/png"},
+                Config=_get_transfer_config(),
+            )
+        else:
+            client.put_object(
+                Bucket=settings["bucket"],
+                Key=key,
+                Body=png_bytes,
+                ContentType="image/png",
+            )
+        return key, None
+    except Exception as e:
+        return None, str(e)
 
+
+def copy_clean_object(
+    source_key: str,
+    user_id: str,
+    content_hash: Optional[str] = None,
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Server-side copy of an existing clean object to a new key of the user's own
+    (see _clean_key_for). Returns (clean_key, error_msg); a missing source
+    (e.g. Node deleted it with its item) is an error.
+    """
+    settings, err = _r2_settings()
+    if err:
+        return None, err
+    key = _clean_key_for(user_id, content_hash)
     try:
-        client = boto3.client(
-            "s3",
-            endpoint_url=endpoint,
-            region_name="auto",
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            config=Config(signature_version="s3v4"),
-        )
-        client.put_object(
-            Bucket=bucket,
+        get_r2_client(settings).copy_object(
+            Bucket=settings["bucket"],
             Key=key,
-            Body=png_bytes,
+            CopySource={"Bucket": settings["bucket"], "Key": source_key},
             ContentType="image/png",
+            MetadataDirective="REPLACE",
         )
-        clean_url = f"{public_base}/{key}"
         return key, None
     except Exception as e:
         return None, str(e)
@@ -227,12 +424,24 @@ def _build_vision_prompts(clothing_type: Optional[str]) -> Tuple[str, str]:
     return system_prompt, user_prompt
 
 
+def vision_version(clothing_type: Optional[str]) -> str:
+    """
+    Identify the Vision configuration that produced a profile: model name plus a
+    hash of the exact prompts. Part of the process-item cache key, so editing a
+    prompt or switching model invalidates cached profiles automatically.
+    """
+    system_prompt, user_prompt = _build_vision_prompts(clothing_type)
+    digest = hashlib.sha256((system_prompt + "\n" + user_prompt).encode("utf-8")).hexdigest()[:16]
+    return f"{VISION_MODEL}:{digest}"
+
+
 def generate_item_profile_from_vision(
     clean_url: str,
     clothing_type: Optional[str] = None,
 ) -> Tuple[Optional[dict], Optional[str]]:
     """
     Call OpenAI Vision to generate ItemProfile. Returns (profile_dict, error_msg).
+    clean_url may be the public R2 URL or a base64 data URL (see _vision_data_url).
     Uses response_format=json_object for strict JSON. Non-clothing images get low confidence + safe defaults.
     clothing_type (optional): user-selected type ("shirt", "tshirt", "hoodie", "pant") used for type-aware prompting.
     """
@@ -250,23 +459,26 @@ def generate_item_profile_from_vision(
     system_prompt, user_prompt = _build_vision_prompts(clothing_type)
 
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": user_prompt},
-                        {"type": "image_url", "image_url": {"url": clean_url}},
-                    ],
-                },
-            ],
-            max_tokens=600,
-            response_format={"type": "json_object"},
-        )
+        with _vision_slots:
+            resp = client.chat.completions.create(
+                model=VISION_MODEL,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {
+                        "role": "user",
+                        "content": [
+                            {"type": "text", "text": user_prompt},
+                            {"type": "image_url", "image_url": {"url": clean_url}},
+                        ],
+                    },
+                ],
+                max_tokens=600,
+                response_format={"type": "json_object"},
+            )
+        record_llm_usage("vision", VISION_MODEL, resp)
         text = (resp.choices[0].message.content or "").strip()
         if not text:
+            LLM_CALLS.inc(caller="vision", outcome="invalid")
             return None, "Empty Vision response"
 
         data = json.loads(text)
@@ -276,8 +488,10 @@ def generate_item_profile_from_vision(
             if k not in data or not isinstance(data[k], list):
                 data[k] = []
 
+        LLM_CALLS.inc(caller="vision", outcome="ok")
         return data, None
     except json.JSONDecodeError as e:
+        LLM_CALLS.inc(caller="vision", outcome="invalid")
         try:
             raw = text  # text assigned before json.loads
         except NameError:
@@ -285,6 +499,7 @@ def generate_item_profile_from_vision(
         preview = (raw[:200] + "...") if raw and len(raw) > 200 else (raw or "")
         return None, f"Invalid JSON from Vision: {e}. Preview: {preview!r}"
     except Exception as e:
+        LLM_CALLS.inc(caller="vision", outcome="error")
         return None, str(e)
 
 
@@ -299,28 +514,168 @@ def remove_bg_only(user_id: str, raw_url: str) -> dict:
         return {"status": "failed", "cleanUrl": None, "failReason": f"Fetch failed: {err}"}
 
     # b) rembg
-    png_bytes, err = run_rembg(raw_bytes, content_type)
+    png_bytes, err = _remove_background(raw_bytes, content_type)
     if err:
         return {"status": "failed", "cleanUrl": None, "failReason": f"Background removal failed: {err}"}
 
-    # c) Upload clean to R2
-    clean_key, err = upload_clean_to_r2(png_bytes, user_id)
+    # c) Upload clean to R2 (a new object per call; the raw hash only prefixes the key)
+    clean_key, err = upload_clean_to_r2(png_bytes, user_id, content_hash=content_hash(raw_bytes))
     if err:
         return {"status": "failed", "cleanUrl": None, "failReason": f"R2 upload failed: {err}"}
 
-    public_base = (os.getenv("R2_PUBLIC_BASE_URL") or "").rstrip("/")
-    clean_url = f"{public_base}/{clean_key}"
+    return {"status": "ready", "cleanUrl": clean_url_for(clean_key), "failReason": None}
+
 
-    return {"status": "ready", "cleanUrl": clean_url, "failReason": None}
+def _vision_data_url(png_bytes: bytes) -> str:
+    """
+    Downscale the clean PNG (longest side ≤ VISION_MAX_SIDE), flatten the
+    transparent background onto white and encode as a base64 JPEG data URL.
+    Sent to Vision directly from memory so OpenAI never has to fetch from R2.
+    """
+    from PIL import Image
 
+    img = Image.open(BytesIO(png_bytes)).convert("RGBA")
+    img.thumbnail((VISION_MAX_SIDE, VISION_MAX_SIDE))
+    flat = Image.new("RGB", img.size, (255, 255, 255))
+    flat.paste(img, mask=img.split()[3])
+    buf = BytesIO()
+    flat.save(buf, format="JPEG", quality=85)
+    return "data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
 
-def process_item(user_id: str, raw_key: str, raw_url: str, clothing_type: Optional[str] = None) -> dict:
+
+def _get_upload_pool() -> ThreadPoolExecutor:
+    global _upload_pool
+    if _upload_pool is None:
+        with _upload_pool_lock:
+            if _upload_pool is None:
+                _upload_pool = ThreadPoolExecutor(max_workers=R2_UPLOAD_WORKERS, thread_name_prefix="r2-upload")
+    return _upload_pool
+
+
+PROCESS_ITEM_STAGE_SECONDS = Histogram(
+    "ai_process_item_stage_seconds",
+    "process_item stage latency (fetch, cache, rembg, upload, encode, vision, total).",
+    ("stage",),
+)
+PROCESS_ITEM_RESULTS = Counter(
+    "ai_process_item_results_total",
+    "process_item outcomes (ready, cached, failed, vision_failed, error).",
+    ("outcome",),
+)
+
+
+def _ms_since(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def _validated_profile(profile_dict: Optional[dict]) -> dict:
+    """Validate Vision output against the locked ItemProfile schema; raise VisionFailedError if invalid."""
+    from schemas.models import ItemProfile
+    try:
+        profile = ItemProfile.model_validate(profile_dict)
+        return profile.model_dump(exclude_none=False)  # full locked schema
+    except Exception as e:
+        raise VisionFailedError(f"ItemProfile validation failed: {e}")
+
+
+def _with_ingest_fields(result: dict) -> dict:
     """
-    Full pipeline: fetch → rembg → upload clean → vision → return result.
+    Attach ingest-time derived fields so Node can store them with the item: the
+    avatar mapping (top/bottom only) and the item embedding, each with its version.
+    """
+    from services.embeddings import precompute_embedding  # numpy; not needed at import time
+
+    profile = result.get("profile")
+    mapping = precompute_avatar_mapping(profile)
+    result["avatarMapping"] = mapping
+    result["avatarMappingVersion"] = AVATAR_MAPPING_VERSION if mapping else None
+    result["embedding"], result["embeddingVersion"] = precompute_embedding(profile)
+    return result
+
+
+def describe_clean_item(clean_key: str, clothing_type: Optional[str] = None) -> dict:
+    """
+    Vision-only stage for an already uploaded clean image (resumed async jobs).
+    Raises VisionFailedError like process_item.
+    """
+    t = time.perf_counter()
+    clean_url = clean_url_for(clean_key)
+    profile_dict, err = generate_item_profile_from_vision(clean_url, clothing_type=clothing_type)
+    if err:
+        raise VisionFailedError(f"Vision failed: {err}")
+    return _with_ingest_fields({
+        "status": "ready",
+        "cleanKey": clean_key,
+        "cleanUrl": clean_url,
+        "profile": _validated_profile(profile_dict),
+        "failReason": None,
+        "cached": False,
+        "timings": {"vision": _ms_since(t), "total": _ms_since(t)},
+    })
+
+
+def process_item(
+    user_id: str,
+    raw_key: str,
+    raw_url: str,
+    clothing_type: Optional[str] = None,
+    on_stage: Optional[Callable[[str, dict], None]] = None,
+) -> dict:
+    """
+    Full pipeline: fetch → (cache lookup) → rembg → upload clean → vision → return result.
     clothing_type: user-selected type ("shirt", "tshirt", "hoodie", "pant") forwarded to Vision for type-aware prompting.
+
+    The raw bytes are hashed right after fetch. A cache hit (same photo, same
+    user, same clothing_type, same Vision model/prompt) whose clean object still
+    exists in R2 returns immediately with cached=True: the object is copied to a
+    new key owned by this item — no rembg, upload or Vision call.
+
+    VISION_IMAGE_INPUT=data_url sends a downscaled copy of the clean image to
+    Vision inline and runs the R2 upload concurrently; the default ("url") uploads
+    first and lets Vision fetch the public URL. Per-stage latencies (ms) are
+    returned in "timings".
+
+    on_stage(stage, checkpoint) is called on the calling thread as each stage
+    starts ("fetch", "rembg", "upload", "vision"); the "vision" call carries
+    {"cleanKey": ...} once the clean image is safely in R2, so async jobs can
+    resume from there. In data_url mode that is after the upload is joined, i.e.
+    once Vision has already run.
+
+    Ready results also carry avatarMapping / avatarMappingVersion (computed from
+    the validated profile) for Node to store alongside it.
     """
+    timings: dict = {}
+    outcome = "error"
+    try:
+        result = _process_item_stages(user_id, raw_key, raw_url, clothing_type, on_stage, timings)
+        outcome = "cached" if result.get("cached") else result["status"]
+        return result
+    except VisionFailedError:
+        outcome = "vision_failed"
+        raise
+    finally:
+        for stage, ms in timings.items():
+            PROCESS_ITEM_STAGE_SECONDS.observe(ms / 1000.0, stage=stage)
+        PROCESS_ITEM_RESULTS.inc(outcome=outcome)
+
+
+def _process_item_stages(
+    user_id: str,
+    raw_key: str,
+    raw_url: str,
+    clothing_type: Optional[str],
+    on_stage: Optional[Callable[[str, dict], None]],
+    timings: dict,
+) -> dict:
+    """process_item body; fills `timings` in place so metrics see partial runs too."""
+    t_total = time.perf_counter()
+    report = on_stage or (lambda stage, checkpoint: None)
+
     # a) Fetch
+    report("fetch", {})
+    t = time.perf_counter()
     raw_bytes, content_type, err = fetch_raw(raw_url)
+    timings["fetch"] = _ms_since(t)
     if err:
         return {
             "status": "failed",
@@ -328,10 +683,42 @@ def process_item(user_id: str, raw_key: str, raw_url: str, clothing_type: Option
             "cleanUrl": None,
             "profile": None,
             "failReason": f"Fetch failed: {err}",
+            "timings": timings,
         }
 
-    # b) rembg
-    png_bytes, err = run_rembg(raw_bytes, content_type)
+    # b) Content-hash cache lookup
+    t = time.perf_counter()
+    raw_hash = content_hash(raw_bytes)
+    cache = get_process_item_cache()
+    key = cache_key(raw_hash, user_id, clothing_type, vision_version(clothing_type)) if cache else None
+    if cache:
+        hit = cache.get(key)
+        if hit:
+            # Copy rather than share: the new item owns its object. The copy fails
+            # if Node already deleted the cached one (failed save, item deleted).
+            clean_key, copy_err = copy_clean_object(hit["cleanKey"], user_id, raw_hash)
+            if clean_key:
+                timings["cache"] = _ms_since(t)
+                timings["total"] = _ms_since(t_total)
+                print(f"[process_item] cache hit {raw_hash[:12]} for rawKey={raw_key[:50]}")
+                return _with_ingest_fields({
+                    "status": "ready",
+                    "cleanKey": clean_key,
+                    "cleanUrl": clean_url_for(clean_key),
+                    "profile": hit["profile"],
+                    "failReason": None,
+                    "cached": True,
+                    "timings": timings,
+                })
+            print(f"[process_item] cached clean object unusable, reprocessing: {copy_err}")
+            cache.discard(key)
+    timings["cache"] = _ms_since(t)
+
+    # c) rembg
+    report("rembg", {})
+    t = time.perf_counter()
+    png_bytes, err = _remove_background(raw_bytes, content_type)
+    timings["rembg"] = _ms_since(t)
     if err:
         return {
             "status": "failed",
@@ -339,10 +726,46 @@ def process_item(user_id: str, raw_key: str, raw_url: str, clothing_type: Option
             "cleanUrl": None,
             "profile": None,
             "failReason": f"Background removal failed: {err}",
+            "timings": timings,
         }
 
-    # c) Upload clean to R2
-    clean_key, err = upload_clean_to_r2(png_bytes, user_id)
+    # d) Upload clean to R2 (keyed by raw content hash) + e) Vision
+    def _timed_upload():
+        # Runs on the upload pool in data_url mode: no timings/report calls here,
+        # the request thread records both once it has the result.
+        t_up = time.perf_counter()
+        clean_key, err = upload_clean_to_r2(png_bytes, user_id, content_hash=raw_hash)
+        return clean_key, err, _ms_since(t_up)
+
+    report("upload", {})
+
+    if VISION_IMAGE_INPUT == "data_url":
+        # Upload in the background while Vision reads the image from memory.
+        upload_future = _get_upload_pool().submit(_timed_upload)
+        t = time.perf_counter()
+        try:
+            image_ref = _vision_data_url(png_bytes)
+            timings["encode"] = _ms_since(t)
+            t = time.perf_counter()
+            profile_dict, vision_err = generate_item_profile_from_vision(image_ref, clothing_type=clothing_type)
+        except Exception as e:
+            profile_dict, vision_err = None, str(e)
+        timings["vision"] = _ms_since(t)
+        clean_key, err, timings["upload"] = upload_future.result()
+        if not err:
+            # Checkpoint only once the upload is joined (Vision has already run).
+            report("vision", {"cleanKey": clean_key})
+    else:
+        clean_key, err, timings["upload"] = _timed_upload()
+        profile_dict, vision_err = None, None
+        if not err:
+            report("vision", {"cleanKey": clean_key})
+            t = time.perf_counter()
+            profile_dict, vision_err = generate_item_profile_from_vision(
+                clean_url_for(clean_key), clothing_type=clothing_type
+            )
+            timings["vision"] = _ms_since(t)
+
     if err:
         return {
             "status": "failed",
@@ -350,28 +773,80 @@ def process_item(user_id: str, raw_key: str, raw_url: str, clothing_type: Option
             "cleanUrl": None,
             "profile": None,
             "failReason": f"R2 upload failed: {err}",
+            "timings": timings,
         }
 
-    public_base = (os.getenv("R2_PUBLIC_BASE_URL") or "").rstrip("/")
-    clean_url = f"{public_base}/{clean_key}"
+    clean_url = clean_url_for(clean_key)
 
-    # d) Vision (type-aware when clothing_type is provided)
-    profile_dict, err = generate_item_profile_from_vision(clean_url, clothing_type=clothing_type)
-    if err:
-        raise VisionFailedError(f"Vision failed: {err}")
+    if vision_err:
+        raise VisionFailedError(f"Vision failed: {vision_err}")
 
-    # e) Validate and return locked ItemProfile (raw schema for Node to store)
-    from schemas.models import ItemProfile
-    try:
-        profile = ItemProfile.model_validate(profile_dict)
-        raw_profile = profile.model_dump(exclude_none=False)  # full locked schema
-    except Exception as e:
-        raise VisionFailedError(f"ItemProfile validation failed: {e}")
+    # f) Validate and return locked ItemProfile (raw schema for Node to store)
+    raw_profile = _validated_profile(profile_dict)
 
-    return {
+    if cache:
+        cache.put(key, {"cleanKey": clean_key, "profile": raw_profile})
+
+    timings["total"] = _ms_since(t_total)
+    return _with_ingest_fields({
         "status": "ready",
         "cleanKey": clean_key,
         "cleanUrl": clean_url,
         "profile": raw_profile,
         "failReason": None,
-    }
+        "cached": False,
+        "timings": timings,
+    })
+
+
+# ---------------------------------------------------------------------------
+# Startup warm-up
+# ---------------------------------------------------------------------------
+
+def warm_rembg_worker() -> Optional[str]:
+    """Load rembg/onnxruntime and the REMBG_MODEL session in the current CPU worker. Returns an error or None."""
+    try:
+        _get_rembg()
+        _get_rembg_session()
+        return None
+    except Exception as e:
+        return str(e)
+
+
+def warm_up(cpu_workers: int = 1) -> Dict[str, str]:
+    """
+    Import/initialise the heavy dependencies ahead of the first request:
+    requests + PIL, openai, the R2 client (when configured) and rembg in
+    `cpu_workers` CPU-pool workers. Returns {dependency: "ok" | "skipped" | "error: ..."}.
+    Blocking; run it on the I/O pool.
+    """
+    def _imports():
+        import requests  # noqa: F401
+        from PIL import Image  # noqa: F401
+        _get_http_session()
+
+    def _openai():
+        import openai  # noqa: F401
+
+    def _r2():
+        settings, _ = _r2_settings()
+        if not settings:
+            return "skipped"
+        get_r2_client(settings)
+
+    status: Dict[str, str] = {}
+    for name, step in (("http_pil", _imports), ("openai", _openai), ("r2", _r2)):
+        try:
+            status[name] = step() or "ok"
+        except Exception as e:
+            status[name] = f"error: {e}"
+
+    # Submit one warm task per worker together so each process-pool worker loads its own model.
+    pool = get_cpu_pool()
+    try:
+        futures = [pool.submit(warm_rembg_worker) for _ in range(max(1, cpu_workers))]
+        errors = {f.result() for f in futures} - {None}
+        status["rembg"] = ("error: " + "; ".join(sorted(errors))) if errors else "ok"
+    except Exception as e:
+        status["rembg"] = f"error: {e}"
+    return status
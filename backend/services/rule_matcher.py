@@ -0,0 +1,110 @@
+# services/rule_matcher.py
+# Compiled substring matchers for the keyword tables in avatar_mapping and
+# generate_outfits.
+#
+# Both modules classify free-text Vision fields ("zip-up hoodie", "dusty rose")
+# by walking ordered (keywords → value) tables with `kw in text` checks. The
+# classes here compile a table once into a single regex and memoize results, so
+# a lookup is one C-level scan (or a dict hit) instead of nested Python loops.
+#
+#   RuleMatcher    — ordered rules, first rule with any substring hit wins
+#   KeywordMatcher — "does any keyword occur in text?"
+#
+# Matching is plain substring containment, exactly like the loops it replaces
+# ("tee" matches "teeth"); callers normalise case/whitespace beforehand.
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex for `words` factored into a prefix trie ("navy(?: blue)?" rather than
+    "navy blue|navy").  Siblings start with different characters and terminal
+    nodes make their tail greedy-optional, so at any position the match is the
+    longest word starting there.
+    """
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            return ("(?:" + body + ")?") if len(alts) == 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class RuleMatcher:
+    """
+    Ordered (keywords → value) table with first-rule-wins semantics:
+    `match(text)` returns the value of the earliest rule that has any keyword
+    occurring in `text`, else `fallback` — the same answer as
+
+        for keywords, value in rules:
+            if any(kw in text for kw in keywords):
+                return value
+        return fallback
+
+    All keywords go into one prefix-trie regex inside a lookahead, so findall
+    reports the longest keyword starting at every offset. Every keyword that
+    also starts there is a prefix of that hit, so each keyword is pre-assigned
+    the best (lowest) rule rank among itself and its keyword prefixes; the
+    minimum over all hits is the winning rule.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[Tuple[Iterable[str], Any]],
+        fallback: Any = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.values: List[Any] = []
+        self.fallback = fallback
+        rank: Dict[str, int] = {}
+        for i, (keywords, value) in enumerate(rules):
+            self.values.append(value)
+            for kw in keywords:
+                if kw and kw not in rank:
+                    rank[kw] = i
+        self._rank: Dict[str, int] = {
+            kw: min(r for k, r in rank.items() if kw.startswith(k)) for kw in rank
+        }
+        self._regex: Optional[re.Pattern] = (
+            re.compile("(?=(" + trie_pattern(rank) + "))") if rank else None
+        )
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, text: str) -> Any:
+        if not text or self._regex is None:
+            return self.fallback
+        hits = self._regex.findall(text)
+        if not hits:
+            return self.fallback
+        return self.values[min(map(self._rank.__getitem__, hits))]
+
+
+class KeywordMatcher:
+    """`contains(text)` is True when any keyword occurs in `text` (memoized)."""
+
+    def __init__(self, keywords: Iterable[str], cache_size: int = DEFAULT_CACHE_SIZE):
+        words = sorted({kw for kw in keywords if kw})
+        self._regex: Optional[re.Pattern] = re.compile(trie_pattern(words)) if words else None
+        self.contains = lru_cache(maxsize=cache_size)(self._contains)
+
+    def _contains(self, text: str) -> bool:
+        if not text or self._regex is None:
+            return False
+        return self._regex.search(text) is not None
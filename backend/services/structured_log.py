@@ -0,0 +1,200 @@
+# services/structured_log.py
+# Structured, non-blocking logging for the AI service.
+#
+#   - Records go through a QueueHandler; a single QueueListener thread formats
+#     and writes them, so request threads never block on stdout.
+#   - LOG_FORMAT=json (default) emits one JSON object per line; "text" keeps a
+#     plain "[level] logger: message" layout for local runs.
+#   - log_event(logger, "suggest_outfit", **fields) writes one structured event
+#     (fields are only serialised if the level is enabled and the record is
+#     actually written).
+#   - The request ID from Node's X-Request-Id header (or a generated one) is held
+#     in a context var and stamped on every record; run_io copies context vars
+#     into I/O-pool threads.
+#   - Per-item debug detail is sampled per request (LOG_ITEM_SAMPLE_RATE) so a
+#     300-item wardrobe does not emit 300 lines on every call.
+#
+# LOG_LEVEL             — root level for app loggers (default INFO)
+# LOG_FORMAT            — json | text
+# LOG_ITEM_SAMPLE_RATE  — fraction of requests that log per-item DEBUG detail (default 0.01)
+# LOG_QUEUE_SIZE        — max queued records before new ones are dropped (default 10000)
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import uuid
+from typing import Any, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").strip().lower()
+LOG_ITEM_SAMPLE_RATE = float(os.getenv("LOG_ITEM_SAMPLE_RATE", "0.01"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+_item_sampled_var: contextvars.ContextVar[Optional[bool]] = contextvars.ContextVar("item_sampled", default=None)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_setup_lock = threading.Lock()
+
+
+def current_request_id() -> Optional[str]:
+    return request_id_var.get()
+
+
+def item_detail_sampled() -> bool:
+    """
+    Whether this request logs per-item detail. Decided once per request so a
+    sampled request is complete rather than a random subset of its items.
+    """
+    sampled = _item_sampled_var.get()
+    if sampled is None:
+        sampled = random.random() < LOG_ITEM_SAMPLE_RATE
+        _item_sampled_var.set(sampled)
+    return sampled
+
+
+class _Event:
+    """Deferred event payload: serialised by the formatter, never by the caller."""
+
+    __slots__ = ("name", "fields")
+
+    def __init__(self, name: str, fields: dict):
+        self.name = name
+        self.fields = fields
+
+    def __str__(self) -> str:  # text format / non-JSON handlers
+        return f"{self.name} " + json.dumps(self.fields, default=str, sort_keys=True)
+
+
+def log_event(logger: logging.Logger, event: str, level: int = logging.INFO, **fields: Any) -> None:
+    """Emit one structured event; a no-op (no formatting) when `level` is disabled."""
+    if logger.isEnabledFor(level):
+        logger.log(level, _Event(event, fields))
+
+
+class _RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Runs in the calling thread (before the queue), where the context var is set.
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        doc: dict = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            doc["requestId"] = request_id
+        if isinstance(record.msg, _Event):
+            doc["event"] = record.msg.name
+            doc.update(record.msg.fields)
+        else:
+            doc["msg"] = record.getMessage()
+        if record.exc_info:
+            doc["exc"] = self.formatException(record.exc_info)
+        return json.dumps(doc, default=str)
+
+
+class _TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        request_id = getattr(record, "request_id", None)
+        prefix = f"[{record.levelname}] {record.name}" + (f" ({request_id})" if request_id else "")
+        line = f"{prefix}: {record.getMessage()}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Keep the _Event object intact for the JSON formatter; only resolve
+        # %-args here so mutable arguments are captured at call time.
+        if not isinstance(record.msg, _Event) and record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def setup_logging() -> None:
+    """Install the queue handler on the root logger (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+    with _setup_lock:
+        if _listener is not None:
+            return
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else _TextFormatter())
+        q: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=max(1, LOG_QUEUE_SIZE))
+        handler = _DroppingQueueHandler(q)
+        handler.addFilter(_RequestIdFilter())
+        root = logging.getLogger()
+        root.addHandler(handler)
+        root.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+        _listener = logging.handlers.QueueListener(q, stream, respect_handler_level=False)
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    with _setup_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware: takes X-Request-Id from the caller (Node's requestId
+    middleware) or generates one, binds it for the request and echoes it back.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        raw = dict(scope.get("headers") or ()).get(REQUEST_ID_HEADER)
+        request_id = raw.decode("latin-1")[:128] if raw else uuid.uuid4().hex
+        id_token = request_id_var.set(request_id)
+        sample_token = _item_sampled_var.set(None)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(id_token)
+            _item_sampled_var.reset(sample_token)
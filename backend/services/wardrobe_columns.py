@@ -0,0 +1,233 @@
+# services/wardrobe_columns.py
+# Columnar, memory-compact representation of one wardrobe for in-process
+# caching and whole-wardrobe scoring with NumPy.
+#
+# A list of item dicts repeats every key and boxes every value per item; here
+# each field is one array:
+#
+#   ids          — utf-8 byte strings (numpy "S" array)
+#   categorical  — one small-int code per item into a per-wardrobe vocabulary of
+#                  interned strings (category, type, color, material, pattern, ...)
+#   multi        — multi-valued fields (tags, occasion tags, colors) as parallel
+#                  (row, code) arrays over a vocabulary
+#   numeric      — plain NumPy arrays (favorite flags, formality, ...)
+#   payloads     — optionally, the original items as one compact JSON blob,
+#                  decoded only for the items a caller actually needs (item(i))
+#
+# Predicates run once per distinct value, not once per item:
+#
+#   cols.cat["type"].where(lambda t: "short" in t)        -> bool per item
+#   cols.multi["tags"].any_of({"jacket", "coat"})          -> bool per item
+#
+# Which fields exist and how they are derived is up to the caller
+# (ai/preference_vectors.py for MyraAgent, services/generate_outfits.py for
+# outfit generation); scoring rules stay next to their per-item reference.
+# cached_columns() keeps one store per user, keyed by a 64-bit hash per item.
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+WARDROBE_COLUMNS_CACHE_USERS = 256
+
+
+def _code_dtype(size: int) -> type:
+    if size <= 1 << 8:
+        return np.uint8
+    if size <= 1 << 16:
+        return np.uint16
+    return np.uint32
+
+
+class _Vocabulary:
+    """Interned distinct values of one field, with memoized predicate masks over them."""
+
+    __slots__ = ("values", "_masks")
+
+    def __init__(self, index: Dict[str, int]):
+        self.values = [sys.intern(value) for value in index]
+        self._masks: Dict[Hashable, np.ndarray] = {}
+
+    def value_mask(self, test: Callable[[str], bool], key: Optional[Hashable] = None) -> np.ndarray:
+        """`test` over the vocabulary (memoized under `key`, if given)."""
+        mask = self._masks.get(key) if key is not None else None
+        if mask is None:
+            mask = np.fromiter((bool(test(v)) for v in self.values), dtype=bool, count=len(self.values))
+            if key is not None and len(self._masks) < 64:
+                self._masks[key] = mask
+        return mask
+
+    def _values_nbytes(self) -> int:
+        return sum(sys.getsizeof(v) for v in self.values)
+
+
+class Categorical(_Vocabulary):
+    """One vocabulary code per item, in the smallest unsigned dtype that fits."""
+
+    __slots__ = ("codes",)
+
+    def __init__(self, per_item: Sequence[str]):
+        index: Dict[str, int] = {}
+        codes = [index.setdefault(value, len(index)) for value in per_item]
+        super().__init__(index)
+        self.codes = np.asarray(codes, dtype=_code_dtype(len(index)))
+
+    def where(self, test: Callable[[str], bool], key: Optional[Hashable] = None) -> np.ndarray:
+        """Per item: does its value satisfy `test`?"""
+        return self.value_mask(test, key)[self.codes]
+
+    def equals(self, value: str) -> np.ndarray:
+        return self.where(value.__eq__, ("eq", value))
+
+    def take(self, rows: np.ndarray) -> "Categorical":
+        """Subset by item rows, sharing the vocabulary (and its memoized masks)."""
+        out = Categorical.__new__(Categorical)
+        out.values, out._masks, out.codes = self.values, self._masks, self.codes[rows]
+        return out
+
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self._values_nbytes()
+
+
+class Multi(_Vocabulary):
+    """Item x value incidence as parallel (row, code) arrays over the vocabulary."""
+
+    __slots__ = ("n_items", "rows", "codes")
+
+    def __init__(self, per_item: Sequence[Sequence[str]]):
+        index: Dict[str, int] = {}
+        rows: List[int] = []
+        codes: List[int] = []
+        for row, values in enumerate(per_item):
+            for value in values:
+                codes.append(index.setdefault(value, len(index)))
+                rows.append(row)
+        super().__init__(index)
+        self.n_items = len(per_item)
+        self.rows = np.asarray(rows, dtype=np.uint32)
+        self.codes = np.asarray(codes, dtype=_code_dtype(len(index)))
+
+    def hits(self, value_mask: np.ndarray) -> np.ndarray:
+        """Per item: does any of its values satisfy the vocabulary mask?"""
+        out = np.zeros(self.n_items, dtype=bool)
+        if self.codes.size:
+            out[self.rows[value_mask[self.codes]]] = True
+        return out
+
+    def any(self, test: Callable[[str], bool], key: Optional[Hashable] = None) -> np.ndarray:
+        return self.hits(self.value_mask(test, key))
+
+    def any_of(self, values: frozenset) -> np.ndarray:
+        """Per item: is any of its values in `values` (exact match)?"""
+        return self.any(values.__contains__, ("in", values))
+
+    def take(self, rows: np.ndarray) -> "Multi":
+        """Subset by item rows (ascending), sharing the vocabulary and its memoized masks."""
+        remap = np.full(self.n_items, -1, dtype=np.int64)
+        remap[rows] = np.arange(len(rows))
+        keep = remap[self.rows] >= 0
+        out = Multi.__new__(Multi)
+        out.values, out._masks, out.n_items = self.values, self._masks, len(rows)
+        out.rows = remap[self.rows[keep]].astype(np.uint32)
+        out.codes = self.codes[keep]
+        return out
+
+    def nbytes(self) -> int:
+        return self.rows.nbytes + self.codes.nbytes + self._values_nbytes()
+
+
+class WardrobeColumns:
+    """One wardrobe version as columns; item order is the order given to the constructor."""
+
+    def __init__(
+        self,
+        ids: Sequence[Any],
+        categorical: Mapping[str, Sequence[str]],
+        multi: Mapping[str, Sequence[Sequence[str]]],
+        numeric: Mapping[str, Sequence[Any]],
+        numeric_dtypes: Optional[Mapping[str, Any]] = None,
+        payloads: Optional[Sequence[Mapping[str, Any]]] = None,
+    ):
+        self.n_items = len(ids)
+        self.ids = np.array([str(i).encode("utf-8") for i in ids], dtype=np.bytes_)
+        self.cat = {name: Categorical(values) for name, values in categorical.items()}
+        self.multi = {name: Multi(values) for name, values in multi.items()}
+        dtypes = numeric_dtypes or {}
+        self.num = {name: np.asarray(values, dtype=dtypes.get(name)) for name, values in numeric.items()}
+
+        chunks = [json.dumps(p, separators=(",", ":"), default=str).encode("utf-8") for p in payloads or ()]
+        self._offsets = np.zeros(len(chunks) + 1, dtype=np.uint32 if sum(map(len, chunks)) < 1 << 32 else np.uint64)
+        np.cumsum([len(c) for c in chunks], out=self._offsets[1:])
+        self._blob = b"".join(chunks)
+
+    def __len__(self) -> int:
+        return self.n_items
+
+    def take(self, rows: Sequence[int]) -> "WardrobeColumns":
+        """The store restricted to `rows` (ascending), in that order; payloads are not carried over."""
+        rows = np.asarray(rows, dtype=np.intp)
+        out = WardrobeColumns.__new__(WardrobeColumns)
+        out.n_items = len(rows)
+        out.ids = self.ids[rows]
+        out.cat = {name: c.take(rows) for name, c in self.cat.items()}
+        out.multi = {name: m.take(rows) for name, m in self.multi.items()}
+        out.num = {name: a[rows] for name, a in self.num.items()}
+        out._offsets = np.zeros(1, dtype=np.uint32)
+        out._blob = b""
+        return out
+
+    def id(self, row: int) -> str:
+        return self.ids[row].decode("utf-8")
+
+    def item(self, row: int) -> Dict[str, Any]:
+        """The payload at `row`, decoded on demand (a new dict each call); stores built without payloads raise."""
+        if len(self._offsets) <= 1:
+            raise LookupError("WardrobeColumns was built without payloads")
+        return json.loads(self._blob[int(self._offsets[row]):int(self._offsets[row + 1])])
+
+    def nbytes(self) -> int:
+        """Approximate retained size: arrays, vocabularies and the payload blob."""
+        return (
+            self.ids.nbytes
+            + sum(c.nbytes() for c in self.cat.values())
+            + sum(m.nbytes() for m in self.multi.values())
+            + sum(a.nbytes for a in self.num.values())
+            + self._offsets.nbytes
+            + len(self._blob)
+        )
+
+
+_cache: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, WardrobeColumns]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def cached_columns(
+    user_id: str,
+    kind: str,
+    items: Sequence[Any],
+    item_key: Callable[[Any], Hashable],
+    build: Callable[[Sequence[Any]], WardrobeColumns],
+) -> WardrobeColumns:
+    """
+    The user's `kind` store, rebuilt only when some item's `item_key` changed.
+    Only a 64-bit hash per item is retained as the version (not the keys).
+    """
+    version = np.fromiter((hash(item_key(item)) for item in items), dtype=np.int64, count=len(items))
+    cache_key = (user_id, kind)
+    with _cache_lock:
+        cached = _cache.get(cache_key)
+        if cached is not None and np.array_equal(cached[0], version):
+            _cache.move_to_end(cache_key)
+            return cached[1]
+    columns = build(items)
+    with _cache_lock:
+        _cache[cache_key] = (version, columns)
+        _cache.move_to_end(cache_key)
+        while len(_cache) > WARDROBE_COLUMNS_CACHE_USERS:
+            _cache.popitem(last=False)
+    return columns
@@ -0,0 +1,151 @@
+# services/weather_context.py
+# Request weather compiled once, shared by the agent and outfit generation.
+#
+#   WeatherContext.from_weather(weather)
+#       temp_f        — numeric tempF (None if missing or not a number)
+#       band          — cold (<= 55 °F) | mild (< 75) | warm | unknown
+#       rain          — "rain" in the summary text; the only condition that
+#                       affects scoring (canvas shoes)
+#       snow/wind     — parsed from the summary for request logs only
+#
+# MyraAgent's item weather bonus depends only on the item's agent category and
+# six weather traits (item_traits), so each request's rule is compiled into a
+# table of category -> bonus per trait combination (agent_bonus_tables) and
+# item scoring is a lookup. Tables are memoized per (heat, wet) condition.
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from services.item_classifier import AGENT_CATEGORY_RULES
+
+COLD_MAX_F = 55
+WARM_MIN_F = 75
+HOT_MIN_F = 85
+
+SNOW_WORDS = ("snow", "sleet", "blizzard")
+WIND_WORDS = ("wind", "gust", "squall")
+
+AGENT_CATEGORIES: Tuple[str, ...] = tuple(value for value, _ in AGENT_CATEGORY_RULES) + ("other",)
+
+# Item weather traits (bit flags)
+LAYER_TAG = 1      # tagged jacket / coat / hoodie
+SWEATER_TAG = 2    # tagged sweater
+HOODIE_TAG = 4     # tagged hoodie
+LIGHT_STYLE = 8    # style_tags minimal / sporty
+SHORT_TYPE = 16    # type mentions "short"
+CANVAS = 32        # canvas fabric or tag
+TRAIT_COMBINATIONS = 64
+
+_TAG_TRAITS = {
+    "jacket": LAYER_TAG,
+    "coat": LAYER_TAG,
+    "hoodie": LAYER_TAG | HOODIE_TAG,
+    "sweater": SWEATER_TAG,
+    "canvas": CANVAS,
+}
+_STYLE_TAG_TRAITS = {"minimal": LIGHT_STYLE, "sporty": LIGHT_STYLE}
+
+
+def item_traits(item_type: str, fabric: str, tags: Iterable[str], style_tags: Iterable[str]) -> int:
+    """Weather traits of one item from its lowercased type, fabric, tags and style_tags."""
+    traits = 0
+    for tag in tags:
+        traits |= _TAG_TRAITS.get(tag, 0)
+    for tag in style_tags:
+        traits |= _STYLE_TAG_TRAITS.get(tag, 0)
+    if "short" in item_type:
+        traits |= SHORT_TYPE
+    if "canvas" in fabric:
+        traits |= CANVAS
+    return traits
+
+
+def _agent_bonus(heat: Optional[str], wet: bool, category: str, traits: int) -> float:
+    """The agent weather rule for one (condition, category, traits) combination."""
+    bonus = 0.0
+    if heat == "hot":
+        if category == "jacket" or traits & LAYER_TAG:
+            bonus -= 2.0
+        if traits & LIGHT_STYLE or (category == "top" and not traits & HOODIE_TAG):
+            bonus += 1.0
+    elif heat == "cold":
+        if category == "jacket" or traits & (LAYER_TAG | SWEATER_TAG):
+            bonus += 2.0
+        if category == "bottom" and traits & SHORT_TYPE:
+            bonus -= 2.0
+    if wet and category == "shoe" and traits & CANVAS:
+        bonus -= 1.0
+    return bonus
+
+
+@lru_cache(maxsize=None)
+def agent_bonus_tables(heat: Optional[str], wet: bool) -> Dict[str, Tuple[float, ...]]:
+    """category -> bonus indexed by item traits, for one weather condition."""
+    return {
+        category: tuple(_agent_bonus(heat, wet, category, traits) for traits in range(TRAIT_COMBINATIONS))
+        for category in AGENT_CATEGORIES
+    }
+
+
+def _has_word(text: str, words: Tuple[str, ...]) -> bool:
+    return any(word in text for word in words)
+
+
+class WeatherContext:
+    """One request's weather, parsed once."""
+
+    __slots__ = ("temp_f", "valid", "band", "summary", "rain", "snow", "wind", "agent_tables")
+
+    def __init__(
+        self,
+        temp_f: Any = None,
+        summary: Optional[str] = None,
+    ):
+        # A non-numeric temperature is ignored; the agent gives no weather bonus at all for it.
+        self.valid = temp_f is None or isinstance(temp_f, (int, float))
+        self.temp_f = float(temp_f) if temp_f is not None and self.valid else None
+        if self.temp_f is None:
+            self.band = "unknown"
+        elif self.temp_f <= COLD_MAX_F:
+            self.band = "cold"
+        elif self.temp_f < WARM_MIN_F:
+            self.band = "mild"
+        else:
+            self.band = "warm"
+
+        self.summary = summary.lower() if isinstance(summary, str) else ""
+        self.rain = "rain" in self.summary
+        self.snow = _has_word(self.summary, SNOW_WORDS)
+        self.wind = _has_word(self.summary, WIND_WORDS)
+
+        heat = None
+        if self.temp_f is not None:
+            if self.temp_f >= HOT_MIN_F:
+                heat = "hot"
+            elif self.temp_f <= COLD_MAX_F:
+                heat = "cold"
+        self.agent_tables = (
+            agent_bonus_tables(heat, self.rain) if self.valid else agent_bonus_tables(None, False)
+        )
+
+    @classmethod
+    def from_weather(cls, weather: Any, temp_f: Any = None) -> "WeatherContext":
+        """
+        From a weather dict or model (tempF / tempf, summary); an explicit
+        temp_f wins. A WeatherContext is returned as is.
+        """
+        if isinstance(weather, WeatherContext):
+            return weather
+        if weather is not None and hasattr(weather, "model_dump"):
+            weather = weather.model_dump()
+        weather = weather if isinstance(weather, dict) else {}
+        if temp_f is None:
+            temp_f = weather.get("tempF")
+        if temp_f is None:
+            temp_f = weather.get("tempf")
+        return cls(temp_f, weather.get("summary"))
+
+    def agent_bonus(self, category: str, traits: int) -> float:
+        """MyraAgent weather bonus for an item of `category` with `traits`."""
+        return self.agent_tables[category][traits]
@@ -0,0 +1,11 @@
+# tests/conftest.py
+# Run from backend/:  python -m pytest -q tests
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Never reach a real database from tests.
+os.environ.setdefault("AI_USE_MOCK_DB", "true")
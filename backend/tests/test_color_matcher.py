@@ -0,0 +1,81 @@
+# avatar_mapping._color_to_hex: the compiled longest-key matcher must resolve
+# exactly like the original longest-first linear scan over the color table.
+import random
+from typing import Optional
+
+import pytest
+
+from services import avatar_mapping as am
+
+
+def _scan_longest(text: str) -> Optional[str]:
+    for table_key in am._COLOR_KEYS_BY_LENGTH:
+        if table_key in text:
+            return table_key
+    return None
+
+
+def _reference_color_to_hex(color_name: Optional[str]) -> Optional[str]:
+    """The resolver before the compiled matcher: substring scan, longest key first."""
+    if not color_name:
+        return None
+    key = am._norm_color(color_name)
+    if not key:
+        return None
+    raw_hex = am.parse_hex(key)
+    if raw_hex:
+        return raw_hex
+    if key in am._COLOR_HEX:
+        return am._COLOR_HEX[key]
+    hit = _scan_longest(key)
+    if hit:
+        return am._COLOR_HEX[hit]
+    tokens = key.split()
+    base_tokens = [t for t in tokens if t not in am._SHADE_MODIFIERS]
+    if base_tokens and base_tokens != tokens:
+        base = " ".join(base_tokens)
+        if base in am._COLOR_HEX:
+            return am._COLOR_HEX[base]
+        hit = _scan_longest(base)
+        if hit:
+            return am._COLOR_HEX[hit]
+    return None
+
+
+def _corpus(size: int = 3000, seed: int = 31) -> list:
+    rng = random.Random(seed)
+    keys = list(am._COLOR_HEX)
+    shades = sorted(am._SHADE_MODIFIERS)
+    filler = ["with", "and", "stripes", "tone", "ish", "x", "melange", "marl", "/", "-"]
+    words = [w for k in keys for w in k.split()] + filler
+    corpus = [
+        None, "", "   ", "#1a2b3c", "#ABC", "Navy-Blue", "OFF_WHITE", "dark olive green",
+        "dusty olive green", "electric blue", "bright red", "pure white", "unknownish",
+        "redwood", "greenish blue", "blue green", "light light", "Heather Gray",
+    ]
+    corpus += keys
+    corpus += [f"{rng.choice(shades)} {k}" for k in keys]
+    corpus += [k.upper().replace(" ", rng.choice(["-", "_", "  "])) for k in keys]
+    while len(corpus) < size:
+        n = rng.randint(1, 4)
+        phrase = " ".join(rng.choice(words + shades) for _ in range(n))
+        if rng.random() < 0.3:
+            # glue tokens so keys also occur inside longer words
+            phrase = phrase.replace(" ", "", 1)
+        corpus.append(phrase)
+    return corpus
+
+
+@pytest.mark.parametrize("seed", [31, 2031])
+def test_matches_linear_scan(seed):
+    mismatches = [
+        (name, am._color_to_hex(name), _reference_color_to_hex(name))
+        for name in _corpus(seed=seed)
+        if am._color_to_hex(name) != _reference_color_to_hex(name)
+    ]
+    assert mismatches == []
+
+
+def test_longest_key_wins():
+    assert am._longest_color_key("dark olive green") == _scan_longest("dark olive green")
+    assert am._longest_color_key("no color here") is None
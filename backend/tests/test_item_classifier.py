@@ -0,0 +1,110 @@
+# services/item_classifier.py must classify exactly like the keyword loops it
+# replaced in MyraAgent._categorize_item and generate_outfits._normalize_category.
+import json
+import os
+import random
+
+import pytest
+
+from services.item_classifier import (
+    AGENT_CATEGORY_RULES,
+    OUTFIT_CATEGORY_RULES,
+    agent_category,
+    outfit_category,
+)
+
+MOCK_CLOSET = os.path.join(os.path.dirname(__file__), "..", "data", "mock_closet.json")
+
+
+def _reference_agent(item_type, category, tags):
+    """MyraAgent._categorize_item before the shared classifier."""
+    s = f"{item_type} {category} {' '.join(tags)}".lower()
+    if any(k in s for k in ["hoodie", "sweater", "jacket", "coat", "blazer", "overcoat", "cardigan"]):
+        return "jacket"
+    if any(k in s for k in ["top", "tshirt", "t-shirt", "shirt", "blouse", "polo", "tank", "camisole"]):
+        return "top"
+    if any(k in s for k in ["jeans", "pants", "trousers", "skirt", "shorts", "bottom", "leggings"]):
+        return "bottom"
+    if any(k in s for k in ["shoe", "sneaker", "boot", "heel", "sandal", "slide", "loafer", "slipper"]):
+        return "shoe"
+    return "other"
+
+
+def _reference_outfit(category, item_type):
+    """generate_outfits._normalize_category before the shared classifier."""
+    if category in ("top", "tops") or any(x in item_type for x in ("shirt", "tee", "blouse", "sweater", "polo")):
+        return "top"
+    if category in ("bottom", "bottoms") or any(x in item_type for x in ("pants", "jeans", "chinos", "shorts", "skirt", "trouser")):
+        return "bottom"
+    if category in ("shoes", "shoe") or any(x in item_type for x in ("sneaker", "boot", "loafer", "heel", "sandal", "trainer")):
+        return "shoes"
+    if category == "dress" or "dress" in item_type:
+        return "dress"
+    if category == "outerwear" or any(x in item_type for x in ("jacket", "coat", "blazer", "cardigan", "overcoat", "hoodie")):
+        return "outerwear"
+    return "other"
+
+
+def _vocabulary():
+    words = set()
+    for _, kws in AGENT_CATEGORY_RULES:
+        words |= set(kws)
+    for _, names, kws in OUTFIT_CATEGORY_RULES:
+        words |= set(names) | set(kws)
+    if os.path.exists(MOCK_CLOSET):
+        with open(MOCK_CLOSET) as f:
+            for item in json.load(f).get("wardrobe", []):
+                words.add((item.get("type") or "").lower())
+                words.add((item.get("category") or "").lower())
+                words |= {t.lower() for t in item.get("tags") or []}
+    words |= {
+        "", "other", "accessory", "traditional_set", "sweatshirt", "shirtdress", "boots",
+        "trench coat", "zip-up hoodie", "slip dress", "overshirt", "bootcut jeans", "trainers",
+    }
+    return sorted(words)
+
+
+@pytest.fixture(scope="module")
+def vocabulary():
+    return _vocabulary()
+
+
+def test_outfit_category_matches_keyword_rules(vocabulary):
+    mismatches = [
+        (category, item_type)
+        for item_type in vocabulary
+        for category in vocabulary
+        if outfit_category(category, item_type) != _reference_outfit(category, item_type)
+    ]
+    assert mismatches == []
+
+
+def test_agent_category_matches_keyword_rules(vocabulary):
+    rng = random.Random(44)
+    mismatches = []
+    for item_type in vocabulary:
+        for category in vocabulary:
+            tags = tuple(rng.sample(vocabulary, rng.randint(0, 2)))
+            if agent_category(item_type, category, tags) != _reference_agent(item_type, category, tags):
+                mismatches.append((item_type, category, tags))
+    assert mismatches == []
+
+
+def test_multi_word_inputs(vocabulary):
+    rng = random.Random(2044)
+    mismatches = []
+    for _ in range(5000):
+        item_type = " ".join(rng.sample(vocabulary, 2))
+        category = rng.choice(vocabulary)
+        tags = tuple(rng.sample(vocabulary, rng.randint(0, 3)))
+        if outfit_category(category, item_type) != _reference_outfit(category, item_type):
+            mismatches.append(("outfit", category, item_type))
+        if agent_category(item_type, category, tags) != _reference_agent(item_type, category, tags):
+            mismatches.append(("agent", item_type, category, tags))
+    assert mismatches == []
+
+
+def test_tables_disagree_on_sweaters():
+    # Deliberate: a sweater fills the agent's layer slot but is a top in outfits.
+    assert agent_category("sweater", "top") == "jacket"
+    assert outfit_category("top", "sweater") == "top"
@@ -0,0 +1,119 @@
+# AI_AGENT_VECTOR_SCORING: the NumPy path (ai/preference_vectors.py) must give
+# MyraAgent the same per-item scores, and so the same ranking and outfits, as
+# the per-item reference (_score_record).
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import ai.agent as agent
+from schemas.models import SuggestRequest, WardrobeItem
+
+TYPES = ["t-shirt", "shirt", "hoodie", "jeans", "shorts", "Short Skirt", "canvas sneaker",
+         "boots", "jacket", "blazer", "sweater", "loafer", "coat", "dress", "scarf", None]
+CATEGORIES = ["top", "bottom", "shoes", "jacket", "outerwear", "Top", "accessory", None]
+TAGS = ["casual", "formal", "date-night", "office", "minimal", "sporty", "streetwear",
+        "smart-casual", "canvas", "hoodie", "jacket", "coat", "sweater", "party",
+        "Casual", "Formal Wear", "date", "night", "smart", "minimal chic", ""]
+COLORS = ["black", "white", "navy", "red", "green", "beige", "grey", "Black ", " Navy", ""]
+
+PREFERENCES = [
+    None,
+    {"occasion": "formal"},
+    {"occasion": "Date-Night", "avoid_colors": ["black", "Navy"]},
+    {"style_vibe": "minimal", "prefer_favorites": True},
+    {"style_vibe": "Smart-Casual", "occasion": "night"},
+    {"occasion": "casual", "style_vibe": "streetwear", "avoid_colors": ["red"], "prefer_favorites": True},
+]
+WEATHER = [
+    {"tempF": 90, "summary": "Sunny"},
+    {"tempF": 40, "summary": "Light rain"},
+    {"tempF": 65, "summary": "rain"},
+    {"summary": "cloudy"},
+    {"tempF": 55},
+    {"tempF": "hot"},
+]
+
+
+def _wardrobe(n, seed):
+    rng = random.Random(seed)
+    items = []
+    for i in range(n):
+        items.append({
+            "user_id": "u", "id": f"it{i:04d}",
+            "type": rng.choice(TYPES), "category": rng.choice(CATEGORIES),
+            "color": rng.choice(COLORS + [None]),
+            "colors": [rng.choice(COLORS) for _ in range(rng.randint(0, 2))] or None,
+            "fabric": rng.choice(["cotton", "Canvas", "canvas blend", "wool", None]),
+            "tags": rng.sample(TAGS, rng.randint(0, 3)) or None,
+            "occasionTags": rng.sample(TAGS, rng.randint(0, 2)) or None,
+            "styleVibe": rng.sample(TAGS, rng.randint(0, 2)) or None,
+            "style_tags": rng.sample(TAGS, rng.randint(0, 2)) or None,
+            "isFavorite": rng.choice([True, False, None]),
+            "imageUrl": "https://cdn.example.com/a.png",
+        })
+    return items
+
+
+def _agent_items(raw):
+    return [
+        agent._AgentItem.from_model(WardrobeItem(**{k: v for k, v in d.items() if k in WardrobeItem.model_fields}))
+        for d in raw
+    ]
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_vector_scores_match_per_item_scoring(seed):
+    rng = random.Random(seed)
+    items = _agent_items(_wardrobe(rng.randint(0, 60), seed))
+    scorer = agent.MyraAgent()
+    for preferences in PREFERENCES:
+        for weather in WEATHER:
+            ctx = agent._ScoringContext(preferences, None, weather)
+            vector = agent._vector_scores(f"user-{seed}", items, ctx)
+            reference = []
+            for item in items:
+                record = agent._ItemRecord(item)
+                scorer._score_record(record, ctx)
+                reference.append((record.components, record.preference_total))
+            assert vector == reference, (preferences, weather)
+
+            # Same overall and per-category preference ranking (stable sorts).
+            order = sorted(range(len(items)), key=lambda i: -reference[i][0]["total"])
+            assert order == sorted(range(len(items)), key=lambda i: -vector[i][0]["total"])
+            order = sorted(range(len(items)), key=lambda i: -reference[i][1])
+            assert order == sorted(range(len(items)), key=lambda i: -vector[i][1])
+
+
+@pytest.mark.parametrize("seed,size", [(1, 3), (2, 12), (3, 40), (4, 150)])
+def test_suggest_outfit_unchanged_by_vector_mode(seed, size, monkeypatch):
+    raw = _wardrobe(size, seed)
+    monkeypatch.setattr(agent, "get_user_wardrobe", lambda user_id: raw)
+
+    def suggestions():
+        out = []
+        for preferences in PREFERENCES:
+            for weather in WEATHER[:5]:
+                req = SuggestRequest(
+                    user_id="u", location={"latitude": 1, "longitude": 2, "name": "NYC"},
+                    weather=weather, preferences=preferences,
+                )
+                out.append(agent.MyraAgent().suggest_outfit(req).model_dump())
+        return out
+
+    monkeypatch.setattr(agent, "AI_AGENT_VECTOR_SCORING", False)
+    expected = suggestions()
+    # Count successful vector passes: a failure would silently fall back to per item.
+    vector_calls = []
+    vector_scores = agent._vector_scores
+
+    def counted(*args):
+        result = vector_scores(*args)
+        vector_calls.append(len(result))
+        return result
+
+    monkeypatch.setattr(agent, "_vector_scores", counted)
+    monkeypatch.setattr(agent, "AI_AGENT_VECTOR_SCORING", True)
+    assert suggestions() == expected
+    assert len(vector_calls) == len(expected)
@@ -0,0 +1,80 @@
+# R2 upload path (services/process_item.py) against a local moto S3 server:
+# one shared client, single PUT below the multipart threshold, parallel
+# multipart parts above it.
+import pytest
+
+pytest.importorskip("boto3")
+moto_server = pytest.importorskip("moto.server")
+
+import services.process_item as process_item
+
+BUCKET = "wardrobe-test"
+MiB = 1024 * 1024
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint = f"http://{host}:{port}"
+    import boto3
+
+    boto3.client(
+        "s3", endpoint_url=endpoint, region_name="us-east-1",
+        aws_access_key_id="test", aws_secret_access_key="test",
+    ).create_bucket(Bucket=BUCKET)
+    yield endpoint
+    server.stop()
+
+
+@pytest.fixture
+def r2_env(s3_endpoint, monkeypatch):
+    monkeypatch.setenv("R2_ACCOUNT_ID", "test")
+    monkeypatch.setenv("R2_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("R2_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setenv("R2_BUCKET", BUCKET)
+    monkeypatch.setenv("R2_PUBLIC_BASE_URL", "https://cdn.example.com")
+    monkeypatch.setenv("R2_ENDPOINT_URL", s3_endpoint)
+    settings, err = process_item._r2_settings()
+    assert err is None
+    return settings
+
+
+def test_client_is_shared(r2_env):
+    assert process_item.get_r2_client(r2_env) is process_item.get_r2_client(dict(r2_env))
+
+
+def test_small_object_single_put(r2_env):
+    body = b"\x89PNG" + b"x" * 1024
+    key, err = process_item.upload_clean_to_r2(body, "user-1", content_hash="ab" * 32)
+    assert err is None
+    assert key.startswith("clean/user-1/")
+    obj = process_item.get_r2_client(r2_env).get_object(Bucket=BUCKET, Key=key)
+    assert obj["Body"].read() == body
+    assert obj["ContentType"] == "image/png"
+    assert "-" not in obj["ETag"].strip('"')
+
+
+def test_large_object_multipart(r2_env, monkeypatch):
+    # S3 requires >= 5 MiB for every part but the last.
+    monkeypatch.setattr(process_item, "R2_MULTIPART_THRESHOLD", 5 * MiB)
+    monkeypatch.setattr(process_item, "R2_MULTIPART_CHUNKSIZE", 5 * MiB)
+    monkeypatch.setattr(process_item, "_transfer_config", None)
+    body = bytes(range(256)) * (11 * MiB // 256)
+
+    key, err = process_item.upload_clean_to_r2(body, "user-1", content_hash="cd" * 32)
+
+    assert err is None
+    client = process_item.get_r2_client(r2_env)
+    head = client.head_object(Bucket=BUCKET, Key=key)
+    assert head["ETag"].strip('"').endswith("-3")  # 5 + 5 + 1 MiB parts
+    assert head["ContentType"] == "image/png"
+    assert client.get_object(Bucket=BUCKET, Key=key)["Body"].read() == body
+
+
+def test_missing_config_is_reported(monkeypatch):
+    monkeypatch.delenv("R2_BUCKET", raising=False)
+    key, err = process_item.upload_clean_to_r2(b"png", "user-1")
+    assert key is None
+    assert "R2 config missing" in err